@@ -0,0 +1 @@
+"""In-process response caching and cross-worker invalidation."""
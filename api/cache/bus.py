@@ -0,0 +1,216 @@
+"""
+Cross-worker cache invalidation through the ``change_events`` table.
+
+Write paths call ``publish_change`` inside their transaction, which appends a
+``(league_id, seq)`` row; ``seq`` doubles as the change version. The worker
+that made the change drops its own entries right after commit, and every
+worker runs an ``InvalidationBus`` thread that polls for rows past the last
+seen ``seq`` (a primary-key range scan) and drops the affected entries, so
+other workers converge within one poll interval. No external service is
+involved, which keeps ``uvicorn --workers N`` on a single SQLite file safe to
+cache. Other per-worker caches subscribe with ``add_change_listener`` and are
+called with each scope, locally after commit and remotely on poll.
+
+A session that only holds a savepoint of someone else's transaction (a job
+of the group commit queue) must not invalidate on its own commit: the data
+is not visible to readers until the outer transaction commits. Such
+sessions are handed a set with ``defer_changes``; their scopes collect
+there, and the owner of the outer transaction calls ``apply_changes`` once
+it has committed, or drops the set if it rolled back.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable
+
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from api.cache.store import ALL_LEAGUES, ResponseCache, response_cache
+from api.db.models import ChangeEvent, utcnow
+from api.observability.metrics import registry
+
+CACHE_BUS_POLL_INTERVAL_MS = float(os.environ.get('CACHE_BUS_POLL_INTERVAL_MS', '500'))
+CACHE_BUS_RETENTION_SECONDS = float(os.environ.get('CACHE_BUS_RETENTION_SECONDS', '600'))
+
+# Sequence numbers can commit out of order on databases with concurrent
+# writers, so each poll re-reads a short trailing window of seqs.
+_REPLAY_WINDOW = 64
+_PENDING_KEY = 'pending_cache_invalidations'
+_DEFERRED_KEY = 'deferred_cache_invalidations'
+
+events_applied = registry.counter(
+  'cache_invalidation_events_total', 'Change events applied to the local response cache.'
+)
+entries_dropped = registry.counter(
+  'cache_invalidation_entries_dropped_total', 'Cached responses dropped by invalidations.'
+)
+propagation_lag = registry.gauge(
+  'cache_invalidation_lag_seconds', 'Delay between publishing the latest change and applying it here.'
+)
+max_propagation_lag = registry.gauge(
+  'cache_invalidation_max_lag_seconds', 'Largest publish-to-apply delay observed by this worker.'
+)
+last_seq = registry.gauge('cache_invalidation_last_seq', 'Highest change sequence applied by this worker.')
+
+_change_listeners: list[Callable[[str], object]] = []
+
+
+def add_change_listener(listener: Callable[[str], object]) -> None:
+  """Call ``listener(scope)`` for every change applied in this worker, local or remote."""
+  _change_listeners.append(listener)
+
+
+def _notify(scope: str) -> None:
+  for listener in _change_listeners:
+    listener(scope)
+
+
+def publish_change(session: Session, league_id: str | None) -> None:
+  """Record that cached data of ``league_id`` (``None`` = whole club) changes with this transaction."""
+  scope = league_id or ALL_LEAGUES
+  session.add(ChangeEvent(league_id=scope))
+  session.info.setdefault(_PENDING_KEY, set()).add(scope)
+
+
+def defer_changes(session: Session, scopes: set[str]) -> None:
+  """Collect the scopes ``session`` commits into ``scopes`` instead of invalidating right away."""
+  session.info[_DEFERRED_KEY] = scopes
+
+
+def apply_changes(scopes: Iterable[str]) -> None:
+  """Drop this worker's entries for changes that are now committed."""
+  for scope in scopes:
+    entries_dropped.inc(amount=response_cache.invalidate(scope))
+    _notify(scope)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_changes(session: Session) -> None:
+  scopes = session.info.pop(_PENDING_KEY, ())
+  deferred = session.info.get(_DEFERRED_KEY)
+  if deferred is not None:
+    deferred.update(scopes)
+  else:
+    apply_changes(scopes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_changes(session: Session) -> None:
+  session.info.pop(_PENDING_KEY, None)
+
+
+class InvalidationBus:
+  def __init__(
+    self,
+    engine: Engine,
+    cache: ResponseCache = response_cache,
+    poll_interval: float = CACHE_BUS_POLL_INTERVAL_MS / 1000,
+    retention: float = CACHE_BUS_RETENTION_SECONDS,
+    read_engine: Engine | None = None
+  ) -> None:
+    self._engine = engine
+    # Poll where responses are read from: with a lagging replica, an event only
+    # invalidates once the data it describes is visible to readers as well.
+    self._read_engine = read_engine or engine
+    self._cache = cache
+    self._poll_interval = poll_interval
+    self._retention = retention
+    self._last_seq = 0
+    self._seen: deque[int] = deque(maxlen=_REPLAY_WINDOW * 4)
+    self._last_poll = time.monotonic()
+    self._stop = threading.Event()
+    self._thread: threading.Thread | None = None
+    registry.gauge(
+      'cache_invalidation_staleness_seconds',
+      'Seconds since this worker last polled the change log; bounds how stale its cache can be.',
+      callback=lambda: time.monotonic() - self._last_poll
+    )
+
+  def start(self) -> None:
+    if self._thread is not None:
+      return
+    with self._read_engine.connect() as conn:
+      self._last_seq = conn.execute(select(func.coalesce(func.max(ChangeEvent.seq), 0))).scalar_one()
+      self._seen.extend(conn.execute(
+        select(ChangeEvent.seq).where(ChangeEvent.seq > self._last_seq - _REPLAY_WINDOW)
+      ).scalars())
+    self._stop.clear()
+    self._thread = threading.Thread(target=self._run, name='cache-invalidation-bus', daemon=True)
+    self._thread.start()
+
+  def stop(self) -> None:
+    self._stop.set()
+    if self._thread is not None:
+      self._thread.join()
+      self._thread = None
+
+  def poll_once(self) -> int:
+    """Apply change events newer than the last seen sequence; returns how many were applied."""
+    with self._read_engine.connect() as conn:
+      newest = conn.execute(select(func.max(ChangeEvent.seq))).scalar_one()
+      restarted = newest is not None and newest < self._last_seq
+      if restarted:
+        # Numbering started over (a log without AUTOINCREMENT, emptied by a prune): read it from the start.
+        self._last_seq = 0
+        self._seen.clear()
+      rows = conn.execute(
+        select(ChangeEvent.seq, ChangeEvent.league_id, ChangeEvent.published_at)
+        .where(ChangeEvent.seq > self._last_seq - _REPLAY_WINDOW)
+        .order_by(ChangeEvent.seq)
+      ).all()
+
+    applied = 0
+    now = utcnow()
+    if restarted:
+      # Events numbered below the old seq may have been missed.
+      entries_dropped.inc(amount=self._cache.invalidate(ALL_LEAGUES))
+      _notify(ALL_LEAGUES)
+    for seq, league_id, published_at in rows:
+      if seq in self._seen:
+        continue
+      self._seen.append(seq)
+      self._last_seq = max(self._last_seq, seq)
+      entries_dropped.inc(amount=self._cache.invalidate(league_id))
+      _notify(league_id)
+      if published_at.tzinfo is None:
+        published_at = published_at.replace(tzinfo=timezone.utc)
+      lag = max(0.0, (now - published_at).total_seconds())
+      propagation_lag.set(lag)
+      max_propagation_lag.set_max(lag)
+      applied += 1
+
+    events_applied.inc(amount=applied)
+    last_seq.set(self._last_seq)
+    self._last_poll = time.monotonic()
+    return applied
+
+  def prune(self) -> None:
+    """Delete events older than the retention, always keeping the newest so its seq is never reused."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=self._retention)
+    with self._engine.begin() as conn:
+      conn.execute(
+        delete(ChangeEvent).where(
+          ChangeEvent.published_at < cutoff,
+          ChangeEvent.seq < select(func.max(ChangeEvent.seq)).scalar_subquery()
+        )
+      )
+
+  def _run(self) -> None:
+    polls_per_prune = max(1, int(60 / max(self._poll_interval, 0.001)))
+    polls = 0
+    while not self._stop.wait(self._poll_interval):
+      try:
+        self.poll_once()
+        polls += 1
+        if polls % polls_per_prune == 0:
+          self.prune()
+      except Exception:
+        # The next poll retries; staleness_seconds keeps growing meanwhile.
+        continue
@@ -0,0 +1,86 @@
+"""
+Bounded per-worker cache of read responses, grouped by league.
+
+Entries are keyed by ``(league_id, name, params)``. ``league_id`` is ``None``
+for club-wide responses such as the league list; those are dropped together
+with any league-scoped invalidation because they embed league fields.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, TypeVar
+
+from api.observability.metrics import registry
+
+RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', '1') == '1'
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '2048'))
+
+ALL_LEAGUES = '*'
+
+T = TypeVar('T')
+CacheKey = tuple[str | None, str, Hashable]
+
+cache_requests = registry.counter(
+  'response_cache_requests_total', 'Response cache lookups by result.', ('cache', 'result')
+)
+
+
+class ResponseCache:
+  def __init__(self, max_entries: int = 2048, name: str = 'responses') -> None:
+    self._max_entries = max_entries
+    self._name = name
+    self._entries: OrderedDict[CacheKey, object] = OrderedDict()
+    self._generation = 0
+    self._lock = threading.Lock()
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  def get_or_compute(self, league_id: str | None, name: str, params: Hashable, compute: Callable[[], T]) -> T:
+    if self._max_entries <= 0:
+      return compute()
+
+    key: CacheKey = (league_id, name, params)
+    with self._lock:
+      if key in self._entries:
+        self._entries.move_to_end(key)
+        cache_requests.inc(self._name, 'hit')
+        return self._entries[key]  # type: ignore[return-value]
+      generation = self._generation
+
+    cache_requests.inc(self._name, 'miss')
+    value = compute()
+    with self._lock:
+      # An invalidation that raced with compute() may have made value stale.
+      if generation != self._generation:
+        return value
+      self._entries[key] = value
+      self._entries.move_to_end(key)
+      while len(self._entries) > self._max_entries:
+        self._entries.popitem(last=False)
+    return value
+
+  def invalidate(self, league_id: str) -> int:
+    """Drop entries of ``league_id`` plus club-wide ones; ``ALL_LEAGUES`` drops everything."""
+    with self._lock:
+      self._generation += 1
+      if league_id == ALL_LEAGUES:
+        dropped = len(self._entries)
+        self._entries.clear()
+        return dropped
+      stale = [key for key in self._entries if key[0] in (league_id, None)]
+      for key in stale:
+        del self._entries[key]
+      return len(stale)
+
+  def clear(self) -> None:
+    with self._lock:
+      self._generation += 1
+      self._entries.clear()
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES if RESPONSE_CACHE_ENABLED else 0)
+registry.gauge('response_cache_entries', 'Responses currently held in the cache.', callback=lambda: len(response_cache))
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, UniqueConstraint, func
+from sqlalchemy import JSON, Boolean, DateTime, Float, ForeignKey, Integer, String, UniqueConstraint, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
+def new_id() -> str:
+  return uuid.uuid4().hex
+
+
+def utcnow() -> datetime:
+  return datetime.now(timezone.utc)
+
+
 class Base(DeclarativeBase):
   pass
 
@@ -14,7 +22,7 @@ class Base(DeclarativeBase):
 class League(Base):
   __tablename__ = 'leagues'
 
-  id: Mapped[str] = mapped_column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+  id: Mapped[str] = mapped_column(String(32), primary_key=True, default=new_id)
   name: Mapped[str] = mapped_column(String(70), nullable=False)
   surface_type: Mapped[str] = mapped_column(String(20), nullable=False)
   entry_fee: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -23,8 +31,13 @@ class League(Base):
   groups_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
   courts_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
   final_stage_mode: Mapped[str | None] = mapped_column(String(20), nullable=True)
+  pairing_mode: Mapped[str] = mapped_column(String(20), nullable=False, default='random', server_default='random')
+  group_mode: Mapped[str] = mapped_column(String(20), nullable=False, default='order', server_default='order')
+  swiss_rounds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+  swiss_round: Mapped[int | None] = mapped_column(Integer, nullable=True)
+  generation_seq: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default='0')  # see generation_guard
   bracket_generated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
-  created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+  created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, server_default=func.now())
 
   applications: Mapped[list['LeagueApplication']] = relationship(
     back_populates='league', cascade='all, delete-orphan'
@@ -37,25 +50,31 @@ class League(Base):
 class Member(Base):
   __tablename__ = 'members'
 
-  id: Mapped[str] = mapped_column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+  id: Mapped[str] = mapped_column(String(32), primary_key=True, default=new_id)
   full_name: Mapped[str] = mapped_column(String(80), nullable=False)
   email: Mapped[str] = mapped_column(String(120), nullable=False, unique=True)
   level: Mapped[str] = mapped_column(String(20), nullable=False)
   role: Mapped[str] = mapped_column(String(20), nullable=False, default='member')
-  joined_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+  rating: Mapped[float] = mapped_column(Float, nullable=False, default=1500.0, server_default='1500')
+  rated_matches: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default='0')
+  joined_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, server_default=func.now())
 
   applications: Mapped[list['LeagueApplication']] = relationship(back_populates='member')
 
 
+# Application statuses that hold no place in the bracket.
+INACTIVE_APPLICATION_STATUSES = ('waitlisted', 'withdrawn')
+
+
 class LeagueApplication(Base):
   __tablename__ = 'league_applications'
   __table_args__ = (UniqueConstraint('league_id', 'member_id', name='uq_league_member'),)
 
-  id: Mapped[str] = mapped_column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+  id: Mapped[str] = mapped_column(String(32), primary_key=True, default=new_id)
   league_id: Mapped[str] = mapped_column(ForeignKey('leagues.id', ondelete='CASCADE'), nullable=False)
   member_id: Mapped[str] = mapped_column(ForeignKey('members.id', ondelete='CASCADE'), nullable=False)
   status: Mapped[str] = mapped_column(String(20), nullable=False, default='pending')
-  applied_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+  applied_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, server_default=func.now())
 
   league: Mapped[League] = relationship(back_populates='applications')
   member: Mapped[Member] = relationship(back_populates='applications')
@@ -64,7 +83,7 @@ class LeagueApplication(Base):
 class LeagueMatch(Base):
   __tablename__ = 'league_matches'
 
-  id: Mapped[str] = mapped_column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+  id: Mapped[str] = mapped_column(String(32), primary_key=True, default=new_id)
   league_id: Mapped[str] = mapped_column(ForeignKey('leagues.id', ondelete='CASCADE'), nullable=False)
   round: Mapped[int] = mapped_column(Integer, nullable=False)
   group_number: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
@@ -72,6 +91,7 @@ class LeagueMatch(Base):
   player_a: Mapped[str] = mapped_column(String(80), nullable=False)  # Kept for backward compatibility
   player_b: Mapped[str] = mapped_column(String(80), nullable=False)  # Kept for backward compatibility
   court: Mapped[str] = mapped_column(String(40), nullable=False)
+  court_id: Mapped[int | None] = mapped_column(ForeignKey('courts.id', ondelete='SET NULL'), nullable=True, index=True)
   scheduled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
   status: Mapped[str] = mapped_column(String(20), nullable=False, default='scheduled')  # scheduled, in_progress, completed
   score_a: Mapped[int | None] = mapped_column(Integer, nullable=True)
@@ -84,7 +104,7 @@ class LeagueMatch(Base):
     nullable=True
   )
   next_match_slot: Mapped[str | None] = mapped_column(String(10), nullable=True)  # 'team_a' or 'team_b'
-  created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+  created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, server_default=func.now())
 
   league: Mapped[League] = relationship(back_populates='matches')
   participants: Mapped[list['MatchParticipant']] = relationship(back_populates='match', cascade='all, delete-orphan')
@@ -93,11 +113,98 @@ class LeagueMatch(Base):
 class MatchParticipant(Base):
   __tablename__ = 'match_participants'
 
-  id: Mapped[str] = mapped_column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+  id: Mapped[str] = mapped_column(String(32), primary_key=True, default=new_id)
   match_id: Mapped[str] = mapped_column(ForeignKey('league_matches.id', ondelete='CASCADE'), nullable=False)
   member_id: Mapped[str] = mapped_column(ForeignKey('members.id', ondelete='CASCADE'), nullable=False)
   team: Mapped[str] = mapped_column(String(10), nullable=False)  # 'team_a' or 'team_b'
-  created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+  created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, server_default=func.now())
 
   match: Mapped[LeagueMatch] = relationship(back_populates='participants')
   member: Mapped[Member] = relationship()
+
+
+class Court(Base):
+  """A physical club court shared by every league."""
+  __tablename__ = 'courts'
+
+  id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+  name: Mapped[str] = mapped_column(String(40), nullable=False, unique=True)
+  surface_type: Mapped[str] = mapped_column(String(20), nullable=False)
+  active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+  created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+
+  availability: Mapped[list['CourtAvailability']] = relationship(
+    back_populates='court', cascade='all, delete-orphan', order_by='CourtAvailability.weekday'
+  )
+
+
+class CourtAvailability(Base):
+  """Weekly opening window of a court, in club-local minutes since midnight."""
+  __tablename__ = 'court_availability'
+
+  id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+  court_id: Mapped[int] = mapped_column(ForeignKey('courts.id', ondelete='CASCADE'), nullable=False, index=True)
+  weekday: Mapped[int] = mapped_column(Integer, nullable=False)  # 0 = Monday
+  opens_at: Mapped[int] = mapped_column(Integer, nullable=False)
+  closes_at: Mapped[int] = mapped_column(Integer, nullable=False)
+
+  court: Mapped[Court] = relationship(back_populates='availability')
+
+
+class RatingHistory(Base):
+  """Rating of a member after each rated match; integer key keeps the rows small."""
+  __tablename__ = 'rating_history'
+
+  id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+  member_id: Mapped[str] = mapped_column(ForeignKey('members.id', ondelete='CASCADE'), nullable=False, index=True)
+  match_id: Mapped[str] = mapped_column(ForeignKey('league_matches.id', ondelete='CASCADE'), nullable=False)
+  rating: Mapped[float] = mapped_column(Float, nullable=False)
+  delta: Mapped[float] = mapped_column(Float, nullable=False)
+  recorded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+
+
+class SwissEntrant(Base):
+  """Running Swiss standing of a player (singles) or fixed team (doubles), updated per result."""
+  __tablename__ = 'swiss_entrants'
+  __table_args__ = (UniqueConstraint('league_id', 'member_a_id', name='uq_swiss_league_member'),)
+
+  id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+  league_id: Mapped[str] = mapped_column(ForeignKey('leagues.id', ondelete='CASCADE'), nullable=False, index=True)
+  member_a_id: Mapped[str] = mapped_column(ForeignKey('members.id', ondelete='CASCADE'), nullable=False)
+  member_b_id: Mapped[str | None] = mapped_column(ForeignKey('members.id', ondelete='CASCADE'), nullable=True)
+  name: Mapped[str] = mapped_column(String(170), nullable=False)
+  seed: Mapped[int] = mapped_column(Integer, nullable=False)
+  score: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+  wins: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  losses: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  draws: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default='0')
+  points_for: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  points_against: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+  byes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # each also counted in wins
+  opponents: Mapped[list[int]] = mapped_column(JSON, nullable=False, default=list)
+
+  @property
+  def matches_played(self) -> int:
+    return self.wins - self.byes + self.losses + self.draws
+
+
+class BracketPreview(Base):
+  """A planned bracket awaiting commit; stale once the league's generation_seq moves on."""
+  __tablename__ = 'bracket_previews'
+
+  token: Mapped[str] = mapped_column(String(32), primary_key=True)
+  league_id: Mapped[str] = mapped_column(ForeignKey('leagues.id', ondelete='CASCADE'), nullable=False, index=True)
+  generation_seq: Mapped[int] = mapped_column(Integer, nullable=False)
+  plan: Mapped[dict] = mapped_column(JSON, nullable=False)
+  created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+
+
+class ChangeEvent(Base):
+  """Change-sequence log polled by every worker to invalidate cached responses."""
+  __tablename__ = 'change_events'
+  # Never reuse a seq, even once pruning has emptied the table: workers poll past the last one they saw.
+  __table_args__ = {'sqlite_autoincrement': True}
+
+  seq: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+  league_id: Mapped[str] = mapped_column(String(32), nullable=False)  # '*' for club-wide changes
+  published_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
@@ -1,17 +1,102 @@
 from __future__ import annotations
 
 import os
-from typing import Iterator
+from typing import Any, Iterator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import Session, sessionmaker
 
+from api.observability.db import TimedQueuePool, instrument_engine
+from api.observability.slow_queries import instrument_sessions
+
 DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///./tennis_club.db')
+# Optional separate file (e.g. a local replica) for heavy read traffic; defaults to the primary.
+READ_DATABASE_URL = os.environ.get('READ_DATABASE_URL', DATABASE_URL)
+
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '10'))
+DB_READ_POOL_SIZE = int(os.environ.get('DB_READ_POOL_SIZE', '10'))
+DB_READ_MAX_OVERFLOW = int(os.environ.get('DB_READ_MAX_OVERFLOW', '20'))
 
 connect_args = {'check_same_thread': False} if DATABASE_URL.startswith('sqlite') else {}
 
-engine = create_engine(DATABASE_URL, future=True, echo=False, connect_args=connect_args)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+def _is_sqlite_file(url: str) -> bool:
+  parsed = make_url(url)
+  return parsed.get_backend_name() == 'sqlite' and parsed.database not in (None, '', ':memory:')
+
+
+def _pool_args(url: str, name: str, pool_size: int, max_overflow: int) -> dict[str, Any]:
+  parsed = make_url(url)
+  if parsed.get_backend_name() == 'sqlite' and not _is_sqlite_file(url):
+    return {}  # in-memory databases use a single shared connection
+  return {
+    'poolclass': TimedQueuePool,
+    'pool_logging_name': name,
+    'pool_size': pool_size,
+    'max_overflow': max_overflow
+  }
+
+
+def _create_write_engine(url: str) -> Engine:
+  write_engine = create_engine(
+    url,
+    future=True,
+    echo=False,
+    connect_args=connect_args,
+    **_pool_args(url, 'write', DB_POOL_SIZE, DB_MAX_OVERFLOW)
+  )
+  if _is_sqlite_file(url):
+    # WAL lets readers keep reading a snapshot while a writer commits.
+    @event.listens_for(write_engine, 'connect')
+    def _enable_wal(dbapi_connection, connection_record) -> None:
+      cursor = dbapi_connection.cursor()
+      cursor.execute('PRAGMA journal_mode=WAL')
+      cursor.close()
+
+  return write_engine
+
+
+def _create_read_engine(url: str) -> Engine:
+  if make_url(url).get_backend_name() == 'sqlite' and not _is_sqlite_file(url):
+    return engine  # an in-memory database only exists on the primary connection
+
+  read_url = url
+  read_connect_args: dict[str, Any] = {}
+  if _is_sqlite_file(url):
+    read_url = f'sqlite:///file:{make_url(url).database}?mode=ro&uri=true'
+    read_connect_args = {'check_same_thread': False}
+  elif make_url(url).get_backend_name() == 'postgresql':
+    read_connect_args = {'options': '-c default_transaction_read_only=on'}
+
+  read_engine = create_engine(
+    read_url,
+    future=True,
+    echo=False,
+    connect_args=read_connect_args,
+    **_pool_args(url, 'read', DB_READ_POOL_SIZE, DB_READ_MAX_OVERFLOW)
+  )
+  if _is_sqlite_file(url):
+    @event.listens_for(read_engine, 'connect')
+    def _query_only(dbapi_connection, connection_record) -> None:
+      cursor = dbapi_connection.cursor()
+      cursor.execute('PRAGMA query_only=1')
+      cursor.close()
+
+  return read_engine
+
+
+engine = _create_write_engine(DATABASE_URL)
+read_engine = _create_read_engine(READ_DATABASE_URL)
+instrument_engine(engine, 'write')
+instrument_engine(read_engine, 'read')
+
+# Ids and timestamps are generated client-side (see api.db.models), so committed
+# objects already hold their final state and do not need to be reloaded.
+SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False, future=True)
+ReadSessionLocal = sessionmaker(bind=read_engine, autoflush=False, autocommit=False, expire_on_commit=False, future=True)
+instrument_sessions(SessionLocal, ReadSessionLocal)
 
 
 def get_session() -> Iterator[Session]:
@@ -20,3 +105,12 @@ def get_session() -> Iterator[Session]:
     yield session
   finally:
     session.close()
+
+
+def get_read_session() -> Iterator[Session]:
+  """Session on the read-only engine; used by every GET endpoint."""
+  session = ReadSessionLocal()
+  try:
+    yield session
+  finally:
+    session.close()
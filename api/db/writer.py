@@ -0,0 +1,178 @@
+"""
+Single-writer group commit queue.
+
+Mutating service calls are handed to one dedicated writer thread which drains
+whatever is pending (up to ``max_batch_size`` jobs or ``max_delay`` seconds)
+and runs the whole batch inside one database transaction. Each job gets its
+own Session joined to that transaction through a SAVEPOINT, so the services'
+own ``commit()``/``rollback()`` calls only release or undo their savepoint and
+a failing job never takes the rest of the batch down with it. Callers are
+acknowledged with their own result or exception once the batch commit is
+durable; the jobs' cache invalidations are applied just before that, and
+dropped if the batch rolls back.
+
+The queue is opt-in (``GROUP_COMMIT_ENABLED=1``) and mainly helps SQLite
+deployments, where every commit otherwise takes the write lock and fsyncs on
+its own.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, TypeVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine
+from sqlalchemy.orm import Session
+
+from api.cache.bus import apply_changes, defer_changes
+
+GROUP_COMMIT_ENABLED = os.environ.get('GROUP_COMMIT_ENABLED', '0') == '1'
+GROUP_COMMIT_MAX_BATCH = int(os.environ.get('GROUP_COMMIT_MAX_BATCH', '32'))
+GROUP_COMMIT_MAX_DELAY_MS = float(os.environ.get('GROUP_COMMIT_MAX_DELAY_MS', '2'))
+
+T = TypeVar('T')
+
+
+@dataclass
+class _WriteJob:
+  work: Callable[[Session], Any]
+  future: Future
+  # The submitter's context, so request-scoped instrumentation (phase timers,
+  # profiler statement logs) follows the job onto the writer thread.
+  context: contextvars.Context
+
+
+class GroupCommitWriter:
+  def __init__(self, url: str | URL, max_batch_size: int = 32, max_delay: float = 0.002) -> None:
+    self._engine = self._create_engine(url)
+    self._max_batch_size = max(1, max_batch_size)
+    self._max_delay = max(0.0, max_delay)
+    self._queue: queue.SimpleQueue[_WriteJob | None] = queue.SimpleQueue()
+    self._thread: threading.Thread | None = None
+    self._lock = threading.Lock()
+    self.batches_committed = 0
+    self.jobs_committed = 0
+
+  @classmethod
+  def from_environment(cls, engine: Engine) -> GroupCommitWriter | None:
+    if not GROUP_COMMIT_ENABLED:
+      return None
+    return cls(engine.url, max_batch_size=GROUP_COMMIT_MAX_BATCH, max_delay=GROUP_COMMIT_MAX_DELAY_MS / 1000)
+
+  @staticmethod
+  def _create_engine(url: str | URL) -> Engine:
+    engine = create_engine(url, future=True)
+    if engine.dialect.name == 'sqlite':
+      # pysqlite defers BEGIN and mishandles SAVEPOINT; take over transaction
+      # control so each batch holds the write lock from its first statement.
+      @event.listens_for(engine, 'connect')
+      def _disable_driver_transactions(dbapi_connection, connection_record) -> None:
+        dbapi_connection.isolation_level = None
+
+      @event.listens_for(engine, 'begin')
+      def _begin_immediate(connection) -> None:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+    return engine
+
+  def start(self) -> None:
+    with self._lock:
+      if self._thread is not None and self._thread.is_alive():
+        return
+      self._thread = threading.Thread(target=self._run, name='group-commit-writer', daemon=True)
+      self._thread.start()
+
+  def stop(self) -> None:
+    with self._lock:
+      thread, self._thread = self._thread, None
+    if thread is not None:
+      self._queue.put(None)
+      thread.join()
+    self._engine.dispose()
+
+  def submit(self, work: Callable[[Session], T]) -> Future[T]:
+    """Queue ``work`` to run inside the next batch; the future resolves after commit."""
+    if self._thread is None:
+      self.start()
+    future: Future[T] = Future()
+    self._queue.put(_WriteJob(work=work, future=future, context=contextvars.copy_context()))
+    return future
+
+  async def run(self, work: Callable[[Session], T]) -> T:
+    return await asyncio.wrap_future(self.submit(work))
+
+  # --- Writer thread ----------------------------------------------------
+
+  def _run(self) -> None:
+    while True:
+      job = self._queue.get()
+      if job is None:
+        return
+      batch, stopping = self._collect_batch(job)
+      self._execute_batch(batch)
+      if stopping:
+        return
+
+  def _collect_batch(self, first: _WriteJob) -> tuple[list[_WriteJob], bool]:
+    batch = [first]
+    deadline = time.monotonic() + self._max_delay
+    while len(batch) < self._max_batch_size:
+      remaining = deadline - time.monotonic()
+      try:
+        job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+      except queue.Empty:
+        break
+      if job is None:
+        return batch, True
+      batch.append(job)
+    return batch, False
+
+  def _execute_batch(self, batch: list[_WriteJob]) -> None:
+    outcomes: list[tuple[_WriteJob, Any, BaseException | None]] = []
+    changes: set[str] = set()
+    try:
+      with self._engine.connect() as connection:
+        transaction = connection.begin()
+        for job in batch:
+          if not job.future.set_running_or_notify_cancel():
+            continue
+          session = Session(
+            bind=connection,
+            join_transaction_mode='create_savepoint',
+            autoflush=False,
+            expire_on_commit=False
+          )
+          defer_changes(session, changes)
+          try:
+            result = job.context.run(job.work, session)
+            session.commit()
+          except Exception as exc:
+            session.rollback()
+            outcomes.append((job, None, exc))
+          else:
+            outcomes.append((job, result, None))
+          finally:
+            session.close()
+        transaction.commit()
+    except Exception as exc:
+      for job in batch:
+        if not job.future.done():
+          job.future.set_exception(exc)
+      return
+
+    apply_changes(changes)
+    self.batches_committed += 1
+    for job, result, error in outcomes:
+      if error is not None:
+        job.future.set_exception(error)
+      else:
+        self.jobs_committed += 1
+        job.future.set_result(result)
@@ -1,24 +1,46 @@
 import os
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Callable, Literal, TypeVar
 
-from fastapi import Depends, FastAPI, status
+from fastapi import Depends, FastAPI, HTTPException, Query, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from sqlalchemy.orm import Session
 
+from api.cache.bus import InvalidationBus
+from api.cache.store import response_cache
 from api.db.models import Base
-from api.db.session import engine, get_session
+from api.db.session import ReadSessionLocal, engine, get_read_session, get_session, read_engine
+from api.db.writer import GroupCommitWriter
+from api.observability.loop_lag import LoopLagWatchdog
+from api.observability.memory import MemoryDiagnostics
+from api.observability.metrics import registry
+from api.observability.middleware import MetricsMiddleware
+from api.observability.profiler import ProfilerMiddleware, profile_store
+from api.observability.timing import ServerTimingMiddleware, phase
+from api.observability.tracing import TracingMiddleware
 from api.schemas.application import (
   LeagueApplicationCreateRequest,
   LeagueApplicationListItem,
   LeagueApplicationResponse
 )
-from api.schemas.bracket import BracketGenerationRequest
+from api.schemas.bracket import (
+  BracketCommitRequest,
+  BracketGenerationRequest,
+  BracketPreviewResponse,
+  WithdrawalRequest
+)
+from api.schemas.court import CourtCreateRequest, CourtResponse
 from api.schemas.league import LeagueCreateRequest, LeagueResponse
 from api.schemas.match import LeagueMatchCreateRequest, LeagueMatchResponse, MatchScoreUpdateRequest
 from api.schemas.member import MemberCreateRequest, MemberResponse, MemberRoleUpdateRequest
+from api.schemas.qualification import QualificationOddsResponse
 from api.schemas.ranking import PlayerRankingResponse
+from api.schemas.rating import RatingHistoryResponse
+from api.schemas.schedule import FreeSlotResponse, ScheduleShiftRequest
+from api.schemas.swiss import SwissStandingResponse, SwissStartRequest
 from api.schemas.tournament import TournamentBracketRequest, TournamentAdvanceRequest
 from api.schemas.doubles_tournament import (
   DoublesTournamentGenerateRequest,
@@ -26,13 +48,22 @@ from api.schemas.doubles_tournament import (
   PreliminaryCompleteResponse
 )
 from api.services.applications import LeagueApplicationService
+from api.services.authorization import admin_authorizer
+from api.services.courts import CourtService
 from api.services.leagues import LeagueService
 from api.services.brackets import LeagueBracketService
 from api.services.matches import LeagueMatchService
 from api.services.members import MemberService
+from api.services.qualification import QUALIFICATION_SIMULATIONS, QualificationService, shutdown_pool
 from api.services.rankings import RankingService
+from api.services.ratings import RatingService
+from api.services.scheduling import ScheduleService, schedule_indexes
+from api.services.swiss import SwissStageService
 from api.services.tournaments import TournamentService
 from api.services.doubles_tournament import DoublesTournamentService
+from api.services.generation_guard import generation_flights
+
+T = TypeVar('T')
 
 app = FastAPI(title="Tennis Club League API", version="0.1.0")
 app.add_middleware(
@@ -42,6 +73,27 @@ app.add_middleware(
   allow_methods=["*"],
   allow_headers=["*"]
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(TracingMiddleware)
+
+
+def require_admin(admin_id: str, session: Session = Depends(get_read_session)) -> str:
+  """Route dependency for admin-only endpoints taking ``admin_id`` as a query parameter."""
+  admin_authorizer.require_admin(session, admin_id)
+  return admin_id
+
+
+# Sessions for the profiler's admin check, which runs in middleware, outside dependency injection.
+app.state.read_sessions = ReadSessionLocal
+
+
+def _profiling_admin(admin_id: str) -> bool:
+  with app.state.read_sessions() as session:
+    return admin_authorizer.is_admin(session, admin_id)
+
+
+app.add_middleware(ProfilerMiddleware, is_admin=_profiling_admin)
 
 # 프론트엔드 정적 파일 서빙 설정
 WEB_DIST_PATH = Path(__file__).parent.parent / "web" / "dist"
@@ -54,9 +106,49 @@ if WEB_DIST_PATH.exists():
     app.mount("/favicon.svg", StaticFiles(directory=str(WEB_DIST_PATH)), name="favicon")
 
 
+# Opt-in group commit queue (GROUP_COMMIT_ENABLED=1); None means writes run inline.
+write_queue = GroupCommitWriter.from_environment(engine)
+invalidation_bus = InvalidationBus(engine, read_engine=read_engine)
+loop_watchdog = LoopLagWatchdog()
+memory_diagnostics = MemoryDiagnostics(
+  engines={'primary': engine, 'read': read_engine},
+  caches={
+    'responses': response_cache,
+    'schedules': schedule_indexes,
+    'profiles': profile_store,
+    'admins': admin_authorizer
+  }
+)
+
+
 @app.on_event('startup')
 def on_startup() -> None:
   Base.metadata.create_all(bind=engine)
+  if write_queue is not None:
+    write_queue.start()
+  invalidation_bus.start()
+  loop_watchdog.start()
+
+
+@app.on_event('shutdown')
+def on_shutdown() -> None:
+  loop_watchdog.stop()
+  shutdown_pool()
+  invalidation_bus.stop()
+  if write_queue is not None:
+    write_queue.stop()
+
+
+async def run_write(session: Session, work: Callable[[Session], T]) -> T:
+  """Run a mutating service call inline or through the group commit queue."""
+  if write_queue is None:
+    return work(session)
+  return await write_queue.run(work)
+
+
+async def run_generation(key: tuple, session: Session, work: Callable[[Session], T]) -> T:
+  """run_write for match generation: identical concurrent requests share one run."""
+  return await generation_flights.run(key, lambda: run_write(session, work))
 
 
 @app.get("/api", status_code=status.HTTP_200_OK)
@@ -74,10 +166,54 @@ async def health_check() -> dict[str, str]:
   return {"status": "ok"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+  return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/profiles", include_in_schema=False)
+async def list_profiles(admin_id: str = Depends(require_admin)) -> list[dict]:
+  return profile_store.summaries()
+
+
+@app.get("/profiles/{profile_id}", include_in_schema=False)
+async def get_profile(profile_id: str, admin_id: str = Depends(require_admin)) -> dict:
+  report = profile_store.get(profile_id)
+  if report is None:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Profile not found')
+  return report
+
+
+@app.get("/diagnostics/memory", include_in_schema=False)
+async def get_memory_report(admin_id: str = Depends(require_admin)) -> dict:
+  return memory_diagnostics.report()
+
+
+@app.post("/diagnostics/memory/snapshots", include_in_schema=False)
+async def take_memory_snapshot(top: int = 25, group_by: str = 'lineno', admin_id: str = Depends(require_admin)) -> dict:
+  if group_by not in ('lineno', 'filename', 'traceback'):
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='group_by must be lineno, filename or traceback')
+  return memory_diagnostics.snapshot(top=top, group_by=group_by)
+
+
+@app.delete("/diagnostics/memory/snapshots", status_code=status.HTTP_204_NO_CONTENT, include_in_schema=False)
+async def stop_memory_tracing(admin_id: str = Depends(require_admin)) -> None:
+  memory_diagnostics.stop()
+
+
 @app.post("/members", response_model=MemberResponse, status_code=status.HTTP_201_CREATED)
 async def create_member(payload: MemberCreateRequest, session: Session = Depends(get_session)) -> MemberResponse:
-  service = MemberService(session)
-  return service.create_member(payload)
+  return await run_write(session, lambda s: MemberService(s).create_member(payload))
+
+
+@app.get("/members/{member_id}/ratings", response_model=list[RatingHistoryResponse])
+async def get_member_rating_history(
+  member_id: str,
+  limit: int = 50,
+  session: Session = Depends(get_read_session)
+) -> list[RatingHistoryResponse]:
+  history = RatingService(session).history(member_id, limit=min(max(limit, 1), 500))
+  return [RatingHistoryResponse.model_validate(entry, from_attributes=True) for entry in history]
 
 
 @app.patch("/members/{member_id}/role", response_model=MemberResponse)
@@ -86,26 +222,34 @@ async def update_member_role(
   payload: MemberRoleUpdateRequest,
   session: Session = Depends(get_session)
 ) -> MemberResponse:
-  service = MemberService(session)
-  return service.update_member_role(member_id, payload)
+  return await run_write(session, lambda s: MemberService(s).update_member_role(member_id, payload))
+
+
+@app.get("/courts", response_model=list[CourtResponse])
+async def list_courts(session: Session = Depends(get_read_session)) -> list[CourtResponse]:
+  return response_cache.get_or_compute(None, 'courts', (), lambda: CourtService(session).list_courts())
+
+
+@app.post("/courts", response_model=CourtResponse, status_code=status.HTTP_201_CREATED)
+async def create_court(payload: CourtCreateRequest, session: Session = Depends(get_session)) -> CourtResponse:
+  return await run_write(session, lambda s: CourtService(s).create_court(payload))
 
 
 @app.get("/leagues", response_model=list[LeagueResponse])
-async def list_leagues(session: Session = Depends(get_session)) -> list[LeagueResponse]:
-  service = LeagueService(session)
-  return service.list_leagues()
+async def list_leagues(session: Session = Depends(get_read_session)) -> list[LeagueResponse]:
+  return response_cache.get_or_compute(None, 'leagues', (), lambda: LeagueService(session).list_leagues())
 
 
 @app.post("/leagues", response_model=LeagueResponse, status_code=status.HTTP_201_CREATED)
 async def create_league(payload: LeagueCreateRequest, session: Session = Depends(get_session)) -> LeagueResponse:
-  service = LeagueService(session)
-  return service.create_league(payload)
+  return await run_write(session, lambda s: LeagueService(s).create_league(payload))
 
 
 @app.get("/leagues/{league_id}", response_model=LeagueResponse)
-async def get_league(league_id: str, session: Session = Depends(get_session)) -> LeagueResponse:
-  service = LeagueService(session)
-  return service.get_league(league_id)
+async def get_league(league_id: str, session: Session = Depends(get_read_session)) -> LeagueResponse:
+  return response_cache.get_or_compute(
+    league_id, 'league', (), lambda: LeagueService(session).get_league(league_id)
+  )
 
 
 @app.get(
@@ -114,10 +258,11 @@ async def get_league(league_id: str, session: Session = Depends(get_session)) ->
 )
 async def list_league_applications(
   league_id: str,
-  session: Session = Depends(get_session)
+  session: Session = Depends(get_read_session)
 ) -> list[LeagueApplicationListItem]:
-  service = LeagueApplicationService(session)
-  return service.list_applications(league_id)
+  return response_cache.get_or_compute(
+    league_id, 'applications', (), lambda: LeagueApplicationService(session).list_applications(league_id)
+  )
 
 
 @app.post(
@@ -130,8 +275,7 @@ async def create_league_application(
   payload: LeagueApplicationCreateRequest,
   session: Session = Depends(get_session)
 ) -> LeagueApplicationResponse:
-  service = LeagueApplicationService(session)
-  return service.create_application(league_id, payload)
+  return await run_write(session, lambda s: LeagueApplicationService(s).create_application(league_id, payload))
 
 
 @app.delete(
@@ -143,8 +287,7 @@ async def cancel_league_application(
   member_id: str,
   session: Session = Depends(get_session)
 ) -> None:
-  service = LeagueApplicationService(session)
-  service.cancel_application(league_id, member_id)
+  await run_write(session, lambda s: LeagueApplicationService(s).cancel_application(league_id, member_id))
 
 
 @app.get(
@@ -153,10 +296,11 @@ async def cancel_league_application(
 )
 async def list_league_matches(
   league_id: str,
-  session: Session = Depends(get_session)
+  session: Session = Depends(get_read_session)
 ) -> list[LeagueMatchResponse]:
-  service = LeagueMatchService(session)
-  return service.list_matches(league_id)
+  return response_cache.get_or_compute(
+    league_id, 'matches', (), lambda: LeagueMatchService(session).list_matches(league_id)
+  )
 
 
 @app.post(
@@ -169,8 +313,7 @@ async def create_league_match(
   payload: LeagueMatchCreateRequest,
   session: Session = Depends(get_session)
 ) -> LeagueMatchResponse:
-  service = LeagueMatchService(session)
-  return service.create_match(league_id, payload)
+  return await run_write(session, lambda s: LeagueMatchService(s).create_match(league_id, payload))
 
 
 @app.post(
@@ -182,14 +325,143 @@ async def generate_league_bracket(
   payload: BracketGenerationRequest,
   session: Session = Depends(get_session)
 ) -> list[LeagueMatchResponse]:
-  service = LeagueBracketService(session)
-  matches = service.generate_bracket(
-    league_id=league_id,
-    admin_id=payload.admin_id,
-    groups_count=payload.groups_count,
-    courts_count=payload.courts_count
-  )
-  return [LeagueMatchResponse.model_validate(match, from_attributes=True) for match in matches]
+  def work(s: Session) -> list[LeagueMatchResponse]:
+    matches = LeagueBracketService(s).generate_bracket(
+      league_id=league_id,
+      admin_id=payload.admin_id,
+      groups_count=payload.groups_count,
+      courts_count=payload.courts_count,
+      pairing_mode=payload.pairing_mode,
+      group_mode=payload.group_mode,
+      seed=payload.seed,
+      keep_apart=payload.keep_apart,
+      max_per_level=payload.max_per_level
+    )
+    with phase('serialize'):
+      return [LeagueMatchResponse.model_validate(match, from_attributes=True) for match in matches]
+
+  return await run_generation(('bracket', league_id, payload.model_dump_json()), session, work)
+
+
+@app.post(
+  "/leagues/{league_id}/bracket/preview",
+  response_model=BracketPreviewResponse
+)
+async def preview_league_bracket(
+  league_id: str,
+  payload: BracketGenerationRequest,
+  session: Session = Depends(get_session)
+) -> BracketPreviewResponse:
+  def work(s: Session) -> BracketPreviewResponse:
+    plan = LeagueBracketService(s).preview_bracket(
+      league_id=league_id,
+      admin_id=payload.admin_id,
+      groups_count=payload.groups_count,
+      courts_count=payload.courts_count,
+      pairing_mode=payload.pairing_mode,
+      group_mode=payload.group_mode,
+      seed=payload.seed,
+      keep_apart=payload.keep_apart,
+      max_per_level=payload.max_per_level
+    )
+    with phase('serialize'):
+      return BracketPreviewResponse.model_validate(plan, from_attributes=True)
+
+  return await run_write(session, work)
+
+
+@app.post(
+  "/leagues/{league_id}/bracket/commit",
+  response_model=list[LeagueMatchResponse]
+)
+async def commit_league_bracket(
+  league_id: str,
+  payload: BracketCommitRequest,
+  session: Session = Depends(get_session)
+) -> list[LeagueMatchResponse]:
+  def work(s: Session) -> list[LeagueMatchResponse]:
+    matches = LeagueBracketService(s).commit_preview(league_id, payload.admin_id, payload.token)
+    with phase('serialize'):
+      return [LeagueMatchResponse.model_validate(match, from_attributes=True) for match in matches]
+
+  return await run_generation(('bracket_commit', league_id, payload.model_dump_json()), session, work)
+
+
+@app.post(
+  "/leagues/{league_id}/withdrawals",
+  response_model=list[LeagueMatchResponse]
+)
+async def withdraw_league_member(
+  league_id: str,
+  payload: WithdrawalRequest,
+  session: Session = Depends(get_session)
+) -> list[LeagueMatchResponse]:
+  def work(s: Session) -> list[LeagueMatchResponse]:
+    matches = LeagueBracketService(s).withdraw_member(
+      league_id=league_id,
+      admin_id=payload.admin_id,
+      member_id=payload.member_id,
+      substitute_id=payload.substitute_id
+    )
+    with phase('serialize'):
+      return [LeagueMatchResponse.model_validate(match, from_attributes=True) for match in matches]
+
+  return await run_generation(('withdrawal', league_id, payload.model_dump_json()), session, work)
+
+
+@app.post(
+  "/leagues/{league_id}/swiss",
+  response_model=list[LeagueMatchResponse]
+)
+async def start_swiss_stage(
+  league_id: str,
+  payload: SwissStartRequest,
+  session: Session = Depends(get_session)
+) -> list[LeagueMatchResponse]:
+  def work(s: Session) -> list[LeagueMatchResponse]:
+    matches = SwissStageService(s).start(
+      league_id=league_id,
+      admin_id=payload.admin_id,
+      mode=payload.format,
+      rounds=payload.rounds,
+      courts_count=payload.courts_count
+    )
+    with phase('serialize'):
+      return [LeagueMatchResponse.model_validate(match, from_attributes=True) for match in matches]
+
+  return await run_generation(('swiss', league_id, payload.model_dump_json()), session, work)
+
+
+@app.get(
+  "/leagues/{league_id}/swiss/standings",
+  response_model=list[SwissStandingResponse]
+)
+async def get_swiss_standings(
+  league_id: str,
+  session: Session = Depends(get_read_session)
+) -> list[SwissStandingResponse]:
+  def compute() -> list[SwissStandingResponse]:
+    entrants = SwissStageService(session).standings(league_id)
+    with phase('serialize'):
+      return [
+        SwissStandingResponse(
+          id=entrant.id,
+          name=entrant.name,
+          seed=entrant.seed,
+          score=entrant.score,
+          wins=entrant.wins,
+          losses=entrant.losses,
+          draws=entrant.draws,
+          points_for=entrant.points_for,
+          points_against=entrant.points_against,
+          points_diff=entrant.points_for - entrant.points_against,
+          byes=entrant.byes,
+          matches_played=entrant.matches_played
+        )
+        for entrant in entrants
+      ]
+
+  return response_cache.get_or_compute(league_id, 'swiss_standings', (), compute)
 
 
 @app.patch(
@@ -201,8 +473,7 @@ async def update_match_score(
   payload: MatchScoreUpdateRequest,
   session: Session = Depends(get_session)
 ) -> LeagueMatchResponse:
-  service = LeagueMatchService(session)
-  return service.update_match_score(match_id, payload)
+  return await run_write(session, lambda s: LeagueMatchService(s).update_match_score(match_id, payload))
 
 
 @app.get(
@@ -212,24 +483,51 @@ async def update_match_score(
 async def get_league_rankings(
   league_id: str,
   group_number: int | None = None,
-  session: Session = Depends(get_session)
+  session: Session = Depends(get_read_session)
 ) -> list[PlayerRankingResponse]:
-  service = RankingService(session)
-  rankings = service.calculate_group_rankings(league_id, group_number)
-  return [
-    PlayerRankingResponse(
-      player_name=r.player_name,
-      group_number=r.group_number,
-      wins=r.wins,
-      losses=r.losses,
-      points_for=r.points_for,
-      points_against=r.points_against,
-      points_diff=r.points_diff,
-      matches_played=r.matches_played,
-      win_rate=r.win_rate
-    )
-    for r in rankings
-  ]
+  def compute() -> list[PlayerRankingResponse]:
+    service = RankingService(session)
+    rankings = service.calculate_group_rankings(league_id, group_number)
+    with phase('serialize'):
+      return [
+        PlayerRankingResponse(
+          player_name=r.player_name,
+          group_number=r.group_number,
+          wins=r.wins,
+          losses=r.losses,
+          points_for=r.points_for,
+          points_against=r.points_against,
+          points_diff=r.points_diff,
+          matches_played=r.matches_played,
+          win_rate=r.win_rate,
+          rating=r.rating
+        )
+        for r in rankings
+      ]
+
+  return response_cache.get_or_compute(league_id, 'rankings', (group_number,), compute)
+
+
+@app.get(
+  "/leagues/{league_id}/qualification",
+  response_model=QualificationOddsResponse
+)
+async def get_qualification_odds(
+  league_id: str,
+  top_n: int = 2,
+  model: Literal['rating', 'uniform'] = 'rating',
+  simulations: int = QUALIFICATION_SIMULATIONS,
+  session: Session = Depends(get_read_session)
+) -> QualificationOddsResponse:
+  top_n = max(top_n, 1)
+  simulations = min(max(simulations, 100), 100_000)
+
+  def compute() -> QualificationOddsResponse:
+    odds = QualificationService(session).odds(league_id, top_n=top_n, model=model, simulations=simulations)
+    with phase('serialize'):
+      return QualificationOddsResponse.model_validate(odds, from_attributes=True)
+
+  return response_cache.get_or_compute(league_id, 'qualification', (top_n, model, simulations), compute)
 
 
 @app.post(
@@ -241,14 +539,16 @@ async def generate_tournament_bracket(
   payload: TournamentBracketRequest,
   session: Session = Depends(get_session)
 ) -> list[LeagueMatchResponse]:
-  service = TournamentService(session)
-  matches = service.generate_tournament_bracket(
-    league_id=league_id,
-    admin_id=payload.admin_id,
-    courts_count=payload.courts_count,
-    top_n_per_group=payload.top_n_per_group
-  )
-  return [LeagueMatchResponse.model_validate(match, from_attributes=True) for match in matches]
+  def work(s: Session) -> list[LeagueMatchResponse]:
+    matches = TournamentService(s).generate_tournament_bracket(
+      league_id=league_id,
+      admin_id=payload.admin_id,
+      courts_count=payload.courts_count,
+      top_n_per_group=payload.top_n_per_group
+    )
+    return [LeagueMatchResponse.model_validate(match, from_attributes=True) for match in matches]
+
+  return await run_generation(('tournament', league_id, payload.model_dump_json()), session, work)
 
 
 @app.post(
@@ -260,14 +560,16 @@ async def advance_tournament_round(
   payload: TournamentAdvanceRequest,
   session: Session = Depends(get_session)
 ) -> list[LeagueMatchResponse]:
-  service = TournamentService(session)
-  matches = service.advance_tournament_round(
-    league_id=league_id,
-    admin_id=payload.admin_id,
-    current_round=payload.current_round,
-    courts_count=payload.courts_count
-  )
-  return [LeagueMatchResponse.model_validate(match, from_attributes=True) for match in matches]
+  def work(s: Session) -> list[LeagueMatchResponse]:
+    matches = TournamentService(s).advance_tournament_round(
+      league_id=league_id,
+      admin_id=payload.admin_id,
+      current_round=payload.current_round,
+      courts_count=payload.courts_count
+    )
+    return [LeagueMatchResponse.model_validate(match, from_attributes=True) for match in matches]
+
+  return await run_write(session, work)
 
 
 @app.get(
@@ -276,7 +578,7 @@ async def advance_tournament_round(
 )
 async def check_preliminary_status(
   league_id: str,
-  session: Session = Depends(get_session)
+  session: Session = Depends(get_read_session)
 ) -> PreliminaryCompleteResponse:
   service = DoublesTournamentService(session)
   is_complete = service.check_preliminary_complete(league_id)
@@ -315,15 +617,18 @@ async def generate_doubles_tournament(
   payload: DoublesTournamentGenerateRequest,
   session: Session = Depends(get_session)
 ) -> list[LeagueMatchResponse]:
-  service = DoublesTournamentService(session)
-  matches = service.generate_final_stage(
-    league_id=league_id,
-    admin_id=payload.admin_id,
-    mode=payload.mode,
-    courts_count=payload.courts_count,
-    num_matches=payload.num_matches
-  )
-  return [LeagueMatchResponse.model_validate(match, from_attributes=True) for match in matches]
+  def work(s: Session) -> list[LeagueMatchResponse]:
+    matches = DoublesTournamentService(s).generate_final_stage(
+      league_id=league_id,
+      admin_id=payload.admin_id,
+      mode=payload.mode,
+      courts_count=payload.courts_count,
+      num_matches=payload.num_matches
+    )
+    with phase('serialize'):
+      return [LeagueMatchResponse.model_validate(match, from_attributes=True) for match in matches]
+
+  return await run_generation(('doubles_tournament', league_id, payload.model_dump_json()), session, work)
 
 
 @app.patch(
@@ -335,14 +640,60 @@ async def update_match(
   payload: MatchUpdateRequest,
   session: Session = Depends(get_session)
 ) -> LeagueMatchResponse:
-  service = DoublesTournamentService(session)
-  match = service.update_match(
-    match_id=match_id,
-    admin_id=payload.admin_id,
-    scheduled_at=payload.scheduled_at,
-    court=payload.court
-  )
-  return LeagueMatchResponse.model_validate(match, from_attributes=True)
+  def work(s: Session) -> LeagueMatchResponse:
+    match = DoublesTournamentService(s).update_match(
+      match_id=match_id,
+      admin_id=payload.admin_id,
+      scheduled_at=payload.scheduled_at,
+      court=payload.court
+    )
+    return LeagueMatchResponse.model_validate(match, from_attributes=True)
+
+  return await run_write(session, work)
+
+
+@app.get(
+  "/leagues/{league_id}/schedule/free-slots",
+  response_model=list[FreeSlotResponse]
+)
+async def list_free_slots(
+  league_id: str,
+  start: datetime,
+  end: datetime,
+  court: list[str] | None = Query(None),
+  member_id: list[str] | None = Query(None),
+  session: Session = Depends(get_read_session)
+) -> list[FreeSlotResponse]:
+  if end - start > timedelta(days=31):
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Window is limited to 31 days')
+  slots = ScheduleService(session).free_slots(league_id, start, end, courts=court, member_ids=member_id)
+  with phase('serialize'):
+    return [FreeSlotResponse(court=slot_court, scheduled_at=scheduled_at) for slot_court, scheduled_at in slots]
+
+
+@app.post(
+  "/leagues/{league_id}/schedule/shift",
+  response_model=list[LeagueMatchResponse]
+)
+async def shift_league_schedule(
+  league_id: str,
+  payload: ScheduleShiftRequest,
+  session: Session = Depends(get_session)
+) -> list[LeagueMatchResponse]:
+  def work(s: Session) -> list[LeagueMatchResponse]:
+    matches = ScheduleService(s).shift(
+      league_id=league_id,
+      admin_id=payload.admin_id,
+      minutes=payload.minutes,
+      court=payload.court,
+      start=payload.start,
+      end=payload.end,
+      to_court=payload.to_court
+    )
+    with phase('serialize'):
+      return [LeagueMatchResponse.model_validate(match, from_attributes=True) for match in matches]
+
+  return await run_write(session, work)
 
 
 # SPA 라우팅을 위한 catch-all: 모든 API 경로가 아닌 요청은 프론트엔드로
@@ -0,0 +1 @@
+"""Runtime instrumentation for the tennis club API."""
@@ -0,0 +1,111 @@
+"""
+SQLAlchemy engine and pool instrumentation.
+
+Statement counts and durations are recorded globally per engine and, when a
+request is being tracked, added to that request's ``QueryStats`` through a
+context variable so the HTTP middleware can report queries and DB time per
+route. A profiled request additionally installs a statement log that collects
+each SQL string with its duration, statements over the slow-query threshold
+go to ``slow_queries.slow_query_log``, and a traced request gets one span per
+statement.
+"""
+
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from api.observability import slow_queries, tracing
+from api.observability.metrics import registry
+
+query_duration = registry.histogram(
+  'db_query_duration_seconds', 'SQL statement execution time.', ('engine',),
+  buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+pool_wait = registry.histogram(
+  'db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection.', ('pool',),
+  buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+
+
+@dataclass
+class QueryStats:
+  count: int = 0
+  seconds: float = 0.0
+
+
+_request_stats: ContextVar[QueryStats | None] = ContextVar('request_query_stats', default=None)
+_statement_log: ContextVar[list[tuple[str, float]] | None] = ContextVar('request_statement_log', default=None)
+
+
+def track_queries() -> tuple[QueryStats, Token]:
+  """Start attributing statements executed in the current context to a new ``QueryStats``."""
+  stats = QueryStats()
+  return stats, _request_stats.set(stats)
+
+
+def stop_tracking(token: Token) -> None:
+  _request_stats.reset(token)
+
+
+def log_statements() -> tuple[list[tuple[str, float]], Token]:
+  """Collect ``(statement, seconds)`` for every statement executed in the current context."""
+  statements: list[tuple[str, float]] = []
+  return statements, _statement_log.set(statements)
+
+
+def stop_logging(token: Token) -> None:
+  _statement_log.reset(token)
+
+
+class TimedQueuePool(QueuePool):
+  """QueuePool that records how long each checkout waited for a free connection."""
+
+  def _do_get(self):
+    started = time.perf_counter()
+    try:
+      return super()._do_get()
+    finally:
+      pool_wait.observe(time.perf_counter() - started, self.logging_name or 'default')
+
+
+_engine_names: dict[int, str] = {}
+
+
+def _start_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+  conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _record_duration(conn, cursor, statement, parameters, context, executemany) -> None:
+  elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+  engine_name = _engine_names.get(id(conn.engine), 'default')
+  query_duration.observe(elapsed, engine_name)
+  slow_queries.statement_executed(conn, engine_name, statement, parameters, executemany, elapsed)
+  tracing.record_statement(engine_name, statement, elapsed, cursor.rowcount)
+  stats = _request_stats.get()
+  if stats is not None:
+    stats.count += 1
+    stats.seconds += elapsed
+  statements = _statement_log.get()
+  if statements is not None:
+    statements.append((statement, elapsed))
+
+
+def _discard_timer(exception_context) -> None:
+  connection = exception_context.connection
+  if connection is not None and connection.info.get('query_start_time'):
+    connection.info['query_start_time'].pop()
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+  if id(engine) in _engine_names:
+    return
+  _engine_names[id(engine)] = name
+  event.listen(engine, 'before_cursor_execute', _start_timer)
+  event.listen(engine, 'after_cursor_execute', _record_duration)
+  event.listen(engine, 'handle_error', _discard_timer)
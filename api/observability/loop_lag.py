@@ -0,0 +1,129 @@
+"""
+Event-loop lag watchdog.
+
+The ``async def`` routes run SQLAlchemy and the pairing code directly on the
+event loop, so one slow call stalls every request on the worker. A heartbeat
+task sleeps ``LOOP_LAG_INTERVAL_MS`` at a time and records how late it wakes
+up (``event_loop_lag_seconds``). A monitor thread watches the heartbeat; when
+it has not beaten for ``LOOP_LAG_THRESHOLD_MS`` it grabs the loop thread's
+stack while the loop is still blocked, counts the stall under the route
+function found on that stack (``event_loop_blocked_total{endpoint}``) and logs
+the stack with the innermost application frame, i.e. the code to move off the
+loop or make async.
+
+``LOOP_LAG_THRESHOLD_MS`` <= 0 disables the watchdog.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from api.observability.metrics import registry
+
+LOOP_LAG_THRESHOLD_MS = float(os.environ.get('LOOP_LAG_THRESHOLD_MS', '250'))
+LOOP_LAG_INTERVAL_MS = float(os.environ.get('LOOP_LAG_INTERVAL_MS', '50'))
+
+_ROUTES_FILE = os.path.join('api', 'main.py')
+_API_DIR = f'{os.sep}api{os.sep}'
+_INFRASTRUCTURE_DIRS = (f'{_API_DIR}observability{os.sep}', f'{_API_DIR}db{os.sep}', f'{_API_DIR}cache{os.sep}')
+_MAX_STACK_FRAMES = 40
+
+logger = logging.getLogger(__name__)
+
+loop_lag = registry.histogram(
+  'event_loop_lag_seconds', 'How late the event loop heartbeat woke up.',
+  buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+loop_blocked = registry.counter(
+  'event_loop_blocked_total', 'Event loop stalls longer than the lag threshold, by route function.', ('endpoint',)
+)
+
+
+def blocking_frames(frame) -> tuple[str, str | None]:
+  """Route function on the stack (``'other'`` if none) and the innermost application frame."""
+  endpoint = 'other'
+  culprit = None
+  while frame is not None:
+    filename = frame.f_code.co_filename
+    if culprit is None and _API_DIR in filename and not any(path in filename for path in _INFRASTRUCTURE_DIRS):
+      culprit = f'{frame.f_code.co_qualname} ({filename[filename.rfind(_API_DIR) + 1:]}:{frame.f_lineno})'
+    if filename.endswith(_ROUTES_FILE):
+      endpoint = frame.f_code.co_qualname
+    frame = frame.f_back
+  return endpoint, culprit
+
+
+class LoopLagWatchdog:
+  def __init__(
+    self,
+    threshold: float = LOOP_LAG_THRESHOLD_MS / 1000,
+    interval: float = LOOP_LAG_INTERVAL_MS / 1000
+  ) -> None:
+    self._threshold = threshold
+    self._interval = interval
+    self._last_beat = time.monotonic()
+    self._reported_beat: float | None = None
+    self._loop_thread_id: int | None = None
+    self._heartbeat_task: asyncio.Task | None = None
+    self._stop = threading.Event()
+    self._thread: threading.Thread | None = None
+
+  @property
+  def enabled(self) -> bool:
+    return self._threshold > 0
+
+  def start(self) -> None:
+    """Start watching the running loop; call from the loop thread (e.g. a startup hook)."""
+    if not self.enabled or self._thread is not None:
+      return
+    loop = asyncio.get_running_loop()
+    self._loop_thread_id = threading.get_ident()
+    self._last_beat = time.monotonic()
+    self._heartbeat_task = loop.create_task(self._heartbeat())
+    self._stop.clear()
+    self._thread = threading.Thread(target=self._run, name='event-loop-watchdog', daemon=True)
+    self._thread.start()
+
+  def stop(self) -> None:
+    if self._heartbeat_task is not None:
+      self._heartbeat_task.cancel()
+      self._heartbeat_task = None
+    self._stop.set()
+    if self._thread is not None:
+      self._thread.join()
+      self._thread = None
+
+  async def _heartbeat(self) -> None:
+    while True:
+      started = time.monotonic()
+      await asyncio.sleep(self._interval)
+      now = time.monotonic()
+      loop_lag.observe(max(0.0, now - started - self._interval))
+      self._last_beat = now
+
+  def _run(self) -> None:
+    while not self._stop.wait(self._interval):
+      last_beat = self._last_beat
+      stalled = time.monotonic() - last_beat - self._interval
+      if stalled >= self._threshold and self._reported_beat != last_beat:
+        # One report per stall: the next one needs a fresh heartbeat first.
+        self._reported_beat = last_beat
+        self._report(stalled)
+
+  def _report(self, stalled: float) -> None:
+    frame = sys._current_frames().get(self._loop_thread_id)
+    if frame is None:
+      return
+    endpoint, culprit = blocking_frames(frame)
+    loop_blocked.inc(endpoint)
+    stack = ''.join(traceback.format_list(traceback.extract_stack(frame)[-_MAX_STACK_FRAMES:]))
+    logger.warning(
+      'Event loop blocked for at least %.0fms in %s at %s\n%s',
+      stalled * 1000, endpoint, culprit or 'unknown', stack
+    )
@@ -0,0 +1,146 @@
+"""
+Memory diagnostics for long-running workers.
+
+``MemoryDiagnostics.snapshot()`` starts ``tracemalloc`` on first use (keeping
+``MEMORY_TRACE_FRAMES`` frames per allocation), so only allocations made after
+that first call are seen. Every snapshot reports the largest live allocation
+sites and, from the second one on, the growth per site since the previous
+snapshot, which is what points at a leak or an oversized response. ``stop()``
+turns tracing off again, since it slows allocations down while active.
+
+``report()`` is cheap and always available: process RSS, tracemalloc totals,
+ORM identity-map sizes of the sessions alive in this worker, and entry counts
+of the in-process caches (response cache, profile store, SQL compilation
+caches). Both are served per worker by the admin-only ``/diagnostics/memory``
+endpoints.
+"""
+
+from __future__ import annotations
+
+import gc
+import os
+import threading
+import tracemalloc
+import weakref
+from collections import Counter
+from typing import Sized
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+MEMORY_TRACE_FRAMES = int(os.environ.get('MEMORY_TRACE_FRAMES', '10'))
+MEMORY_TOP_SITES = int(os.environ.get('MEMORY_TOP_SITES', '25'))
+
+_IGNORED_FILES = (tracemalloc.__file__, '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>', '<unknown>')
+
+_live_sessions: weakref.WeakSet[Session] = weakref.WeakSet()
+
+
+@event.listens_for(Session, 'after_begin')
+def _track_session(session: Session, transaction, connection) -> None:
+  _live_sessions.add(session)
+
+
+def identity_maps() -> dict:
+  """Objects held by the identity maps of sessions alive in this process."""
+  sizes = []
+  by_class: Counter[str] = Counter()
+  for session in list(_live_sessions):
+    objects = list(session.identity_map.values())
+    sizes.append(len(objects))
+    by_class.update(type(obj).__name__ for obj in objects)
+  return {
+    'sessions': len(sizes),
+    'objects': sum(sizes),
+    'largest': max(sizes, default=0),
+    'by_class': dict(by_class.most_common())
+  }
+
+
+def process_memory() -> dict:
+  memory: dict = {'rss_bytes': None}
+  try:
+    with open('/proc/self/statm', encoding='ascii') as handle:
+      memory['rss_bytes'] = int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+  except (OSError, ValueError, IndexError):
+    try:
+      import resource
+      # Peak rather than current RSS where /proc is unavailable; kilobytes on Linux, bytes on macOS.
+      memory['max_rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+      pass
+  memory['gc_objects'] = len(gc.get_objects())
+  memory['tracemalloc'] = tracemalloc.is_tracing()
+  if memory['tracemalloc']:
+    current, peak = tracemalloc.get_traced_memory()
+    memory['traced_bytes'] = current
+    memory['traced_peak_bytes'] = peak
+  return memory
+
+
+def _site(statistic: tracemalloc.Statistic | tracemalloc.StatisticDiff) -> dict:
+  frame = statistic.traceback[0]
+  site = {
+    'site': f'{frame.filename}:{frame.lineno}',
+    'size_kib': round(statistic.size / 1024, 1),
+    'count': statistic.count,
+    'traceback': [f'{entry.filename}:{entry.lineno}' for entry in statistic.traceback]
+  }
+  if isinstance(statistic, tracemalloc.StatisticDiff):
+    site['size_diff_kib'] = round(statistic.size_diff / 1024, 1)
+    site['count_diff'] = statistic.count_diff
+  return site
+
+
+class MemoryDiagnostics:
+  def __init__(self, engines: dict[str, Engine], caches: dict[str, Sized], frames: int = MEMORY_TRACE_FRAMES) -> None:
+    self._engines = engines
+    self._caches = caches
+    self._frames = frames
+    self._previous: tracemalloc.Snapshot | None = None
+    self._lock = threading.Lock()
+
+  def cache_sizes(self) -> dict[str, int]:
+    sizes = {name: len(cache) for name, cache in self._caches.items()}
+    for name, engine in self._engines.items():
+      compiled = getattr(engine, '_compiled_cache', None)
+      if compiled is not None:
+        sizes[f'sql_compiled_{name}'] = len(compiled)
+    return sizes
+
+  def report(self) -> dict:
+    return {
+      'process': process_memory(),
+      'identity_maps': identity_maps(),
+      'caches': self.cache_sizes()
+    }
+
+  def snapshot(self, top: int = MEMORY_TOP_SITES, group_by: str = 'lineno') -> dict:
+    """Largest allocation sites, plus growth per site since the previous snapshot."""
+    with self._lock:
+      started = not tracemalloc.is_tracing()
+      if started:
+        tracemalloc.start(self._frames)
+      snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+      )
+      previous, self._previous = self._previous, snapshot
+
+    statistics = snapshot.statistics(group_by)
+    growth = None
+    if previous is not None:
+      growth = [_site(diff) for diff in snapshot.compare_to(previous, group_by) if diff.size_diff][:top]
+    return {
+      'tracing_started': started,
+      'traced_kib': round(sum(statistic.size for statistic in statistics) / 1024, 1),
+      'sites': [_site(statistic) for statistic in statistics[:top]],
+      'growth': growth,
+      **self.report()
+    }
+
+  def stop(self) -> None:
+    with self._lock:
+      self._previous = None
+      if tracemalloc.is_tracing():
+        tracemalloc.stop()
@@ -0,0 +1,185 @@
+"""
+In-process metrics registry rendered in the Prometheus text format.
+
+Metrics are plain Python objects guarded by a lock; there is no external
+client library or push gateway. Each worker process exposes its own values
+at ``GET /metrics``.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Iterable, Sequence, TypeVar
+
+LabelValues = tuple[str, ...]
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = '') -> str:
+  pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+  if extra:
+    pairs.append(extra)
+  return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+  return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+  if value == int(value):
+    return str(int(value))
+  return repr(value)
+
+
+class Counter:
+  kind = 'counter'
+
+  def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+    self.name = name
+    self.documentation = documentation
+    self.labelnames = tuple(labelnames)
+    self._values: dict[LabelValues, float] = {} if self.labelnames else {(): 0.0}
+    self._lock = threading.Lock()
+
+  def inc(self, *labels: str, amount: float = 1.0) -> None:
+    with self._lock:
+      self._values[labels] = self._values.get(labels, 0.0) + amount
+
+  def value(self, *labels: str) -> float:
+    return self._values.get(labels, 0.0)
+
+  def samples(self) -> list[str]:
+    with self._lock:
+      items = sorted(self._values.items())
+    return [f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}' for labels, value in items]
+
+
+class Gauge(Counter):
+  kind = 'gauge'
+
+  def __init__(
+    self,
+    name: str,
+    documentation: str,
+    labelnames: Iterable[str] = (),
+    callback: Callable[[], float] | None = None
+  ) -> None:
+    super().__init__(name, documentation, labelnames)
+    self._callback = callback
+
+  def set(self, value: float, *labels: str) -> None:
+    with self._lock:
+      self._values[labels] = value
+
+  def set_max(self, value: float, *labels: str) -> None:
+    with self._lock:
+      if value > self._values.get(labels, float('-inf')):
+        self._values[labels] = value
+
+  def samples(self) -> list[str]:
+    if self._callback is not None:
+      return [f'{self.name} {_format_value(self._callback())}']
+    return super().samples()
+
+
+class Histogram:
+  kind = 'histogram'
+
+  def __init__(
+    self,
+    name: str,
+    documentation: str,
+    labelnames: Iterable[str] = (),
+    buckets: Sequence[float] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+  ) -> None:
+    self.name = name
+    self.documentation = documentation
+    self.labelnames = tuple(labelnames)
+    self._buckets = tuple(sorted(buckets))
+    # label values -> [per-bucket counts..., +Inf count, sum]
+    self._values: dict[LabelValues, list[float]] = {}
+    self._lock = threading.Lock()
+
+  def observe(self, value: float, *labels: str) -> None:
+    index = bisect_left(self._buckets, value)
+    with self._lock:
+      series = self._values.get(labels)
+      if series is None:
+        series = self._values[labels] = [0.0] * (len(self._buckets) + 2)
+      series[index] += 1
+      series[-1] += value
+
+  def count(self, *labels: str) -> int:
+    series = self._values.get(labels)
+    return int(sum(series[:-1])) if series else 0
+
+  def samples(self) -> list[str]:
+    with self._lock:
+      items = sorted((labels, list(series)) for labels, series in self._values.items())
+    lines: list[str] = []
+    for labels, series in items:
+      cumulative = 0.0
+      for bound, count in zip(self._buckets, series):
+        cumulative += count
+        le = _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"')
+        lines.append(f'{self.name}_bucket{le} {_format_value(cumulative)}')
+      cumulative += series[-2]
+      inf = _format_labels(self.labelnames, labels, 'le="+Inf"')
+      lines.append(f'{self.name}_bucket{inf} {_format_value(cumulative)}')
+      lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-1])}')
+      lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {_format_value(cumulative)}')
+    return lines
+
+
+M = TypeVar('M', Counter, Gauge, Histogram)
+
+
+class MetricsRegistry:
+  def __init__(self) -> None:
+    self._metrics: dict[str, Counter | Histogram] = {}
+    self._lock = threading.Lock()
+
+  def _register(self, metric: M) -> M:
+    with self._lock:
+      existing = self._metrics.get(metric.name)
+      if existing is not None:
+        return existing  # type: ignore[return-value]
+      self._metrics[metric.name] = metric
+      return metric
+
+  def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+    return self._register(Counter(name, documentation, labelnames))
+
+  def gauge(
+    self,
+    name: str,
+    documentation: str,
+    labelnames: Iterable[str] = (),
+    callback: Callable[[], float] | None = None
+  ) -> Gauge:
+    return self._register(Gauge(name, documentation, labelnames, callback))
+
+  def histogram(
+    self,
+    name: str,
+    documentation: str,
+    labelnames: Iterable[str] = (),
+    buckets: Sequence[float] | None = None
+  ) -> Histogram:
+    if buckets is None:
+      return self._register(Histogram(name, documentation, labelnames))
+    return self._register(Histogram(name, documentation, labelnames, buckets))
+
+  def render(self) -> str:
+    lines: list[str] = []
+    with self._lock:
+      metrics = list(self._metrics.values())
+    for metric in metrics:
+      lines.append(f'# HELP {metric.name} {metric.documentation}')
+      lines.append(f'# TYPE {metric.name} {metric.kind}')
+      lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
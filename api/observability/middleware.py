@@ -0,0 +1,100 @@
+"""
+ASGI middleware recording per-route HTTP metrics.
+
+Routes are labelled by their path template (``/leagues/{league_id}/matches``)
+so the series count stays bounded no matter how many leagues exist. Besides
+latency, request/response size and in-flight requests, each request reports
+how many SQL statements it issued and how long they took, which points at
+the service call behind a slow route.
+"""
+
+from __future__ import annotations
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.observability.db import stop_tracking, track_queries
+from api.observability.metrics import registry
+
+_SIZE_BUCKETS = (100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+
+request_duration = registry.histogram(
+  'http_request_duration_seconds', 'Request latency by route template.', ('method', 'route')
+)
+requests_total = registry.counter(
+  'http_requests_total', 'Completed requests by route template and status.', ('method', 'route', 'status')
+)
+request_size = registry.histogram(
+  'http_request_size_bytes', 'Request body size by route template.', ('method', 'route'), buckets=_SIZE_BUCKETS
+)
+response_size = registry.histogram(
+  'http_response_size_bytes', 'Response body size by route template.', ('method', 'route'), buckets=_SIZE_BUCKETS
+)
+in_flight = registry.gauge('http_requests_in_flight', 'Requests currently being handled.')
+request_queries = registry.histogram(
+  'http_request_db_queries', 'SQL statements issued per request.', ('method', 'route'),
+  buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+request_db_time = registry.histogram(
+  'http_request_db_seconds', 'Total SQL time per request.', ('method', 'route')
+)
+
+
+def route_template(scope: Scope) -> str:
+  """Path template of the route that handled ``scope`` (set by the router)."""
+  endpoint = scope.get('endpoint')
+  app = scope.get('app')
+  if endpoint is None or app is None:
+    return 'unmatched'
+  templates: dict[object, str] | None = getattr(app.state, 'route_templates', None)
+  if templates is None:
+    templates = {getattr(route, 'endpoint', None): route.path for route in app.routes}
+    app.state.route_templates = templates
+  return templates.get(endpoint, 'unmatched')
+
+
+class MetricsMiddleware:
+  def __init__(self, app: ASGIApp) -> None:
+    self.app = app
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+    if scope['type'] != 'http':
+      await self.app(scope, receive, send)
+      return
+
+    status_code = 500
+    sent_bytes = 0
+
+    async def send_wrapper(message: Message) -> None:
+      nonlocal status_code, sent_bytes
+      if message['type'] == 'http.response.start':
+        status_code = message['status']
+      elif message['type'] == 'http.response.body':
+        sent_bytes += len(message.get('body', b''))
+      await send(message)
+
+    in_flight.inc()
+    stats, token = track_queries()
+    started = time.perf_counter()
+    try:
+      await self.app(scope, receive, send_wrapper)
+    finally:
+      elapsed = time.perf_counter() - started
+      stop_tracking(token)
+      in_flight.inc(amount=-1)
+
+      method = scope['method']
+      route = route_template(scope)
+      received_bytes = 0
+      for name, value in scope['headers']:
+        if name == b'content-length':
+          received_bytes = int(value)
+          break
+
+      request_duration.observe(elapsed, method, route)
+      requests_total.inc(method, route, str(status_code))
+      request_size.observe(received_bytes, method, route)
+      response_size.observe(sent_bytes, method, route)
+      request_queries.observe(stats.count, method, route)
+      request_db_time.observe(stats.seconds, method, route)
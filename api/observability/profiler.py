@@ -0,0 +1,191 @@
+"""
+Opt-in profiling of single requests for admins.
+
+A request carrying ``X-Profile-Admin: <admin id>`` (or the ``profile_admin``
+query parameter) from an admin runs under ``cProfile`` with its SQL statements
+logged. The report (top functions, statements with timings, and the time split
+between pairing, DB and serialization) is kept in a small per-worker store and
+its id is returned in the ``X-Profile-Id`` response header; fetch it from
+``GET /profiles/{profile_id}``. Requests without the flag only pay for one scan
+of the header list.
+
+``cProfile`` follows the event loop thread, so profile on a quiet worker:
+requests handled concurrently on the same worker show up in the functions,
+and work done on the group commit thread only appears in the SQL log.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+from urllib.parse import parse_qs
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.db.models import new_id
+from api.observability.db import log_statements, stop_logging
+from api.observability.middleware import route_template
+
+PROFILE_STORE_MAX_ENTRIES = int(os.environ.get('PROFILE_STORE_MAX_ENTRIES', '50'))
+PROFILE_TOP_FUNCTIONS = int(os.environ.get('PROFILE_TOP_FUNCTIONS', '30'))
+
+_HEADER = b'x-profile-admin'
+_QUERY_FLAG = b'profile_admin='
+
+# Functions whose cumulative time counts as serialization of the response.
+_SERIALIZATION_FUNCTIONS = {
+  ('fastapi/routing.py', 'serialize_response'),
+  ('pydantic/main.py', 'model_validate'),
+  ('starlette/responses.py', 'render')
+}
+_PAIRING_MODULE = 'api/services/doubles_pairing.py'
+
+
+class ProfileStore:
+  def __init__(self, max_entries: int = PROFILE_STORE_MAX_ENTRIES) -> None:
+    self._max_entries = max_entries
+    self._reports: OrderedDict[str, dict] = OrderedDict()
+    self._lock = threading.Lock()
+
+  def __len__(self) -> int:
+    return len(self._reports)
+
+  def add(self, report: dict) -> None:
+    with self._lock:
+      self._reports[report['id']] = report
+      while len(self._reports) > self._max_entries:
+        self._reports.popitem(last=False)
+
+  def get(self, profile_id: str) -> dict | None:
+    with self._lock:
+      return self._reports.get(profile_id)
+
+  def summaries(self) -> list[dict]:
+    with self._lock:
+      reports = list(self._reports.values())
+    return [
+      {key: report[key] for key in ('id', 'method', 'path', 'route', 'status', 'recorded_at', 'total_ms')}
+      for report in reversed(reports)
+    ]
+
+  def clear(self) -> None:
+    with self._lock:
+      self._reports.clear()
+
+
+profile_store = ProfileStore()
+
+
+def _requested_admin(scope: Scope) -> str | None:
+  for name, value in scope['headers']:
+    if name == _HEADER:
+      return value.decode('latin-1')
+  query = scope.get('query_string', b'')
+  if _QUERY_FLAG in query:
+    values = parse_qs(query.decode('latin-1')).get('profile_admin')
+    return values[0] if values else None
+  return None
+
+
+def _is_pairing(key: tuple[str, int, str], stats: dict) -> bool:
+  """Outermost pairing frames, so nested helpers are not counted twice."""
+  filename = key[0].replace('\\', '/')
+  if not filename.endswith(_PAIRING_MODULE):
+    return False
+  callers = stats[key][4]
+  return not any(caller[0].replace('\\', '/').endswith(_PAIRING_MODULE) for caller in callers)
+
+
+def build_report(profiler: cProfile.Profile, statements: list[tuple[str, float]], total: float) -> dict:
+  stats = pstats.Stats(profiler).stats  # type: ignore[attr-defined]
+  pairing = serialization = 0.0
+  for key, (_, _, _, cumulative, _) in stats.items():
+    filename = key[0].replace('\\', '/')
+    if _is_pairing(key, stats):
+      pairing += cumulative
+    elif any(filename.endswith(path) and key[2] == name for path, name in _SERIALIZATION_FUNCTIONS):
+      serialization += cumulative
+  db = sum(seconds for _, seconds in statements)
+
+  top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP_FUNCTIONS]
+  return {
+    'total_ms': round(total * 1000, 3),
+    'phases': {
+      'pairing_ms': round(pairing * 1000, 3),
+      'db_ms': round(db * 1000, 3),
+      'serialization_ms': round(serialization * 1000, 3),
+      'other_ms': round(max(0.0, total - pairing - db - serialization) * 1000, 3)
+    },
+    'top_functions': [
+      {
+        'function': f'{filename}:{line}({name})',
+        'calls': calls,
+        'self_ms': round(own * 1000, 3),
+        'cumulative_ms': round(cumulative * 1000, 3)
+      }
+      for (filename, line, name), (_, calls, own, cumulative, _) in top
+    ],
+    'sql_count': len(statements),
+    'sql': [{'statement': statement, 'duration_ms': round(seconds * 1000, 3)} for statement, seconds in statements]
+  }
+
+
+class ProfilerMiddleware:
+  def __init__(self, app: ASGIApp, is_admin: Callable[[str], bool], store: ProfileStore = profile_store) -> None:
+    self.app = app
+    self._is_admin = is_admin
+    self._store = store
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+    if scope['type'] != 'http':
+      await self.app(scope, receive, send)
+      return
+    admin_id = _requested_admin(scope)
+    if admin_id is None:
+      await self.app(scope, receive, send)
+      return
+
+    if not self._is_admin(admin_id):
+      body = json.dumps({'detail': 'Admin privileges required'}).encode()
+      await send({'type': 'http.response.start', 'status': 403,
+                  'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]})
+      await send({'type': 'http.response.body', 'body': body})
+      return
+
+    profile_id = new_id()
+    status_code = 500
+
+    async def send_wrapper(message: Message) -> None:
+      nonlocal status_code
+      if message['type'] == 'http.response.start':
+        status_code = message['status']
+        message['headers'] = [*message.get('headers', []), (b'x-profile-id', profile_id.encode())]
+      await send(message)
+
+    statements, token = log_statements()
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+      await self.app(scope, receive, send_wrapper)
+    finally:
+      profiler.disable()
+      total = time.perf_counter() - started
+      stop_logging(token)
+      report = build_report(profiler, statements, total)
+      report.update({
+        'id': profile_id,
+        'admin_id': admin_id,
+        'method': scope['method'],
+        'path': scope['path'],
+        'route': route_template(scope),
+        'status': status_code,
+        'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+      })
+      self._store.add(report)
@@ -0,0 +1,203 @@
+"""
+Slow-query log with the plan of every logged statement.
+
+Statements slower than ``SLOW_QUERY_THRESHOLD_MS`` (unset or 0: off) are
+written as JSON lines to a rotating file. Each entry carries the redacted parameters, the service
+method that issued the statement and the database's plan for it
+(``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN`` on PostgreSQL) captured on the
+same connection. Aggregate the file with ``scripts/slow_query_summary.py``.
+
+Cursor execution alone under-reports SQLite, which hands back the first row
+from ``execute()`` and performs the rest of a scan while rows are fetched. ORM
+selects of the sessionmakers passed to ``instrument_sessions`` (the app's) are
+therefore timed around the fully fetched result and logged against the
+statement they issued; other statements use the cursor timing. Timing a select
+buffers its whole result, so it only happens while the log is on.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import date, datetime
+from logging.handlers import RotatingFileHandler
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, sessionmaker
+
+from api.observability.metrics import registry
+
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '0'))
+SLOW_QUERY_LOG_PATH = os.environ.get('SLOW_QUERY_LOG_PATH', 'slow_queries.log')
+SLOW_QUERY_LOG_MAX_BYTES = int(os.environ.get('SLOW_QUERY_LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.environ.get('SLOW_QUERY_LOG_BACKUPS', '5'))
+
+_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+_EXPLAIN_PREFIX = {'sqlite': 'EXPLAIN QUERY PLAN ', 'postgresql': 'EXPLAIN '}
+_EXPLAINABLE = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+_SERVICES_DIR = os.sep.join(('api', 'services', ''))
+_API_DIR = os.sep.join(('api', ''))
+_INFRASTRUCTURE_DIRS = (os.sep.join(('api', 'observability', '')), os.sep.join(('api', 'db', '')))
+
+slow_statements = registry.counter('db_slow_queries_total', 'Statements slower than the slow-query threshold.', ('engine',))
+
+
+def redact(value: Any) -> Any:
+  """Keep ids, numbers and dates (needed to reproduce a plan); hide free text such as names and emails."""
+  if value is None or isinstance(value, (bool, int, float)):
+    return value
+  if isinstance(value, (datetime, date)):
+    return value.isoformat()
+  if isinstance(value, str):
+    return value if _ID_PATTERN.match(value) else f'<str:{len(value)}>'
+  if isinstance(value, dict):
+    return {key: redact(item) for key, item in value.items()}
+  if isinstance(value, (list, tuple)):
+    return [redact(item) for item in value]
+  return f'<{type(value).__name__}>'
+
+
+def originating_frame() -> str | None:
+  """Innermost service method on the stack, else the innermost application frame."""
+  fallback = None
+  frame = sys._getframe(1)
+  while frame is not None:
+    filename = frame.f_code.co_filename
+    if _SERVICES_DIR in filename:
+      return f'{frame.f_code.co_qualname} ({_relative(filename)}:{frame.f_lineno})'
+    if fallback is None and _API_DIR in filename and not any(path in filename for path in _INFRASTRUCTURE_DIRS):
+      fallback = f'{frame.f_code.co_qualname} ({_relative(filename)}:{frame.f_lineno})'
+    frame = frame.f_back
+  return fallback
+
+
+def _relative(filename: str) -> str:
+  index = filename.rfind(_API_DIR)
+  return filename[index:] if index >= 0 else filename
+
+
+def explain(conn, statement: str, parameters: Any, executemany: bool) -> list[str] | None:
+  prefix = _EXPLAIN_PREFIX.get(conn.dialect.name)
+  if prefix is None or not statement.lstrip().upper().startswith(_EXPLAINABLE):
+    return None
+  if executemany and parameters:
+    parameters = parameters[0]
+  # Raw DBAPI cursor: bypasses the engine listeners, so the EXPLAIN is neither timed nor logged.
+  cursor = conn.connection.dbapi_connection.cursor()
+  try:
+    cursor.execute(prefix + statement, parameters or ())
+    rows = cursor.fetchall()
+  except Exception as error:
+    return [f'EXPLAIN failed: {error}']
+  finally:
+    cursor.close()
+  if conn.dialect.name == 'sqlite':
+    # (id, parent, notused, detail)
+    return [f'{row[0]}|{row[1]}|{row[3]}' for row in rows]
+  return [row[0] for row in rows]
+
+
+class SlowQueryLog:
+  def __init__(
+    self,
+    threshold_ms: float = SLOW_QUERY_THRESHOLD_MS,
+    path: str = SLOW_QUERY_LOG_PATH,
+    max_bytes: int = SLOW_QUERY_LOG_MAX_BYTES,
+    backups: int = SLOW_QUERY_LOG_BACKUPS
+  ) -> None:
+    # A non-positive threshold turns the log off.
+    self.threshold = threshold_ms / 1000 if threshold_ms > 0 else float('inf')
+    self._path = path
+    self._max_bytes = max_bytes
+    self._backups = backups
+    self._logger: logging.Logger | None = None
+    self._lock = threading.Lock()
+
+  def _get_logger(self) -> logging.Logger:
+    # Opened on the first slow statement so an idle log never creates files.
+    with self._lock:
+      if self._logger is None:
+        directory = os.path.dirname(self._path)
+        if directory:
+          os.makedirs(directory, exist_ok=True)
+        logger = logging.getLogger(f'api.slow_queries.{id(self)}')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        handler = RotatingFileHandler(
+          self._path, maxBytes=self._max_bytes, backupCount=self._backups, encoding='utf-8'
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        self._logger = logger
+      return self._logger
+
+  def record(self, conn, engine_name: str, statement: str, parameters: Any, executemany: bool, elapsed: float) -> None:
+    slow_statements.inc(engine_name)
+    entry = {
+      'ts': datetime.now().astimezone().isoformat(timespec='milliseconds'),
+      'engine': engine_name,
+      'duration_ms': round(elapsed * 1000, 3),
+      'statement': statement,
+      'parameters': redact(parameters[:5] if executemany else parameters),
+      'executemany': executemany,
+      'origin': originating_frame(),
+      'plan': explain(conn, statement, parameters, executemany)
+    }
+    self._get_logger().info(json.dumps(entry, ensure_ascii=False))
+
+  def close(self) -> None:
+    with self._lock:
+      if self._logger is not None:
+        for handler in list(self._logger.handlers):
+          handler.close()
+          self._logger.removeHandler(handler)
+        self._logger = None
+
+
+slow_query_log = SlowQueryLog()
+
+# Statements executed while an ORM select is being timed: (conn, engine, statement, parameters, executemany).
+_orm_select_statements: ContextVar[list[tuple] | None] = ContextVar('orm_select_statements', default=None)
+
+
+def statement_executed(conn, engine_name: str, statement: str, parameters: Any, executemany: bool, elapsed: float) -> None:
+  """Cursor-level hook, called by the engine instrumentation for every statement."""
+  captured = _orm_select_statements.get()
+  if captured is not None:
+    captured.append((conn, engine_name, statement, parameters, executemany))
+  elif elapsed >= slow_query_log.threshold:
+    slow_query_log.record(conn, engine_name, statement, parameters, executemany, elapsed)
+
+
+def instrument_sessions(*factories: sessionmaker) -> None:
+  """Time the ORM selects of sessions made by factories around their fully fetched results."""
+  for factory in factories:
+    event.listen(factory, 'do_orm_execute', _time_orm_select)
+
+
+def _time_orm_select(state: ORMExecuteState):
+  log = slow_query_log
+  # Only selects: freezing a DML result would drop its rowcount.
+  if log.threshold == float('inf') or not state.is_select or _orm_select_statements.get() is not None:
+    return None
+
+  captured: list[tuple] = []
+  token = _orm_select_statements.set(captured)
+  started = time.perf_counter()
+  try:
+    frozen = state.invoke_statement().freeze()
+  finally:
+    _orm_select_statements.reset(token)
+  elapsed = time.perf_counter() - started
+
+  if captured and elapsed >= log.threshold:
+    conn, engine_name, statement, parameters, executemany = captured[0]
+    log.record(conn, engine_name, statement, parameters, executemany, elapsed)
+  return frozen()
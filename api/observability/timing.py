@@ -0,0 +1,88 @@
+"""
+Request phase spans reported in the ``Server-Timing`` response header.
+
+Services wrap their steps in ``phase('db')``, ``phase('pairing')`` and so on.
+``ServerTimingMiddleware`` installs a collector per request, and the response
+carries each phase's total duration, e.g.
+``Server-Timing: db;dur=12.1, pairing;dur=0.8, commit;dur=4.0, total;dur=21.5``,
+which browser devtools and ``benchmarks.loadtest`` display per request.
+
+Phases are exclusive: while a nested phase runs, its parent's clock is paused,
+so the durations add up to at most the total. Outside a request (scripts,
+tests calling services directly) ``phase`` only checks a context variable.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class PhaseTimer:
+  def __init__(self) -> None:
+    self.durations: dict[str, float] = {}
+    self._stack: list[list] = []
+
+  def enter(self, name: str) -> None:
+    now = time.perf_counter()
+    if self._stack:
+      parent = self._stack[-1]
+      self.durations[parent[0]] = self.durations.get(parent[0], 0.0) + now - parent[1]
+    self._stack.append([name, now])
+
+  def exit(self) -> None:
+    now = time.perf_counter()
+    name, started = self._stack.pop()
+    self.durations[name] = self.durations.get(name, 0.0) + now - started
+    if self._stack:
+      self._stack[-1][1] = now
+
+  def header(self, total: float) -> bytes:
+    entries = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in self.durations.items()]
+    entries.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(entries).encode('latin-1')
+
+
+_current_timer: ContextVar[PhaseTimer | None] = ContextVar('phase_timer', default=None)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+  timer = _current_timer.get()
+  if timer is None:
+    yield
+    return
+  timer.enter(name)
+  try:
+    yield
+  finally:
+    timer.exit()
+
+
+class ServerTimingMiddleware:
+  def __init__(self, app: ASGIApp) -> None:
+    self.app = app
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+    if scope['type'] != 'http':
+      await self.app(scope, receive, send)
+      return
+
+    timer = PhaseTimer()
+    started = time.perf_counter()
+
+    async def send_wrapper(message: Message) -> None:
+      if message['type'] == 'http.response.start' and timer.durations:
+        header = timer.header(time.perf_counter() - started)
+        message['headers'] = [*message.get('headers', []), (b'server-timing', header)]
+      await send(message)
+
+    token = _current_timer.set(timer)
+    try:
+      await self.app(scope, receive, send_wrapper)
+    finally:
+      _current_timer.reset(token)
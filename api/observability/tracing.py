@@ -0,0 +1,306 @@
+"""
+Local request tracing with a JSONL span exporter.
+
+``TracingMiddleware`` samples ``TRACE_SAMPLE_RATE`` of requests and opens a
+root span per request. While tracing is on (a rate above 0) the sampled flag
+of an incoming W3C ``traceparent`` header decides instead; with a rate of 0
+no header turns it on. Service classes decorated with ``@traced`` add a child span
+per method call, and the engine instrumentation adds one per SQL statement, so
+a trace reads route -> service methods -> statements. Spans carry attributes
+such as ``league_id``, ``result.count`` and ``db.rows_affected``.
+
+Finished traces are appended to ``TRACE_EXPORT_PATH`` (one span per line,
+rotated like the slow-query log); no collector is involved. Inspect them with
+``scripts/trace_viewer.py``. Unsampled requests, scripts and tests only pay for
+a context variable lookup per method call and statement.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+from typing import Any, Callable, Iterator, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '0'))
+TRACE_EXPORT_PATH = os.environ.get('TRACE_EXPORT_PATH', 'traces.jsonl')
+TRACE_EXPORT_MAX_BYTES = int(os.environ.get('TRACE_EXPORT_MAX_BYTES', str(50 * 1024 * 1024)))
+TRACE_EXPORT_BACKUPS = int(os.environ.get('TRACE_EXPORT_BACKUPS', '3'))
+
+_MAX_STATEMENT_LENGTH = 2000
+
+C = TypeVar('C', bound=type)
+
+
+@dataclass
+class Span:
+  trace_id: str
+  span_id: str
+  parent_span_id: str | None
+  name: str
+  kind: str
+  start_ns: int = field(default_factory=time.time_ns)
+  end_ns: int | None = None
+  attributes: dict[str, Any] = field(default_factory=dict)
+  status: str = 'ok'
+  error: str | None = None
+
+  def to_dict(self) -> dict:
+    end_ns = self.end_ns or time.time_ns()
+    return {
+      'trace_id': self.trace_id,
+      'span_id': self.span_id,
+      'parent_span_id': self.parent_span_id,
+      'name': self.name,
+      'kind': self.kind,
+      'start_time_unix_nano': self.start_ns,
+      'end_time_unix_nano': end_ns,
+      'duration_ms': round((end_ns - self.start_ns) / 1e6, 3),
+      'attributes': self.attributes,
+      'status': self.status,
+      'error': self.error
+    }
+
+
+class _Trace:
+  """Spans of one sampled request, exported together when the root span ends."""
+
+  def __init__(self, trace_id: str) -> None:
+    self.trace_id = trace_id
+    self.spans: list[Span] = []
+
+
+class JsonlExporter:
+  def __init__(
+    self,
+    path: str = TRACE_EXPORT_PATH,
+    max_bytes: int = TRACE_EXPORT_MAX_BYTES,
+    backups: int = TRACE_EXPORT_BACKUPS
+  ) -> None:
+    self._path = path
+    self._max_bytes = max_bytes
+    self._backups = backups
+    self._logger: logging.Logger | None = None
+    self._lock = threading.Lock()
+
+  def _get_logger(self) -> logging.Logger:
+    with self._lock:
+      if self._logger is None:
+        directory = os.path.dirname(self._path)
+        if directory:
+          os.makedirs(directory, exist_ok=True)
+        logger = logging.getLogger(f'api.tracing.{id(self)}')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        handler = RotatingFileHandler(self._path, maxBytes=self._max_bytes, backupCount=self._backups, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        self._logger = logger
+      return self._logger
+
+  def export(self, spans: list[Span]) -> None:
+    logger = self._get_logger()
+    # One record per trace keeps its spans contiguous across concurrent requests.
+    logger.info('\n'.join(json.dumps(span.to_dict(), ensure_ascii=False, default=str) for span in spans))
+
+  def close(self) -> None:
+    with self._lock:
+      if self._logger is not None:
+        for handler in list(self._logger.handlers):
+          handler.close()
+          self._logger.removeHandler(handler)
+        self._logger = None
+
+
+exporter = JsonlExporter()
+
+_current_span: ContextVar[tuple[_Trace, Span] | None] = ContextVar('current_span', default=None)
+
+
+def _new_id(bits: int) -> str:
+  return f'{random.getrandbits(bits):0{bits // 4}x}'
+
+
+@contextmanager
+def _span(trace: _Trace, parent: Span | None, name: str, kind: str, attributes: dict | None = None) -> Iterator[Span]:
+  span = Span(
+    trace_id=trace.trace_id,
+    span_id=_new_id(64),
+    parent_span_id=parent.span_id if parent else None,
+    name=name,
+    kind=kind,
+    attributes=attributes or {}
+  )
+  trace.spans.append(span)
+  token = _current_span.set((trace, span))
+  try:
+    yield span
+  except BaseException as error:
+    span.status = 'error'
+    span.error = f'{type(error).__name__}: {error}'
+    raise
+  finally:
+    span.end_ns = time.time_ns()
+    _current_span.reset(token)
+
+
+@contextmanager
+def start_span(name: str, kind: str = 'internal', **attributes: Any) -> Iterator[Span | None]:
+  """Child span of the current span; yields ``None`` when the request is not traced."""
+  current = _current_span.get()
+  if current is None:
+    yield None
+    return
+  trace, parent = current
+  with _span(trace, parent, name, kind, attributes) as span:
+    yield span
+
+
+def record_statement(engine_name: str, statement: str, elapsed: float, rows_affected: int) -> None:
+  """Add a finished SQL span under the current span (called by the engine instrumentation)."""
+  current = _current_span.get()
+  if current is None:
+    return
+  trace, parent = current
+  end_ns = time.time_ns()
+  attributes: dict[str, Any] = {'db.engine': engine_name, 'db.statement': statement[:_MAX_STATEMENT_LENGTH]}
+  if rows_affected >= 0:
+    attributes['db.rows_affected'] = rows_affected
+  trace.spans.append(Span(
+    trace_id=trace.trace_id,
+    span_id=_new_id(64),
+    parent_span_id=parent.span_id,
+    name=statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'SQL',
+    kind='client',
+    start_ns=end_ns - int(elapsed * 1e9),
+    end_ns=end_ns,
+    attributes=attributes
+  ))
+
+
+def _wrap_method(function: Callable, name: str) -> Callable:
+  parameters = list(inspect.signature(function).parameters)
+  league_index = parameters.index('league_id') if 'league_id' in parameters else None
+
+  @functools.wraps(function)
+  def wrapper(*args, **kwargs):
+    current = _current_span.get()
+    if current is None:
+      return function(*args, **kwargs)
+    trace, parent = current
+    attributes: dict[str, Any] = {'code.function': name}
+    league_id = kwargs.get('league_id')
+    if league_id is None and league_index is not None and league_index < len(args):
+      league_id = args[league_index]
+    if league_id is not None:
+      attributes['league_id'] = league_id
+    with _span(trace, parent, name, 'internal', attributes) as span:
+      result = function(*args, **kwargs)
+      if isinstance(result, (list, tuple)):
+        span.attributes['result.count'] = len(result)
+      return result
+
+  return wrapper
+
+
+def traced(cls: C) -> C:
+  """Class decorator: one span per call of every method defined on ``cls``."""
+  for attribute, value in list(vars(cls).items()):
+    if attribute.startswith('__'):
+      continue
+    if isinstance(value, staticmethod):
+      setattr(cls, attribute, staticmethod(_wrap_method(value.__func__, f'{cls.__name__}.{attribute}')))
+    elif isinstance(value, classmethod):
+      setattr(cls, attribute, classmethod(_wrap_method(value.__func__, f'{cls.__name__}.{attribute}')))
+    elif inspect.isfunction(value):
+      setattr(cls, attribute, _wrap_method(value, f'{cls.__name__}.{attribute}'))
+  return cls
+
+
+def _parse_traceparent(value: str) -> tuple[str, str, bool] | None:
+  parts = value.strip().split('-')
+  if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+    return None
+  try:
+    flags = int(parts[3], 16)
+  except ValueError:
+    return None
+  return parts[1], parts[2], bool(flags & 1)
+
+
+class TracingMiddleware:
+  def __init__(self, app: ASGIApp, sample_rate: float | None = None) -> None:
+    self.app = app
+    self._sample_rate = sample_rate  # None: TRACE_SAMPLE_RATE
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+    if scope['type'] != 'http':
+      await self.app(scope, receive, send)
+      return
+
+    parent_span_id = None
+    trace_id = None
+    sample_rate = TRACE_SAMPLE_RATE if self._sample_rate is None else self._sample_rate
+    sampled = sample_rate > 0 and random.random() < sample_rate
+    for name, value in scope['headers']:
+      if name == b'traceparent':
+        parsed = _parse_traceparent(value.decode('latin-1'))
+        if parsed is not None and sample_rate > 0:
+          trace_id, parent_span_id, sampled = parsed
+        break
+    if not sampled:
+      await self.app(scope, receive, send)
+      return
+
+    trace = _Trace(trace_id or _new_id(128))
+    status_code = 500
+
+    async def send_wrapper(message: Message) -> None:
+      nonlocal status_code
+      if message['type'] == 'http.response.start':
+        status_code = message['status']
+        message['headers'] = [*message.get('headers', []), (b'x-trace-id', trace.trace_id.encode())]
+      await send(message)
+
+    root = Span(
+      trace_id=trace.trace_id,
+      span_id=_new_id(64),
+      parent_span_id=parent_span_id,
+      name=scope['method'],
+      kind='server',
+      attributes={'http.method': scope['method'], 'http.target': scope['path']}
+    )
+    trace.spans.append(root)
+    token = _current_span.set((trace, root))
+    try:
+      await self.app(scope, receive, send_wrapper)
+    except BaseException as error:
+      root.status = 'error'
+      root.error = f'{type(error).__name__}: {error}'
+      raise
+    finally:
+      _current_span.reset(token)
+      root.end_ns = time.time_ns()
+      # Imported here: the HTTP metrics middleware imports the engine instrumentation, which imports this module.
+      from api.observability.middleware import route_template
+      route = route_template(scope)
+      root.name = f"{scope['method']} {route}"
+      root.attributes['http.route'] = route
+      root.attributes['http.status_code'] = status_code
+      league_id = scope.get('path_params', {}).get('league_id')
+      if league_id is not None:
+        root.attributes['league_id'] = league_id
+      if status_code >= 500:
+        root.status = 'error'
+      exporter.export(trace.spans)
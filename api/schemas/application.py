@@ -1,7 +1,7 @@
-from datetime import datetime
-
 from pydantic import BaseModel, ConfigDict, Field
 
+from api.schemas.common import UtcDatetime
+
 
 class LeagueApplicationCreateRequest(BaseModel):
   member_id: str = Field(..., description='Member applying to the league')
@@ -21,7 +21,7 @@ class LeagueApplicationResponse(BaseModel):
   league_id: str
   member_id: str
   status: str
-  applied_at: datetime | None = None
+  applied_at: UtcDatetime | None = None
   member: LeagueApplicationMember | None = None
 
   model_config = ConfigDict(from_attributes=True)
@@ -31,6 +31,6 @@ class LeagueApplicationListItem(BaseModel):
   id: str
   member: LeagueApplicationMember
   status: str
-  applied_at: datetime | None = None
+  applied_at: UtcDatetime | None = None
 
   model_config = ConfigDict(from_attributes=True)
@@ -1,7 +1,52 @@
-from pydantic import BaseModel, Field
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from api.schemas.common import UtcDatetime
 
 
 class BracketGenerationRequest(BaseModel):
   admin_id: str = Field(..., description='Admin triggering bracket generation')
   groups_count: int = Field(..., ge=1, le=16, description='Number of groups/pods')
   courts_count: int = Field(..., ge=1, le=16, description='Number of courts to schedule on')
+  pairing_mode: Literal['random', 'balanced'] | None = Field(None, description='Overrides the league pairing mode')
+  group_mode: Literal['order', 'snake_rating', 'snake_level'] | None = Field(None, description='Overrides the league group mode')
+  seed: int | None = Field(None, description='Seeds the snake draft and the pairing (default: draft seeded from the league id; previews draw a seed)')
+  keep_apart: list[tuple[str, str]] = Field(default_factory=list, description='Member id pairs to place in different groups')
+  max_per_level: int | None = Field(None, ge=1, description='Maximum members of one level per group')
+
+
+class WithdrawalRequest(BaseModel):
+  admin_id: str = Field(..., description='Admin recording the withdrawal')
+  member_id: str = Field(..., description='Member leaving the league')
+  substitute_id: str | None = Field(None, description='Member taking over (default: the earliest waitlisted applicant)')
+
+
+class BracketCommitRequest(BaseModel):
+  admin_id: str = Field(..., description='Admin committing the preview')
+  token: str = Field(..., description='Token returned by the bracket preview')
+
+
+class PlannedMatchResponse(BaseModel):
+  group_number: int
+  team_a: list[str]
+  team_b: list[str]
+  player_a: str
+  player_b: str
+  court: str
+  court_id: int | None = None
+  scheduled_at: UtcDatetime
+
+  model_config = ConfigDict(from_attributes=True)
+
+
+class BracketPreviewResponse(BaseModel):
+  token: str
+  seed: int | None
+  groups_count: int
+  courts_count: int
+  pairing_mode: str
+  group_mode: str
+  matches: list[PlannedMatchResponse]
+
+  model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,13 @@
+from datetime import datetime, timezone
+from typing import Annotated
+
+from pydantic import AfterValidator
+
+
+def _as_utc(value: datetime) -> datetime:
+  """Naive values are UTC (SQLite drops the offset on read); aware ones are converted."""
+  return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+# Response timestamps serialize the same way whether they come fresh from a write or back from the database.
+UtcDatetime = Annotated[datetime, AfterValidator(_as_utc)]
@@ -0,0 +1,35 @@
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+HOURS_PATTERN = r'^([01]\d|2[0-3]):[0-5]\d$|^24:00$'
+
+
+class CourtAvailabilityWindow(BaseModel):
+  weekday: int = Field(..., ge=0, le=6, description='0 = Monday')
+  opens_at: str = Field(..., pattern=HOURS_PATTERN, description='Club-local opening time, HH:MM')
+  closes_at: str = Field(..., pattern=HOURS_PATTERN, description='Club-local closing time, HH:MM')
+
+  @model_validator(mode='after')
+  def validate_window(cls, values: 'CourtAvailabilityWindow') -> 'CourtAvailabilityWindow':
+    if values.closes_at <= values.opens_at:
+      raise ValueError('closes_at must be after opens_at')
+    return values
+
+
+class CourtCreateRequest(BaseModel):
+  admin_id: str = Field(..., description='Admin performing the action')
+  name: str = Field(..., max_length=40)
+  surface_type: str = Field(..., max_length=20, description='Court surface type e.g. hard, clay')
+  availability: list[CourtAvailabilityWindow] = Field(
+    default_factory=list, description='Weekly opening windows (default: CLUB_COURT_HOURS every day)'
+  )
+
+
+class CourtResponse(BaseModel):
+  id: int
+  name: str
+  surface_type: str
+  active: bool
+  availability: list[CourtAvailabilityWindow]
+
+  model_config = ConfigDict(from_attributes=True)
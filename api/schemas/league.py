@@ -1,7 +1,9 @@
-from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from api.schemas.common import UtcDatetime
+
 
 class LeagueBase(BaseModel):
   name: str = Field(..., max_length=70, description="Public league name")
@@ -11,6 +13,8 @@ class LeagueBase(BaseModel):
   auto_generate_bracket: bool = Field(default=True)
   groups_count: int | None = Field(default=None, ge=1, le=16)
   courts_count: int | None = Field(default=None, ge=1, le=16)
+  pairing_mode: Literal['random', 'balanced'] = Field(default='random', description="Preliminary pairing: random or skill-balanced")
+  group_mode: Literal['order', 'snake_rating', 'snake_level'] = Field(default='order', description="Group distribution: application order or snake draft")
 
 
 class LeagueCreateRequest(LeagueBase):
@@ -19,8 +23,10 @@ class LeagueCreateRequest(LeagueBase):
 
 class LeagueResponse(LeagueBase):
   id: str = Field(..., description="League identifier")
-  bracket_generated_at: datetime | None = Field(default=None, description="Bracket generation timestamp")
-  created_at: datetime | None = Field(default=None, description="Creation timestamp")
+  bracket_generated_at: UtcDatetime | None = Field(default=None, description="Bracket generation timestamp")
+  created_at: UtcDatetime | None = Field(default=None, description="Creation timestamp")
   final_stage_mode: str | None = Field(default=None, description="Mode for the final stage")
+  swiss_rounds: int | None = Field(default=None, description="Rounds in the Swiss stage, if one was started")
+  swiss_round: int | None = Field(default=None, description="Current Swiss round")
 
   model_config = ConfigDict(from_attributes=True)
@@ -2,6 +2,8 @@ from datetime import datetime
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from api.schemas.common import UtcDatetime
+
 
 class LeagueMatchCreateRequest(BaseModel):
   admin_id: str = Field(..., description='Admin performing the action')
@@ -27,14 +29,15 @@ class LeagueMatchResponse(BaseModel):
   player_a: str
   player_b: str
   court: str
-  scheduled_at: datetime
+  court_id: int | None = None
+  scheduled_at: UtcDatetime
   status: str = 'scheduled'
   score_a: int | None = None
   score_b: int | None = None
   winner: str | None = None
-  completed_at: datetime | None = None
+  completed_at: UtcDatetime | None = None
   next_match_id: str | None = None
   next_match_slot: str | None = None
-  created_at: datetime | None = None
+  created_at: UtcDatetime | None = None
 
   model_config = ConfigDict(from_attributes=True)
@@ -1,7 +1,7 @@
-from datetime import datetime
-
 from pydantic import BaseModel, ConfigDict, Field
 
+from api.schemas.common import UtcDatetime
+
 
 EMAIL_PATTERN = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
 LEVEL_PATTERN = r'^(beginner|intermediate|advanced)$'
@@ -22,6 +22,8 @@ class MemberRoleUpdateRequest(BaseModel):
 
 class MemberResponse(MemberCreateRequest):
   id: str = Field(..., description='Member identifier')
-  joined_at: datetime | None = Field(default=None)
+  joined_at: UtcDatetime | None = Field(default=None)
+  rating: float | None = Field(default=None, description='Elo rating from completed doubles matches')
+  rated_matches: int = Field(default=0)
 
   model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class PlayerQualificationOdds(BaseModel):
+  member_id: str
+  player_name: str
+  group_number: int
+  wins: int
+  points_diff: int
+  points_for: int
+  remaining_matches: int
+  probability: float
+
+  model_config = ConfigDict(from_attributes=True)
+
+
+class QualificationOddsResponse(BaseModel):
+  top_n: int
+  model: str
+  simulations: int
+  remaining_matches: int
+  players: list[PlayerQualificationOdds]
+
+  model_config = ConfigDict(from_attributes=True)
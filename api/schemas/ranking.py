@@ -11,3 +11,4 @@ class PlayerRankingResponse(BaseModel):
   points_diff: int
   matches_played: int
   win_rate: float
+  rating: float | None = None
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, ConfigDict
+
+from api.schemas.common import UtcDatetime
+
+
+class RatingHistoryResponse(BaseModel):
+  match_id: str
+  rating: float
+  delta: float
+  recorded_at: UtcDatetime
+
+  model_config = ConfigDict(from_attributes=True)
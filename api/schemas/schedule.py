@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field, model_validator
+
+from api.schemas.common import UtcDatetime
+
+
+class FreeSlotResponse(BaseModel):
+  court: str
+  scheduled_at: UtcDatetime
+
+
+class ScheduleShiftRequest(BaseModel):
+  admin_id: str = Field(..., description='Admin performing the action')
+  minutes: int = Field(0, ge=-10080, le=10080, description='Minutes to move the matches by (negative: earlier)')
+  court: str | None = Field(None, max_length=40, description='Only matches on this court (default: all courts)')
+  start: datetime | None = Field(None, description='Only matches starting at or after this time')
+  end: datetime | None = Field(None, description='Only matches starting before this time')
+  to_court: str | None = Field(None, max_length=40, description='Court to move the matches to')
+
+  @model_validator(mode='after')
+  def validate_shift(cls, values: 'ScheduleShiftRequest') -> 'ScheduleShiftRequest':
+    if not values.minutes and values.to_court is None:
+      raise ValueError('minutes or to_court is required')
+    return values
@@ -0,0 +1,27 @@
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class SwissStartRequest(BaseModel):
+  admin_id: str = Field(..., description='Admin starting the Swiss stage')
+  format: Literal['doubles', 'singles'] = Field('doubles', description='Fixed doubles teams or individual players')
+  rounds: int | None = Field(None, ge=1, description='Number of rounds (default: ceil(log2(entrants)))')
+  courts_count: int | None = Field(None, ge=1, le=16, description='Number of courts to schedule on')
+
+
+class SwissStandingResponse(BaseModel):
+  id: int
+  name: str
+  seed: int
+  score: float
+  wins: int
+  losses: int
+  draws: int
+  points_for: int
+  points_against: int
+  points_diff: int
+  byes: int
+  matches_played: int
+
+  model_config = ConfigDict(from_attributes=True)
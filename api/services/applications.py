@@ -4,7 +4,9 @@ from fastapi import HTTPException, status
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from api.db.models import League, LeagueApplication, Member
+from api.cache.bus import publish_change
+from api.db.models import INACTIVE_APPLICATION_STATUSES, League, LeagueApplication, Member
+from api.observability.tracing import traced
 from api.schemas.application import (
   LeagueApplicationCreateRequest,
   LeagueApplicationListItem,
@@ -14,6 +16,7 @@ from api.schemas.application import (
 from api.services.brackets import LeagueBracketService
 
 
+@traced
 class LeagueApplicationService:
   def __init__(self, session: Session) -> None:
     self._session = session
@@ -42,8 +45,12 @@ class LeagueApplicationService:
     return results
 
   def _count_applications(self, league_id: str) -> int:
+    """Applications holding a place in the league (waitlisted and withdrawn ones do not)."""
     return self._session.execute(
-      select(func.count(LeagueApplication.id)).where(LeagueApplication.league_id == league_id)
+      select(func.count(LeagueApplication.id)).where(
+        LeagueApplication.league_id == league_id,
+        LeagueApplication.status.notin_(INACTIVE_APPLICATION_STATUSES)
+      )
     ).scalar_one()
 
   def create_application(self, league_id: str, payload: LeagueApplicationCreateRequest) -> LeagueApplicationResponse:
@@ -65,17 +72,20 @@ class LeagueApplicationService:
     if existing:
       raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail='Member already applied to this league')
 
+    # A full league takes further applicants onto the waitlist, which substitutes
+    # for withdrawn players (LeagueBracketService.withdraw_member).
     current_count = self._count_applications(league_id)
-    if current_count >= league.max_participants:
-      raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail='League capacity reached')
+    waitlisted = current_count >= league.max_participants
 
-    application = LeagueApplication(league_id=league_id, member_id=payload.member_id, status='pending')
+    application = LeagueApplication(
+      league_id=league_id, member_id=payload.member_id, status='waitlisted' if waitlisted else 'pending'
+    )
     self._session.add(application)
+    publish_change(self._session, league_id)
     self._session.commit()
-    self._session.refresh(application)
 
     total_after = current_count + 1
-    if total_after == league.max_participants and league.auto_generate_bracket:
+    if not waitlisted and total_after == league.max_participants and league.auto_generate_bracket:
       bracket_service = LeagueBracketService(self._session)
       bracket_service.generate_bracket(
         league_id=league_id,
@@ -95,17 +105,15 @@ class LeagueApplicationService:
     )
 
   def cancel_application(self, league_id: str, member_id: str) -> None:
-    """Cancel a league application. Only allowed if bracket hasn't been generated yet."""
+    """
+    Cancel a league application. Only allowed if bracket hasn't been generated
+    yet, or for a waitlisted application; players already in the bracket
+    withdraw instead.
+    """
     league = self._session.get(League, league_id)
     if not league:
       raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='League not found')
 
-    if league.bracket_generated_at is not None:
-      raise HTTPException(
-        status_code=status.HTTP_409_CONFLICT,
-        detail='Cannot cancel application after bracket has been generated'
-      )
-
     application = self._session.execute(
       select(LeagueApplication).where(
         LeagueApplication.league_id == league_id,
@@ -113,8 +121,15 @@ class LeagueApplicationService:
       )
     ).scalar_one_or_none()
 
+    if league.bracket_generated_at is not None and (application is None or application.status != 'waitlisted'):
+      raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail='Cannot cancel application after bracket has been generated'
+      )
+
     if not application:
       raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Application not found')
 
     self._session.delete(application)
+    publish_change(self._session, league_id)
     self._session.commit()
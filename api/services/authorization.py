@@ -0,0 +1,94 @@
+"""
+Admin authorization shared by every service.
+
+Admin checks used to load the member row on every call. ``AdminAuthorizer``
+keeps a small per-worker cache of ``member id -> is admin`` (bounded to
+``ADMIN_CACHE_MAX_ENTRIES``, each entry trusted for ``ADMIN_CACHE_TTL_SECONDS``),
+so bulk admin work such as batch scoring or rescheduling pays one lookup.
+Role changes publish a club-wide change event (see ``MemberService``), which
+clears the cache in this worker after commit and in the others on their next
+bus poll; the TTL bounds staleness if a poll is missed.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from api.cache.bus import add_change_listener
+from api.cache.store import ALL_LEAGUES, cache_requests
+from api.db.models import Member
+
+ADMIN_CACHE_TTL_SECONDS = float(os.environ.get('ADMIN_CACHE_TTL_SECONDS', '60'))
+ADMIN_CACHE_MAX_ENTRIES = int(os.environ.get('ADMIN_CACHE_MAX_ENTRIES', '256'))
+
+
+class AdminAuthorizer:
+  def __init__(self, ttl: float = ADMIN_CACHE_TTL_SECONDS, max_entries: int = ADMIN_CACHE_MAX_ENTRIES) -> None:
+    self._ttl = ttl
+    self._max_entries = max_entries
+    self._entries: OrderedDict[str, tuple[bool, float]] = OrderedDict()
+    self._generation = 0
+    self._lock = threading.Lock()
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  def cached(self, admin_id: str) -> bool | None:
+    """Cached role of ``admin_id``, or ``None`` if it has to be looked up."""
+    with self._lock:
+      entry = self._entries.get(admin_id)
+      if entry is None:
+        return None
+      is_admin, expires_at = entry
+      if expires_at <= time.monotonic():
+        del self._entries[admin_id]
+        return None
+      self._entries.move_to_end(admin_id)
+      return is_admin
+
+  def is_admin(self, session: Session, admin_id: str | None) -> bool:
+    if admin_id is None:
+      return False
+    cached = self.cached(admin_id)
+    if cached is not None:
+      cache_requests.inc('admins', 'hit')
+      return cached
+
+    cache_requests.inc('admins', 'miss')
+    with self._lock:
+      generation = self._generation
+    member = session.get(Member, admin_id)
+    is_admin = bool(member and member.role == 'admin')
+    if self._max_entries > 0:
+      with self._lock:
+        # A role change that raced with the lookup may have made it stale.
+        if generation == self._generation:
+          self._entries[admin_id] = (is_admin, time.monotonic() + self._ttl)
+          self._entries.move_to_end(admin_id)
+          while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+    return is_admin
+
+  def require_admin(self, session: Session, admin_id: str | None) -> None:
+    if not self.is_admin(session, admin_id):
+      raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Admin privileges required')
+
+  def invalidate(self, scope: str) -> None:
+    """Bus listener: roles only change together with a club-wide change event."""
+    if scope == ALL_LEAGUES:
+      self.clear()
+
+  def clear(self) -> None:
+    with self._lock:
+      self._generation += 1
+      self._entries.clear()
+
+
+admin_authorizer = AdminAuthorizer()
+add_change_listener(admin_authorizer.invalidate)
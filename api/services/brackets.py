@@ -1,79 +1,256 @@
+"""
+Preliminary bracket generation, previews, and in-place repair on withdrawal.
+
+Generation is split into a plan and a write. ``_plan`` reads the applicants,
+then distributes groups, pairs, and schedules entirely in memory, giving a
+``BracketPlan`` of plain ids and names. ``_persist`` replaces the league's
+matches with the plan, using one executemany insert per table.
+``generate_bracket`` does both steps. ``preview_bracket`` only plans: it
+draws a seed (unless given) for the snake draft and the pairing RNG and
+stores the plan as a ``bracket_previews`` row under a token, leaving the
+league's matches alone. ``commit_preview`` persists the stored plan as is,
+from any worker. A preview records the league's ``generation_seq`` and
+expires once another generation (a bracket, withdrawal, later stage) has
+bumped it, or once the league's active applicants differ from the plan's.
+An expired or unknown token gets a 404; regenerating with the returned seed
+gives the same random-mode bracket.
+"""
+
 from __future__ import annotations
 
+import random
+import zlib
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone, timedelta
 
 from fastapi import HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select
 from sqlalchemy.orm import Session
 
-from api.db.models import League, LeagueApplication, LeagueMatch, Member, MatchParticipant
+from api.cache.bus import publish_change
+from api.db.models import (
+  INACTIVE_APPLICATION_STATUSES,
+  BracketPreview,
+  League,
+  LeagueApplication,
+  LeagueMatch,
+  MatchParticipant,
+  Member,
+  SwissEntrant,
+  new_id
+)
+from api.observability.timing import phase
+from api.observability.tracing import traced
+from api.services.authorization import admin_authorizer
+from api.services.club_scheduler import ClubScheduler
 from api.services.matches import LeagueMatchService
 from api.services.doubles_pairing import DoublesPairingService
+from api.services.generation_guard import lock_league
+from api.services.pairing_optimizer import member_strength
+
+
+@dataclass
+class PlannedMatch:
+  group_number: int
+  team_a: tuple[str, ...]  # member ids
+  team_b: tuple[str, ...]
+  player_a: str
+  player_b: str
+  court: str
+  scheduled_at: datetime
+  court_id: int | None = None  # set when placed on a club court
+
 
+@dataclass
+class BracketPlan:
+  league_id: str
+  seed: int | None
+  groups_count: int
+  courts_count: int
+  pairing_mode: str
+  group_mode: str
+  member_ids: list[str]
+  matches: list[PlannedMatch]
+  starts_at: datetime
+  token: str = field(default_factory=new_id)
 
+  def to_json(self) -> dict:
+    data = asdict(self)
+    data['starts_at'] = self.starts_at.isoformat()
+    for planned in data['matches']:
+      planned['scheduled_at'] = planned['scheduled_at'].isoformat()
+    return data
+
+  @classmethod
+  def from_json(cls, data: dict) -> BracketPlan:
+    matches = [
+      PlannedMatch(**{
+        **planned,
+        'team_a': tuple(planned['team_a']),
+        'team_b': tuple(planned['team_b']),
+        'scheduled_at': datetime.fromisoformat(planned['scheduled_at'])
+      })
+      for planned in data['matches']
+    ]
+    return cls(**{**data, 'matches': matches, 'starts_at': datetime.fromisoformat(data['starts_at'])})
+
+
+@traced
 class LeagueBracketService:
   def __init__(self, session: Session) -> None:
     self._session = session
 
-  def _require_admin(self, admin_id: str | None) -> Member | None:
-    if admin_id is None:
-      raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Admin privileges required')
-    admin = self._session.get(Member, admin_id)
-    if not admin or admin.role != 'admin':
-      raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Admin privileges required')
-    return admin
-
   def generate_bracket(
     self,
     league_id: str,
     admin_id: str | None,
     groups_count: int,
     courts_count: int,
-    skip_admin_check: bool = False
+    skip_admin_check: bool = False,
+    pairing_mode: str | None = None,
+    group_mode: str | None = None,
+    seed: int | None = None,
+    keep_apart: list[tuple[str, str]] | None = None,
+    max_per_level: int | None = None
   ) -> list[LeagueMatch]:
     """
-    Generate preliminary doubles bracket with random pairing.
-    Each player plays 3 matches with different partners.
+    Generate preliminary doubles bracket.
+    Each player plays 3 matches with different partners; pairing_mode
+    (default: the league's) is 'random' or skill-'balanced'.
+    group_mode (default: the league's) deals groups in application order or
+    by snake draft; the draft is seeded from the league id unless seed is
+    given, so regenerating a league's bracket gives the same groups. An
+    explicit seed also seeds the pairing, making the whole bracket repeatable.
     """
-    league = self._session.get(League, league_id)
-    if not league:
-      raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='League not found')
+    with phase('db'):
+      league = self._session.get(League, league_id)
+      if not league:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='League not found')
 
-    if not skip_admin_check:
-      self._require_admin(admin_id)
+      if not skip_admin_check:
+        admin_authorizer.require_admin(self._session, admin_id)
+      league = lock_league(self._session, league_id)
 
-    groups = max(1, groups_count)
-    courts = max(1, courts_count)
+    plan = self._plan(league, groups_count, courts_count, pairing_mode, group_mode, seed, keep_apart, max_per_level)
+    return self._persist(league, plan)
 
-    # Get all applications
-    applications = self._session.execute(
-      select(LeagueApplication)
-      .where(LeagueApplication.league_id == league_id)
-      .order_by(LeagueApplication.applied_at.asc())
-    ).scalars().all()
+  def preview_bracket(
+    self,
+    league_id: str,
+    admin_id: str | None,
+    groups_count: int,
+    courts_count: int,
+    pairing_mode: str | None = None,
+    group_mode: str | None = None,
+    seed: int | None = None,
+    keep_apart: list[tuple[str, str]] | None = None,
+    max_per_level: int | None = None
+  ) -> BracketPlan:
+    """Plan a bracket like generate_bracket and store the plan under its token; no matches are written."""
+    with phase('db'):
+      league = self._session.get(League, league_id)
+      if not league:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='League not found')
+      admin_authorizer.require_admin(self._session, admin_id)
+
+    if seed is None:
+      seed = random.getrandbits(32)
+    plan = self._plan(league, groups_count, courts_count, pairing_mode, group_mode, seed, keep_apart, max_per_level)
+    with phase('persist'):
+      # Previews of earlier generations can no longer be committed.
+      self._session.execute(
+        delete(BracketPreview).where(
+          BracketPreview.league_id == league_id,
+          BracketPreview.generation_seq != league.generation_seq
+        )
+      )
+      self._session.add(BracketPreview(
+        token=plan.token, league_id=league_id, generation_seq=league.generation_seq, plan=plan.to_json()
+      ))
+    with phase('commit'):
+      self._session.commit()
+    return plan
 
-    if len(applications) == 0:
-      raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='No applicants available for bracket generation')
+  def commit_preview(self, league_id: str, admin_id: str | None, token: str) -> list[LeagueMatch]:
+    """Persist a stored preview as the league's bracket, without recomputing it."""
+    with phase('db'):
+      league = self._session.get(League, league_id)
+      if not league:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='League not found')
+      admin_authorizer.require_admin(self._session, admin_id)
+      league = lock_league(self._session, league_id)
 
-    # Get Member objects
-    members = [app.member for app in applications if app.member]
+      preview = self._session.get(BracketPreview, token)
+      # lock_league bumped generation_seq once; any other bump since the preview means a newer generation.
+      fresh = preview is not None and preview.league_id == league_id and preview.generation_seq == league.generation_seq - 1
+      plan = BracketPlan.from_json(preview.plan) if fresh else None
+      if plan is not None:
+        applicants = self._session.execute(
+          select(LeagueApplication.member_id).where(
+            LeagueApplication.league_id == league_id,
+            LeagueApplication.status.notin_(INACTIVE_APPLICATION_STATUSES)
+          )
+        ).scalars().all()
+        if set(applicants) != set(plan.member_ids):
+          plan = None
+    if plan is None:
+      raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail='Preview not found or expired; preview the bracket again'
+      )
+    self._session.execute(delete(BracketPreview).where(BracketPreview.league_id == league_id))
+    if any(planned.court_id is not None for planned in plan.matches):
+      # Other leagues may have booked club courts since the preview; same inputs give the same times.
+      self._place_on_club_courts(league_id, plan.matches, max(plan.starts_at, datetime.now(timezone.utc)))
+    return self._persist(league, plan)
 
-    if len(members) < 4:
-      raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Need at least 4 members for doubles')
+  def _plan(
+    self,
+    league: League,
+    groups_count: int,
+    courts_count: int,
+    pairing_mode: str | None,
+    group_mode: str | None,
+    seed: int | None,
+    keep_apart: list[tuple[str, str]] | None,
+    max_per_level: int | None
+  ) -> BracketPlan:
+    with phase('db'):
+      groups = max(1, groups_count)
+      courts = max(1, courts_count)
+      pairing_mode = pairing_mode or league.pairing_mode
+      group_mode = group_mode or league.group_mode
+      rng = random.Random(seed) if seed is not None else None
+      draft_seed = seed if seed is not None else zlib.crc32(league.id.encode())
 
-    # Update application status
-    for application in applications:
-      application.status = 'scheduled'
+      # Get all applications
+      applications = self._session.execute(
+        select(LeagueApplication)
+        .where(
+          LeagueApplication.league_id == league.id,
+          LeagueApplication.status.notin_(INACTIVE_APPLICATION_STATUSES)
+        )
+        .order_by(LeagueApplication.applied_at.asc())
+      ).scalars().all()
+
+      if len(applications) == 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='No applicants available for bracket generation')
 
-    # Delete existing matches
-    self._session.query(LeagueMatch).filter(LeagueMatch.league_id == league_id).delete()
-    league.final_stage_mode = None
+      # Get Member objects
+      members = [app.member for app in applications if app.member]
+
+      if len(members) < 4:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Need at least 4 members for doubles')
 
     # Distribute members into groups
     pairing_service = DoublesPairingService()
-    group_members = pairing_service.distribute_to_groups(members, groups)
+    with phase('pairing'):
+      group_members = pairing_service.distribute_to_groups(
+        members, groups, mode=group_mode, seed=draft_seed, keep_apart=keep_apart or (), max_per_level=max_per_level
+      )
 
-    matches: list[LeagueMatch] = []
+    matches: list[PlannedMatch] = []
     base_time = datetime.now(timezone.utc) + timedelta(days=1)
 
     # Generate preliminary matches for each group
@@ -81,47 +258,301 @@ class LeagueBracketService:
       if len(group_member_list) < 4:
         continue  # Skip groups with insufficient members
 
-      # Generate random pairs (3 matches per player)
-      group_matches = pairing_service.generate_preliminary_pairs(
-        group_member_list,
-        matches_per_player=3
-      )
+      # Generate pairs (3 matches per player)
+      with phase('pairing'):
+        if pairing_mode == 'balanced':
+          group_matches = pairing_service.generate_balanced_pairs(group_member_list, matches_per_player=3, rng=rng)
+        else:
+          group_matches = pairing_service.generate_preliminary_pairs(
+            group_member_list,
+            matches_per_player=3,
+            rng=rng
+          )
+
+      with phase('schedule'):
+        for (p1, p2), (p3, p4) in group_matches:
+          court_number = (len(matches) % courts) + 1
+          matches.append(PlannedMatch(
+            group_number=group_index,
+            team_a=(p1.id, p2.id),
+            team_b=(p3.id, p4.id),
+            player_a=f"{p1.full_name}, {p2.full_name}",
+            player_b=f"{p3.full_name}, {p4.full_name}",
+            court=f'Court {court_number}',
+            scheduled_at=base_time + timedelta(hours=len(matches) // courts)
+          ))
+
+    self._place_on_club_courts(league.id, matches, base_time)
+    return BracketPlan(
+      league_id=league.id,
+      seed=seed,
+      groups_count=groups,
+      courts_count=courts,
+      pairing_mode=pairing_mode,
+      group_mode=group_mode,
+      member_ids=[member.id for member in members],
+      matches=matches,
+      starts_at=base_time
+    )
+
+  def _place_on_club_courts(self, league_id: str, matches: list[PlannedMatch], earliest: datetime) -> None:
+    """Move planned matches onto the club's courts around other leagues' bookings, if the club has courts."""
+    placements = ClubScheduler(self._session).place_requests(
+      [(1, planned.team_a + planned.team_b) for planned in matches], earliest, exclude_league=league_id
+    )
+    for planned, placement in zip(matches, placements or ()):
+      planned.court = placement.court
+      planned.court_id = placement.court_id
+      planned.scheduled_at = placement.scheduled_at
 
-      # Create LeagueMatch entries
-      for match_idx, ((p1, p2), (p3, p4)) in enumerate(group_matches):
-        court_number = (len(matches) % courts) + 1
-        scheduled_at = base_time + timedelta(hours=len(matches) // courts)
-
-        team_a_display = f"{p1.full_name}, {p2.full_name}"
-        team_b_display = f"{p3.full_name}, {p4.full_name}"
-
-        match = LeagueMatch(
-          league_id=league_id,
-          round=1,
-          group_number=group_index,
-          player_a=team_a_display,
-          player_b=team_b_display,
-          court=f'Court {court_number}',
-          scheduled_at=scheduled_at,
-          status='scheduled'
+  def _persist(self, league: League, plan: BracketPlan) -> list[LeagueMatch]:
+    """Replace the league's matches with the plan: one executemany insert per table."""
+    with phase('db'):
+      # Update application status
+      applications = self._session.execute(
+        select(LeagueApplication).where(
+          LeagueApplication.league_id == league.id,
+          LeagueApplication.member_id.in_(plan.member_ids)
         )
-        self._session.add(match)
-        self._session.flush()  # Get match ID
-
-        # Add participants
-        participants = [
-          MatchParticipant(match_id=match.id, member_id=p1.id, team='team_a'),
-          MatchParticipant(match_id=match.id, member_id=p2.id, team='team_a'),
-          MatchParticipant(match_id=match.id, member_id=p3.id, team='team_b'),
-          MatchParticipant(match_id=match.id, member_id=p4.id, team='team_b'),
-        ]
-        for participant in participants:
-          self._session.add(participant)
+      ).scalars().all()
+      for application in applications:
+        application.status = 'scheduled'
+
+      # Delete existing matches
+      self._session.query(LeagueMatch).filter(LeagueMatch.league_id == league.id).delete()
+      league.final_stage_mode = None
 
-        matches.append(match)
+    match_rows: list[dict] = []
+    participant_rows: list[dict] = []
+    for planned in plan.matches:
+      match_id = new_id()
+      match_rows.append({
+        'id': match_id,
+        'league_id': league.id,
+        'round': 1,
+        'group_number': planned.group_number,
+        'stage': 'preliminary',
+        'player_a': planned.player_a[:80],
+        'player_b': planned.player_b[:80],
+        'court': planned.court,
+        'court_id': planned.court_id,
+        'scheduled_at': planned.scheduled_at,
+        'status': 'scheduled'
+      })
+      for team, member_ids in (('team_a', planned.team_a), ('team_b', planned.team_b)):
+        participant_rows.extend(
+          {'id': new_id(), 'match_id': match_id, 'member_id': member_id, 'team': team} for member_id in member_ids
+        )
 
-    league.groups_count = groups
-    league.courts_count = courts
+    league.groups_count = plan.groups_count
+    league.courts_count = plan.courts_count
+    league.pairing_mode = plan.pairing_mode
+    league.group_mode = plan.group_mode
     league.bracket_generated_at = datetime.utcnow().replace(tzinfo=timezone.utc)
-    self._session.commit()
-    return matches
+    publish_change(self._session, league.id)
+    with phase('persist'):
+      self._session.flush()
+      if match_rows:
+        self._session.execute(insert(LeagueMatch.__table__), match_rows)
+        self._session.execute(insert(MatchParticipant.__table__), participant_rows)
+    with phase('commit'):
+      self._session.commit()
+    with phase('db'):
+      matches = self._session.execute(
+        select(LeagueMatch).where(LeagueMatch.league_id == league.id)
+      ).scalars().all()
+    order = {row['id']: position for position, row in enumerate(match_rows)}
+    return sorted(matches, key=lambda match: order[match.id])
+
+  def withdraw_member(
+    self,
+    league_id: str,
+    admin_id: str | None,
+    member_id: str,
+    substitute_id: str | None = None
+  ) -> list[LeagueMatch]:
+    """
+    Take a member out of a generated bracket without regenerating it.
+
+    Only the member's unplayed (scheduled) matches are rewritten, so completed
+    scores stay. A substitute (substitute_id, else the earliest waitlisted
+    applicant) takes the member's place in each of them. Without one, each
+    preliminary match goes to the group member who has played the fewest
+    matches, is free at that time, is not in it already and has not partnered
+    the withdrawn member's partner before; a match nobody can fill is dropped.
+    Returns the rewritten matches.
+    """
+    with phase('db'):
+      league = self._session.get(League, league_id)
+      if not league:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='League not found')
+      admin_authorizer.require_admin(self._session, admin_id)
+      league = lock_league(self._session, league_id)
+      if league.bracket_generated_at is None:
+        raise HTTPException(
+          status_code=status.HTTP_409_CONFLICT,
+          detail='Bracket has not been generated; cancel the application instead'
+        )
+
+      application = self._application(league_id, member_id)
+      if application is None or application.status == 'withdrawn':
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Application not found')
+
+      open_matches = self._session.execute(
+        select(LeagueMatch)
+        .join(MatchParticipant, MatchParticipant.match_id == LeagueMatch.id)
+        .where(
+          LeagueMatch.league_id == league_id,
+          LeagueMatch.status == 'scheduled',
+          MatchParticipant.member_id == member_id
+        )
+        .order_by(LeagueMatch.scheduled_at.asc())
+      ).scalars().all()
+      was_waitlisted = application.status == 'waitlisted'
+      substitute = None
+      if open_matches and not was_waitlisted:
+        substitute = self._substitute(league_id, substitute_id, member_id)
+      if substitute is None and any(match.stage != 'preliminary' for match in open_matches):
+        raise HTTPException(
+          status_code=status.HTTP_409_CONFLICT,
+          detail='A substitute is needed to replace a player outside the preliminary round'
+        )
+
+    application.status = 'withdrawn'
+    with phase('pairing'):
+      if substitute is not None:
+        rewritten = self._substitute_into(league_id, open_matches, member_id, substitute)
+      else:
+        rewritten = self._rebalance(league_id, open_matches, member_id)
+    for match in rewritten:
+      match.player_a, match.player_b = (
+        ', '.join(p.member.full_name for p in match.participants if p.team == team)[:80]
+        for team in ('team_a', 'team_b')
+      )
+
+    publish_change(self._session, league_id)
+    with phase('persist'):
+      self._session.flush()
+    with phase('commit'):
+      self._session.commit()
+    return rewritten
+
+  def _application(self, league_id: str, member_id: str) -> LeagueApplication | None:
+    return self._session.execute(
+      select(LeagueApplication).where(
+        LeagueApplication.league_id == league_id,
+        LeagueApplication.member_id == member_id
+      )
+    ).scalar_one_or_none()
+
+  def _substitute(self, league_id: str, substitute_id: str | None, member_id: str) -> Member | None:
+    """The requested substitute (waitlisted or without an application) or the earliest waitlisted applicant, marked as scheduled."""
+    if substitute_id is None:
+      application = self._session.execute(
+        select(LeagueApplication)
+        .where(LeagueApplication.league_id == league_id, LeagueApplication.status == 'waitlisted')
+        .order_by(LeagueApplication.applied_at.asc())
+        .limit(1)
+      ).scalar_one_or_none()
+      if application is None or application.member_id == member_id:
+        return None
+    else:
+      member = self._session.get(Member, substitute_id)
+      if member is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Substitute not found')
+      application = self._application(league_id, substitute_id)
+      if application is None:
+        application = LeagueApplication(league_id=league_id, member_id=substitute_id)
+        self._session.add(application)
+      elif substitute_id == member_id or application.status != 'waitlisted':
+        # A withdrawn member may still have played (and partnered) in the bracket.
+        raise HTTPException(
+          status_code=status.HTTP_409_CONFLICT,
+          detail='Substitute must be waitlisted or new to this league'
+        )
+    application.status = 'scheduled'
+    return application.member or self._session.get(Member, application.member_id)
+
+  def _substitute_into(
+    self,
+    league_id: str,
+    matches: list[LeagueMatch],
+    member_id: str,
+    substitute: Member
+  ) -> list[LeagueMatch]:
+    # The substitute has no partners yet, so taking over every slot keeps partners unique.
+    for match in matches:
+      for participant in match.participants:
+        if participant.member_id == member_id:
+          participant.member = substitute
+
+    entrants = self._session.execute(
+      select(SwissEntrant).where(
+        SwissEntrant.league_id == league_id,
+        (SwissEntrant.member_a_id == member_id) | (SwissEntrant.member_b_id == member_id)
+      )
+    ).scalars().all()
+    for entrant in entrants:
+      if entrant.member_a_id == member_id:
+        entrant.member_a_id = substitute.id
+      else:
+        entrant.member_b_id = substitute.id
+      entrant.name = ', '.join(
+        self._session.get(Member, entrant_member).full_name
+        for entrant_member in (entrant.member_a_id, entrant.member_b_id) if entrant_member
+      )
+    return list(matches)
+
+  def _rebalance(self, league_id: str, matches: list[LeagueMatch], member_id: str) -> list[LeagueMatch]:
+    rewritten: list[LeagueMatch] = []
+    for group_number in sorted({match.group_number for match in matches}):
+      group_matches = self._session.execute(
+        select(LeagueMatch).where(
+          LeagueMatch.league_id == league_id,
+          LeagueMatch.stage == 'preliminary',
+          LeagueMatch.group_number == group_number
+        )
+      ).scalars().all()
+
+      # Load, partners and booked times per group member, from every match in the group.
+      members: dict[str, Member] = {}
+      played: defaultdict[str, int] = defaultdict(int)
+      partners: defaultdict[str, set[str]] = defaultdict(set)
+      busy: defaultdict[str, set[datetime]] = defaultdict(set)
+      for match in group_matches:
+        for participant in match.participants:
+          members[participant.member_id] = participant.member
+          played[participant.member_id] += 1
+          busy[participant.member_id].add(match.scheduled_at)
+          partners[participant.member_id].update(
+            other.member_id for other in match.participants
+            if other.team == participant.team and other.member_id != participant.member_id
+          )
+      withdrawn = members.pop(member_id, None)
+      strength = member_strength(withdrawn) if withdrawn else 0.0
+
+      for match in (match for match in matches if match.group_number == group_number):
+        slot = next(participant for participant in match.participants if participant.member_id == member_id)
+        partner_ids = {p.member_id for p in match.participants if p.team == slot.team and p is not slot}
+        in_match = {p.member_id for p in match.participants}
+        candidates = [
+          candidate for candidate_id, candidate in members.items()
+          if candidate_id not in in_match
+          and match.scheduled_at not in busy[candidate_id]
+          and not partner_ids & partners[candidate_id]
+        ]
+        if not candidates:
+          self._session.delete(match)
+          continue
+        chosen = min(
+          candidates,
+          key=lambda candidate: (played[candidate.id], abs(member_strength(candidate) - strength), candidate.id)
+        )
+        slot.member = chosen
+        played[chosen.id] += 1
+        busy[chosen.id].add(match.scheduled_at)
+        partners[chosen.id].update(partner_ids)
+        for partner_id in partner_ids:
+          partners[partner_id].add(chosen.id)
+        rewritten.append(match)
+    return rewritten
@@ -0,0 +1,275 @@
+"""
+Placement of matches from every league onto the club's shared courts.
+
+Leagues used to number their own courts ("Court 1".."Court n") and start at
+an arbitrary hour, so two leagues could book the same real court at the same
+time. Once the club registers its ``Court`` rows, generators ask
+``ClubScheduler`` for times instead: it loads the matches every league
+already has from the requested start onwards into a ``ScheduleIndex`` (one
+timeline per court and per member, so a player in two leagues is never
+double-booked either) and places the new matches greedily, earliest fit
+first, in match-length slots inside each court's ``CourtAvailability``
+windows (``CLUB_COURT_HOURS`` every day for a court without windows).
+
+Existing matches never move. A new round is inserted around them, which is
+what keeps incremental generation (the next Swiss round, a final stage)
+cheap: slots are generated lazily day by day, a slot whose court turns out
+to be booked is marked and skipped for good, and a pointer to the first
+open slot skips the booked past. Matches of a later round start after the
+last match of the round before ends, including the league's rounds already
+on the calendar.
+
+Without courts the club keeps the old behaviour (``place_requests`` returns
+None). Two generations for different leagues running at the same moment in
+different workers can still pick the same slot; the edit-time check in
+``ScheduleService`` rejects moves onto a booked club court either way.
+"""
+
+from __future__ import annotations
+
+import os
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Sequence
+from zoneinfo import ZoneInfo
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
+
+from api.db.models import Court, LeagueMatch, MatchParticipant
+from api.observability.timing import phase
+from api.observability.tracing import traced
+from api.services.scheduling import MATCH_DURATION_MINUTES, ScheduleIndex, _timestamp
+
+CLUB_TIMEZONE = os.environ.get('CLUB_TIMEZONE', 'Asia/Seoul')
+CLUB_COURT_HOURS = os.environ.get('CLUB_COURT_HOURS', '07:00-22:00')
+CLUB_SCHEDULE_HORIZON_DAYS = int(os.environ.get('CLUB_SCHEDULE_HORIZON_DAYS', '180'))
+
+
+def parse_hours(value: str) -> tuple[int, int]:
+  """'HH:MM-HH:MM' to minutes since midnight."""
+  opens, closes = (part.strip().split(':') for part in value.split('-'))
+  return int(opens[0]) * 60 + int(opens[1]), int(closes[0]) * 60 + int(closes[1])
+
+
+@dataclass(frozen=True)
+class CourtHours:
+  court_id: int
+  name: str
+  windows: dict[int, list[tuple[int, int]]]  # weekday (0 = Monday) -> [(opens, closes)] in minutes
+
+  @classmethod
+  def of(cls, court: Court, default: tuple[int, int] | None = None) -> CourtHours:
+    windows: dict[int, list[tuple[int, int]]] = {}
+    for window in court.availability:
+      windows.setdefault(window.weekday, []).append((window.opens_at, window.closes_at))
+    if not court.availability:
+      default = default or parse_hours(CLUB_COURT_HOURS)
+      windows = {weekday: [default] for weekday in range(7)}
+    return cls(court_id=court.id, name=court.name, windows={day: sorted(spans) for day, spans in windows.items()})
+
+
+@dataclass
+class Placement:
+  court_id: int
+  court: str
+  scheduled_at: datetime
+
+
+class ClubCalendar:
+  """Booked club time plus the open slots of each court, generated a day at a time."""
+
+  def __init__(
+    self,
+    courts: Sequence[CourtHours],
+    start: datetime,
+    duration: timedelta = timedelta(minutes=MATCH_DURATION_MINUTES),
+    horizon_days: int = CLUB_SCHEDULE_HORIZON_DAYS,
+    zone: str = CLUB_TIMEZONE
+  ) -> None:
+    self.index = ScheduleIndex(duration)
+    self.duration = duration
+    self._courts = list(courts)
+    self._zone = ZoneInfo(zone)
+    self._next_day = _as_utc(start).astimezone(self._zone).date()
+    self._last_day = self._next_day + timedelta(days=horizon_days)
+    self._slots: list[tuple[int, int]] = []  # (start timestamp, court position), sorted
+    self._starts: list[int] = []
+    self._taken: list[bool] = []
+    self._first_open = 0
+
+  def __len__(self) -> int:
+    return len(self.index)
+
+  def book(self, match_id: str, court_id: int | None, scheduled_at: datetime, member_ids: Iterable[str]) -> None:
+    """Record an existing match; one without a club court only books its players."""
+    self.index.place(match_id, _court_key(court_id) if court_id is not None else None, scheduled_at, member_ids)
+
+  def place(self, member_ids: Sequence[str], not_before: datetime, match_id: str | None = None) -> Placement | None:
+    """Book the earliest slot from not_before where the court and all the players are free."""
+    start = _timestamp(not_before)
+    while not self._starts or self._starts[-1] < start:
+      if not self._extend():
+        return None
+    position = max(bisect_left(self._starts, start), self._first_open)
+    while True:
+      while position >= len(self._slots):
+        if not self._extend():
+          return None
+      if not self._taken[position]:
+        timestamp, court_position = self._slots[position]
+        court = self._courts[court_position]
+        scheduled_at = datetime.fromtimestamp(timestamp, timezone.utc)
+        if self.index.conflicts(_court_key(court.court_id), scheduled_at):
+          self._taken[position] = True  # bookings only grow: the slot stays taken
+        elif not member_ids or not self.index.conflicts(None, scheduled_at, member_ids):
+          self._taken[position] = True
+          self.index.place(match_id or f'new:{position}', _court_key(court.court_id), scheduled_at, member_ids)
+          while self._first_open < len(self._taken) and self._taken[self._first_open]:
+            self._first_open += 1
+          return Placement(court_id=court.court_id, court=court.name, scheduled_at=scheduled_at)
+      position += 1
+
+  def place_rounds(
+    self,
+    requests: Sequence[tuple[int, Sequence[str]]],
+    not_before: datetime
+  ) -> list[Placement] | None:
+    """Place (round, member ids) requests in order; a round starts once the previous one has ended."""
+    placements: list[Placement | None] = [None] * len(requests)
+    floor = ended = _as_utc(not_before)
+    current_round: int | None = None
+    for position in sorted(range(len(requests)), key=lambda position: requests[position][0]):
+      round_number, member_ids = requests[position]
+      if round_number != current_round:
+        floor, current_round = max(floor, ended), round_number
+      placement = self.place(member_ids, floor)
+      if placement is None:
+        return None
+      placements[position] = placement
+      ended = max(ended, placement.scheduled_at + self.duration)
+    return placements
+
+  def _extend(self) -> bool:
+    """Append the next day's slots; False past the horizon."""
+    day = self._next_day
+    if day > self._last_day:
+      return False
+    self._next_day = day + timedelta(days=1)
+    step = int(self.duration.total_seconds() // 60)
+    midnight = datetime(day.year, day.month, day.day, tzinfo=self._zone)
+    slots = []
+    for court_position, court in enumerate(self._courts):
+      for opens, closes in court.windows.get(day.weekday(), ()):
+        for minute in range(opens, closes - step + 1, step):
+          slots.append((int((midnight + timedelta(minutes=minute)).timestamp()), court_position))
+    slots.sort()
+    self._slots.extend(slots)
+    self._starts.extend(timestamp for timestamp, _ in slots)
+    self._taken.extend([False] * len(slots))
+    return True
+
+
+def _court_key(court_id: int) -> str:
+  return f'court:{court_id}'
+
+
+def _as_utc(value: datetime) -> datetime:
+  return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+@traced
+class ClubScheduler:
+  def __init__(self, session: Session) -> None:
+    self._session = session
+
+  def calendar(
+    self,
+    earliest: datetime,
+    exclude_league: str | None = None,
+    exclude_matches: Iterable[str] = ()
+  ) -> ClubCalendar | None:
+    """The club's active courts and every match booked from earliest on, or None if it has no courts."""
+    with phase('db'):
+      courts = self._session.execute(
+        select(Court).where(Court.active.is_(True)).options(selectinload(Court.availability)).order_by(Court.id)
+      ).scalars().all()
+      if not courts:
+        return None
+
+      calendar = ClubCalendar([CourtHours.of(court) for court in courts], earliest)
+      conditions = [LeagueMatch.scheduled_at > _as_utc(earliest) - calendar.duration]
+      if exclude_league is not None:
+        conditions.append(LeagueMatch.league_id != exclude_league)
+      exclude_matches = list(exclude_matches)
+      if exclude_matches:
+        conditions.append(LeagueMatch.id.notin_(exclude_matches))
+      rows = self._session.execute(
+        select(LeagueMatch.id, LeagueMatch.court_id, LeagueMatch.scheduled_at).where(*conditions)
+      ).all()
+      members: dict[str, list[str]] = {}
+      for match_id, member_id in self._session.execute(
+        select(MatchParticipant.match_id, MatchParticipant.member_id)
+        .join(LeagueMatch, LeagueMatch.id == MatchParticipant.match_id)
+        .where(*conditions)
+      ):
+        members.setdefault(match_id, []).append(member_id)
+
+    with phase('schedule'):
+      for match_id, court_id, scheduled_at in rows:
+        calendar.book(match_id, court_id, scheduled_at, members.get(match_id, ()))
+    return calendar
+
+  def place_requests(
+    self,
+    requests: Sequence[tuple[int, Sequence[str]]],
+    earliest: datetime,
+    exclude_league: str | None = None,
+    exclude_matches: Iterable[str] = ()
+  ) -> list[Placement] | None:
+    """Club court and time for each (round, member ids) request; None if the club has no courts."""
+    calendar = self.calendar(earliest, exclude_league, exclude_matches)
+    if calendar is None:
+      return None
+    with phase('schedule'):
+      placements = calendar.place_rounds(requests, earliest)
+    if placements is None:
+      raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f'No free club court time for all matches within {CLUB_SCHEDULE_HORIZON_DAYS} days'
+      )
+    return placements
+
+  def place_matches(self, matches: Sequence[LeagueMatch], earliest: datetime) -> None:
+    """Move freshly generated (pending) matches of one league onto club courts, after its earlier rounds."""
+    if not matches:
+      return
+    with phase('persist'):
+      self._session.flush()
+    ids = [match.id for match in matches]
+    members: dict[str, list[str]] = {match_id: [] for match_id in ids}
+    with phase('db'):
+      previous = self._session.execute(
+        select(func.max(LeagueMatch.scheduled_at)).where(
+          LeagueMatch.league_id == matches[0].league_id,
+          LeagueMatch.round < min(match.round for match in matches),
+          LeagueMatch.id.notin_(ids)
+        )
+      ).scalar_one_or_none()
+      if previous is not None:
+        earliest = max(_as_utc(earliest), _as_utc(previous) + timedelta(minutes=MATCH_DURATION_MINUTES))
+      for match_id, member_id in self._session.execute(
+        select(MatchParticipant.match_id, MatchParticipant.member_id).where(MatchParticipant.match_id.in_(ids))
+      ):
+        members[match_id].append(member_id)
+    placements = self.place_requests(
+      [(match.round, members[match.id]) for match in matches], earliest, exclude_matches=ids
+    )
+    if placements is None:
+      return
+    for match, placement in zip(matches, placements):
+      match.court = placement.court
+      match.court_id = placement.court_id
+      match.scheduled_at = placement.scheduled_at
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from api.cache.bus import publish_change
+from api.db.models import Court, CourtAvailability
+from api.observability.tracing import traced
+from api.schemas.court import CourtAvailabilityWindow, CourtCreateRequest, CourtResponse
+from api.services.authorization import admin_authorizer
+
+
+def _minutes(value: str) -> int:
+  hours, minutes = value.split(':')
+  return int(hours) * 60 + int(minutes)
+
+
+def _clock(minutes: int) -> str:
+  return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+
+def _response(court: Court) -> CourtResponse:
+  return CourtResponse(
+    id=court.id,
+    name=court.name,
+    surface_type=court.surface_type,
+    active=court.active,
+    availability=[
+      CourtAvailabilityWindow(weekday=window.weekday, opens_at=_clock(window.opens_at), closes_at=_clock(window.closes_at))
+      for window in court.availability
+    ]
+  )
+
+
+@traced
+class CourtService:
+  def __init__(self, session: Session) -> None:
+    self._session = session
+
+  def list_courts(self) -> list[CourtResponse]:
+    courts = self._session.execute(
+      select(Court).options(selectinload(Court.availability)).order_by(Court.id)
+    ).scalars().all()
+    return [_response(court) for court in courts]
+
+  def create_court(self, payload: CourtCreateRequest) -> CourtResponse:
+    admin_authorizer.require_admin(self._session, payload.admin_id)
+    existing = self._session.execute(select(Court).where(Court.name == payload.name)).scalar_one_or_none()
+    if existing:
+      raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail='Court name already exists')
+
+    court = Court(
+      name=payload.name,
+      surface_type=payload.surface_type,
+      active=True,
+      availability=[
+        CourtAvailability(weekday=window.weekday, opens_at=_minutes(window.opens_at), closes_at=_minutes(window.closes_at))
+        for window in payload.availability
+      ]
+    )
+    self._session.add(court)
+    # Every league schedules onto the club's courts from now on.
+    publish_change(self._session, None)
+    self._session.commit()
+    return _response(court)
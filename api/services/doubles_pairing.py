@@ -4,24 +4,32 @@ Doubles pairing service for tournament bracket generation.
 Handles:
 1. Random pairing for preliminary rounds (no duplicate partners)
 2. Rank-based pairing for tournament rounds (adjacent ranks team up)
+3. Skill-balanced pairing for preliminary rounds (see ``pairing_optimizer``)
+4. Group distribution in application order or by snake draft on skill
 """
 
 from __future__ import annotations
 
 import random
-from typing import List, Tuple
-from collections import defaultdict
+from typing import Iterable, List, Tuple
+from collections import Counter, defaultdict
 
 from api.db.models import Member
+from api.observability.tracing import traced
+from api.services.pairing_optimizer import PAIRING_TIME_BUDGET_MS, balanced_pairs, member_strength
 
+LEVEL_RANKS = {'beginner': 0, 'intermediate': 1, 'advanced': 2}
 
+
+@traced
 class DoublesPairingService:
   """Service for generating doubles pairs in tournaments."""
 
   @staticmethod
   def generate_preliminary_pairs(
     members: List[Member],
-    matches_per_player: int = 3
+    matches_per_player: int = 3,
+    rng: random.Random | None = None
   ) -> List[Tuple[Tuple[Member, Member], Tuple[Member, Member]]]:
     """
     Generate doubles pairs for preliminary rounds.
@@ -31,6 +39,7 @@ class DoublesPairingService:
     - No player should partner with the same person twice
     - Pairs are random but avoid duplicates
     - For 3 courts with 16 players: generates 12 matches total (3 matches * 4 players per court)
+    - Shuffles with rng when given (reproducible), else the global random module
 
     Returns:
       List of matches, where each match is ((player1, player2), (player3, player4))
@@ -59,7 +68,7 @@ class DoublesPairingService:
         break
 
       # Shuffle and try to create a match
-      random.shuffle(available)
+      (rng or random).shuffle(available)
 
       # Try different combinations
       success = False
@@ -112,6 +121,30 @@ class DoublesPairingService:
 
     return matches
 
+  @staticmethod
+  def generate_balanced_pairs(
+    members: List[Member],
+    matches_per_player: int = 3,
+    time_budget: float = PAIRING_TIME_BUDGET_MS / 1000,
+    rng: random.Random | None = None
+  ) -> List[Tuple[Tuple[Member, Member], Tuple[Member, Member]]]:
+    """
+    Generate preliminary pairs that minimize the skill gap between teams.
+
+    Same rules as generate_preliminary_pairs (no repeated partners, at most
+    matches_per_player matches each). Falls back to random pairing when no
+    valid schedule is found within time_budget seconds. The search is seeded
+    from rng when given.
+    """
+    if len(members) < 4:
+      raise ValueError("Need at least 4 players for doubles")
+
+    seed = rng.getrandbits(64) if rng else None
+    matches = balanced_pairs(members, matches_per_player=matches_per_player, time_budget=time_budget, seed=seed)
+    if matches is None:
+      return DoublesPairingService.generate_preliminary_pairs(members, matches_per_player, rng=rng)
+    return matches
+
   @staticmethod
   def generate_rank_based_pairs(
     group1_members: List[Member],
@@ -152,17 +185,33 @@ class DoublesPairingService:
     return matches
 
   @staticmethod
-  def distribute_to_groups(members: List[Member], num_groups: int) -> List[List[Member]]:
+  def distribute_to_groups(
+    members: List[Member],
+    num_groups: int,
+    mode: str = 'order',
+    seed: int = 0,
+    keep_apart: Iterable[Tuple[str, str]] = (),
+    max_per_level: int | None = None
+  ) -> List[List[Member]]:
     """
-    Distribute members into groups using round-robin.
+    Distribute members into groups.
 
     Args:
-      members: List of members (order preserved)
+      members: List of members (application order)
       num_groups: Number of groups to create
+      mode: 'order' deals round-robin in the given order; 'snake_rating' and
+        'snake_level' snake-draft by rating or by level (see snake_draft)
+      seed, keep_apart, max_per_level: snake draft options
 
     Returns:
       List of groups, each containing members
     """
+    if mode != 'order':
+      return DoublesPairingService.snake_draft(
+        members, num_groups, by='level' if mode == 'snake_level' else 'rating',
+        seed=seed, keep_apart=keep_apart, max_per_level=max_per_level
+      )
+
     groups: List[List[Member]] = [[] for _ in range(num_groups)]
 
     for idx, member in enumerate(members):
@@ -170,3 +219,91 @@ class DoublesPairingService:
       groups[group_idx].append(member)
 
     return groups
+
+  @staticmethod
+  def snake_draft(
+    members: List[Member],
+    num_groups: int,
+    by: str = 'rating',
+    seed: int = 0,
+    keep_apart: Iterable[Tuple[str, str]] = (),
+    max_per_level: int | None = None
+  ) -> List[List[Member]]:
+    """
+    Snake-draft members into groups of equal strength.
+
+    Members are sorted strongest first (by rating, or by level), ties broken
+    by a permutation drawn from seed, and picked in rounds: groups
+    1..n, then n..1, and so on. Each group gets exactly one pick per round,
+    so group sizes differ by at most one.
+
+    Constraints are best-effort: a pick goes to the first group still owed a
+    pick this round that holds neither a keep_apart partner of the member nor
+    max_per_level members of the member's level. If none is left, the member
+    trades places with an earlier pick of the same round (a similar
+    strength) when both then fit; otherwise the constraint is dropped for
+    that pick.
+
+    Sorting dominates: O(n log n) plus O(n * num_groups) for the picks, and the
+    same members and seed always give the same groups.
+    """
+    rng = random.Random(seed)
+    tiebreak = {member.id: rng.random() for member in sorted(members, key=lambda member: member.id)}
+    if by == 'level':
+      key = lambda member: (-LEVEL_RANKS.get(member.level, 1), tiebreak[member.id])
+    else:
+      key = lambda member: (-member_strength(member), tiebreak[member.id])
+
+    apart: defaultdict[str, set[str]] = defaultdict(set)
+    for first, second in keep_apart:
+      apart[first].add(second)
+      apart[second].add(first)
+
+    groups: List[List[Member]] = [[] for _ in range(num_groups)]
+    member_ids: List[set[str]] = [set() for _ in range(num_groups)]
+    level_counts: List[Counter[str]] = [Counter() for _ in range(num_groups)]
+
+    def fits(member: Member, idx: int, leaving: Member | None = None) -> bool:
+      others = member_ids[idx] - {leaving.id} if leaving else member_ids[idx]
+      same_level = level_counts[idx][member.level] - (leaving is not None and leaving.level == member.level)
+      return not apart[member.id] & others and (max_per_level is None or same_level < max_per_level)
+
+    def place(member: Member, idx: int) -> None:
+      groups[idx].append(member)
+      member_ids[idx].add(member.id)
+      level_counts[idx][member.level] += 1
+
+    def remove(member: Member, idx: int) -> None:
+      groups[idx].remove(member)
+      member_ids[idx].discard(member.id)
+      level_counts[idx][member.level] -= 1
+
+    owed: List[int] = []
+    picked: List[Tuple[int, Member]] = []
+    draft_round = -1
+
+    for member in sorted(members, key=key):
+      if not owed:
+        draft_round += 1
+        owed = list(range(num_groups)) if draft_round % 2 == 0 else list(range(num_groups - 1, -1, -1))
+        picked = []
+      group_idx = next((idx for idx in owed if fits(member, idx)), None)
+      if group_idx is None:
+        # Trade places with an earlier pick of this round if both then fit.
+        target = owed[0]
+        for position, (idx, other) in enumerate(picked):
+          if fits(member, idx, leaving=other) and fits(other, target):
+            remove(other, idx)
+            place(other, target)
+            picked[position] = (target, other)
+            owed.remove(target)
+            owed.append(idx)
+            group_idx = idx
+            break
+        else:
+          group_idx = target
+      owed.remove(group_idx)
+      picked.append((group_idx, member))
+      place(member, group_idx)
+
+    return groups
@@ -0,0 +1,82 @@
+"""
+Guards for the admin calls that (re)generate a league's matches.
+
+Two layers:
+
+* ``generation_flights`` coalesces identical concurrent requests within a
+  worker (a double tap on "generate"): the first one runs, the others await
+  its result or exception instead of deleting and regenerating again.
+  Requests only overlap while the leader awaits the group commit queue;
+  inline writes block the event loop, which already runs them one by one.
+* ``lock_league`` holds across workers. A generation calls it before reading
+  anything it decides on: bumping ``League.generation_seq`` takes the
+  league's row lock on PostgreSQL and the database write lock on SQLite, so
+  generations of one league run one after another, and each one sees the
+  rows the previous one committed (its "already generated" checks hold).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from api.db.models import League
+from api.observability.metrics import registry
+
+T = TypeVar('T')
+
+flight_requests = registry.counter(
+  'single_flight_requests_total', 'Generation requests that ran or joined an identical running one.', ('role',)
+)
+
+
+class SingleFlight:
+  """Per-event-loop coalescing of concurrent calls with the same key."""
+
+  def __init__(self) -> None:
+    self._calls: dict[Hashable, asyncio.Future] = {}
+
+  def __len__(self) -> int:
+    return len(self._calls)
+
+  async def run(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+    pending = self._calls.get(key)
+    if pending is not None:
+      flight_requests.inc('shared')
+      # Shielded so a follower that disconnects does not cancel the leader's work.
+      return await asyncio.shield(pending)
+
+    flight_requests.inc('leader')
+    future: asyncio.Future = asyncio.get_running_loop().create_future()
+    self._calls[key] = future
+    try:
+      result = await call()
+    except BaseException as error:
+      future.set_exception(error)
+      future.exception()  # retrieved here, so a flight without followers does not warn
+      raise
+    else:
+      future.set_result(result)
+      return result
+    finally:
+      del self._calls[key]
+
+
+generation_flights = SingleFlight()
+
+
+def lock_league(session: Session, league_id: str) -> League:
+  """Take the league's generation lock until the transaction ends and return the fresh league."""
+  result = session.execute(
+    update(League)
+    .where(League.id == league_id)
+    .values(generation_seq=League.generation_seq + 1)
+    .execution_options(synchronize_session=False)
+  )
+  if result.rowcount == 0:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='League not found')
+  return session.get(League, league_id, populate_existing=True)
@@ -4,10 +4,13 @@ from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from api.db.models import League
+from api.cache.bus import publish_change
+from api.db.models import League, new_id
+from api.observability.tracing import traced
 from api.schemas.league import LeagueCreateRequest, LeagueResponse
 
 
+@traced
 class LeagueService:
   def __init__(self, session: Session) -> None:
     self._session = session
@@ -18,17 +21,20 @@ class LeagueService:
 
   def create_league(self, payload: LeagueCreateRequest) -> LeagueResponse:
     league = League(
+      id=new_id(),
       name=payload.name,
       surface_type=payload.surface_type,
       entry_fee=payload.entry_fee,
       max_participants=payload.max_participants,
       auto_generate_bracket=payload.auto_generate_bracket,
       groups_count=payload.groups_count,
-      courts_count=payload.courts_count
+      courts_count=payload.courts_count,
+      pairing_mode=payload.pairing_mode,
+      group_mode=payload.group_mode
     )
     self._session.add(league)
+    publish_change(self._session, league.id)
     self._session.commit()
-    self._session.refresh(league)
     return LeagueResponse.model_validate(league, from_attributes=True)
 
   def get_league(self, league_id: str) -> LeagueResponse:
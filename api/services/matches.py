@@ -6,22 +6,20 @@ from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from api.db.models import League, LeagueMatch, MatchParticipant, Member
+from api.cache.bus import publish_change
+from api.db.models import League, LeagueMatch, MatchParticipant
+from api.observability.tracing import traced
 from api.schemas.match import LeagueMatchCreateRequest, LeagueMatchResponse, MatchScoreUpdateRequest
+from api.services.authorization import admin_authorizer
+from api.services.ratings import RatingService
+from api.services.swiss import SwissStageService
 
 
+@traced
 class LeagueMatchService:
   def __init__(self, session: Session) -> None:
     self._session = session
 
-  def _require_admin(self, admin_id: str | None) -> Member | None:
-    if admin_id is None:
-      raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Admin privileges required')
-    admin = self._session.get(Member, admin_id)
-    if not admin or admin.role != 'admin':
-      raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Admin privileges required')
-    return admin
-
   def list_matches(self, league_id: str) -> list[LeagueMatchResponse]:
     league = self._session.get(League, league_id)
     if not league:
@@ -49,7 +47,7 @@ class LeagueMatchService:
       raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='League not found')
 
     if not skip_admin_check:
-      self._require_admin(admin_id)
+      admin_authorizer.require_admin(self._session, admin_id)
 
     match = LeagueMatch(
       league_id=league_id,
@@ -61,8 +59,8 @@ class LeagueMatchService:
       scheduled_at=scheduled_at
     )
     self._session.add(match)
+    publish_change(self._session, league_id)
     self._session.commit()
-    self._session.refresh(match)
     return match
 
   def create_match(self, league_id: str, payload: LeagueMatchCreateRequest) -> LeagueMatchResponse:
@@ -109,8 +107,11 @@ class LeagueMatchService:
     if match.stage == 'elimination' and match.winner:
       self._propagate_elimination(match)
 
+    RatingService(self._session).apply_match(match)
+    if match.stage == 'swiss':
+      SwissStageService(self._session).record_result(match)
+    publish_change(self._session, match.league_id)
     self._session.commit()
-    self._session.refresh(match)
     return LeagueMatchResponse.model_validate(match, from_attributes=True)
 
   def _propagate_elimination(self, match: LeagueMatch) -> None:
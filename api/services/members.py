@@ -4,13 +4,18 @@ from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from api.cache.bus import publish_change
 from api.db.models import Member
+from api.observability.tracing import traced
 from api.schemas.member import MemberCreateRequest, MemberResponse, MemberRoleUpdateRequest
+from api.services.authorization import admin_authorizer
+from api.services.ratings import initial_rating
 
 
 ADMIN_EMAIL = 'admin@tennis.club'
 
 
+@traced
 class MemberService:
   def __init__(self, session: Session) -> None:
     self._session = session
@@ -20,46 +25,44 @@ class MemberService:
       return 'admin'
     return 'member'
 
-  def _require_admin(self, admin_id: str | None) -> Member | None:
-    if admin_id is None:
-      raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Admin privileges required')
-    admin = self._session.get(Member, admin_id)
-    if not admin or admin.role != 'admin':
-      raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Admin privileges required')
-    return admin
-
   def create_member(self, payload: MemberCreateRequest) -> MemberResponse:
     desired_role = self._resolve_role(payload.email, payload.role)
 
     existing = self._session.execute(select(Member).where(Member.email == payload.email)).scalar_one_or_none()
     if existing:
+      promoted = payload.email == ADMIN_EMAIL and desired_role == 'admin' and existing.role != 'admin'
+      if (existing.full_name, existing.level) != (payload.full_name, payload.level) or promoted:
+        # Names appear in applications, matches and rankings of every league;
+        # a club-wide change also clears every worker's admin role cache.
+        publish_change(self._session, None)
       existing.full_name = payload.full_name
       existing.level = payload.level
-      if payload.email == ADMIN_EMAIL and desired_role == 'admin':
+      if promoted:
         existing.role = 'admin'
       self._session.commit()
-      self._session.refresh(existing)
       return MemberResponse.model_validate(existing, from_attributes=True)
 
     member = Member(
       full_name=payload.full_name,
       email=payload.email,
       level=payload.level,
-      role=desired_role
+      role=desired_role,
+      rating=initial_rating(payload.level)
     )
     self._session.add(member)
     self._session.commit()
-    self._session.refresh(member)
     return MemberResponse.model_validate(member, from_attributes=True)
 
   def update_member_role(self, member_id: str, payload: MemberRoleUpdateRequest) -> MemberResponse:
-    self._require_admin(payload.admin_id)
+    admin_authorizer.require_admin(self._session, payload.admin_id)
 
     member = self._session.get(Member, member_id)
     if not member:
       raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Member not found')
 
+    if member.role != payload.role:
+      # Clears the cached role in every worker's admin_authorizer.
+      publish_change(self._session, None)
     member.role = payload.role
     self._session.commit()
-    self._session.refresh(member)
     return MemberResponse.model_validate(member, from_attributes=True)
@@ -0,0 +1,162 @@
+"""
+Skill-balanced preliminary pairing.
+
+A group's schedule is encoded as an ``(matches, 4)`` array of player indices,
+``[a1, a2, b1, b2]`` per row. The initial schedule lists every player
+``matches_per_player`` times (a shuffled order repeated per round), so the
+appearance counts are right by construction; the only move is swapping two
+slots, which keeps them right.
+
+The cost of a schedule is lexicographic:
+
+1. violations: a player twice in one match, or a partner pair used more than once;
+2. imbalance: the sum over matches of the squared difference of the team
+   average strengths (rating, see ``member_strength``).
+
+Each step draws ``PAIRING_CANDIDATES`` random swaps, builds the candidate
+schedules as one ``(candidates, matches, 4)`` array, scores them all with
+NumPy and keeps the best if it is no worse (sideways moves cross plateaus).
+After ``_STALL_STEPS`` steps without a new best, the best candidate is taken
+even if it is worse, to leave the local minimum. The search stops at the time
+budget, the iteration limit, or a perfectly balanced valid schedule, and
+returns the best schedule seen. ``None`` means no valid schedule was found
+in time (or none exists) and the caller should fall back to random pairing.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from api.db.models import Member
+from api.services.ratings import initial_rating
+
+PAIRING_TIME_BUDGET_MS = float(os.environ.get('PAIRING_TIME_BUDGET_MS', '100'))
+PAIRING_CANDIDATES = int(os.environ.get('PAIRING_CANDIDATES', '64'))
+
+_VIOLATION_COST = 1e12
+_STALL_STEPS = 200
+# Slot pairs that must hold different players within one match.
+_SLOT_PAIRS = [(i, j) for i in range(4) for j in range(i + 1, 4)]
+
+
+def member_strength(member: Member) -> float:
+  """Current rating, or the level's initial rating for members without one."""
+  rating = getattr(member, 'rating', None)
+  return float(rating) if rating is not None else initial_rating(member.level)
+
+
+@dataclass
+class PairingResult:
+  schedule: np.ndarray
+  violations: int
+  imbalance: float
+  mean_gap: float  # mean absolute team-average strength gap per match
+  iterations: int
+  seconds: float
+
+
+def _gaps(schedules: np.ndarray, strengths: np.ndarray) -> np.ndarray:
+  """Team-average strength gap (team A minus team B) of every match."""
+  values = strengths[schedules]
+  return (values[..., 0] + values[..., 1] - values[..., 2] - values[..., 3]) / 2
+
+
+def _scores(schedules: np.ndarray, strengths: np.ndarray, players: int) -> tuple[np.ndarray, np.ndarray]:
+  """Violations and imbalance of a ``(..., matches, 4)`` batch of schedules."""
+  imbalance = (_gaps(schedules, strengths) ** 2).sum(axis=-1)
+
+  violations = sum((schedules[..., i] == schedules[..., j]).sum(axis=-1) for i, j in _SLOT_PAIRS)
+  low = np.minimum(schedules[..., 0::2], schedules[..., 1::2])
+  high = np.maximum(schedules[..., 0::2], schedules[..., 1::2])
+  keys = np.sort((low * players + high).reshape(*schedules.shape[:-2], -1), axis=-1)
+  violations = violations + (keys[..., 1:] == keys[..., :-1]).sum(axis=-1)
+  return violations, imbalance
+
+
+def optimize_schedule(
+  strengths: Sequence[float],
+  matches_per_player: int = 3,
+  time_budget: float = PAIRING_TIME_BUDGET_MS / 1000,
+  max_iterations: int | None = None,
+  candidates: int = PAIRING_CANDIDATES,
+  seed: int | None = None
+) -> PairingResult:
+  """Search for a valid, balanced schedule of ``len(strengths) * matches_per_player // 4`` matches."""
+  started = time.perf_counter()
+  players = len(strengths)
+  total = players * matches_per_player // 4
+  values = np.asarray(strengths, dtype=np.float64)
+  # Seeded from ``random`` by default, so ``random.seed`` makes brackets reproducible.
+  rng = np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+
+  order = np.concatenate([rng.permutation(players) for _ in range(matches_per_player)])
+  current = order[:total * 4].reshape(total, 4)
+  violations, imbalance = _scores(current, values, players)
+  current_cost = violations * _VIOLATION_COST + imbalance
+  best, best_cost = current.copy(), current_cost
+  best_violations, best_imbalance = int(violations), float(imbalance)
+
+  rows = np.arange(candidates)
+  iterations = stalled = 0
+  while best_violations or best_imbalance > 1e-9:
+    if max_iterations is not None and iterations >= max_iterations:
+      break
+    if time.perf_counter() - started >= time_budget:
+      break
+    iterations += 1
+
+    first = rng.integers(0, total * 4, size=candidates)
+    second = rng.integers(0, total * 4, size=candidates)
+    batch = np.repeat(current.reshape(1, -1), candidates, axis=0)
+    batch[rows, first], batch[rows, second] = batch[rows, second], batch[rows, first]
+    batch = batch.reshape(candidates, total, 4)
+    violations, imbalance = _scores(batch, values, players)
+    costs = violations * _VIOLATION_COST + imbalance
+    choice = int(np.argmin(costs))
+
+    if costs[choice] <= current_cost:
+      current, current_cost = batch[choice], costs[choice]
+    elif stalled >= _STALL_STEPS:
+      current, current_cost = batch[choice], costs[choice]
+      stalled = 0
+    if current_cost < best_cost:
+      best, best_cost = current.copy(), current_cost
+      best_violations, best_imbalance = int(violations[choice]), float(imbalance[choice])
+      stalled = 0
+    else:
+      stalled += 1
+
+  return PairingResult(
+    schedule=best,
+    violations=best_violations,
+    imbalance=best_imbalance,
+    mean_gap=float(np.abs(_gaps(best, values)).mean()) if total else 0.0,
+    iterations=iterations,
+    seconds=time.perf_counter() - started
+  )
+
+
+def balanced_pairs(
+  members: Sequence[Member],
+  matches_per_player: int = 3,
+  time_budget: float = PAIRING_TIME_BUDGET_MS / 1000,
+  seed: int | None = None
+) -> list[tuple[tuple[Member, Member], tuple[Member, Member]]] | None:
+  result = optimize_schedule(
+    [member_strength(member) for member in members],
+    matches_per_player=matches_per_player,
+    time_budget=time_budget,
+    seed=seed
+  )
+  if result.violations:
+    return None
+  return [
+    ((members[a1], members[a2]), (members[b1], members[b2]))
+    for a1, a2, b1, b2 in result.schedule.tolist()
+  ]
@@ -0,0 +1,210 @@
+"""
+Qualification odds for a league in its preliminary round.
+
+``QualificationService.odds`` loads the round-1 matches of a league once:
+completed ones become every player's current wins / points difference /
+points for (counted exactly like ``RankingService``), and scheduled ones
+with both teams known are played out ``simulations`` times by
+``api.services.simulation``. With ``model='rating'`` team A wins with the Elo
+expectation of the two team-average ratings; with ``'uniform'`` every match
+is a coin flip.
+
+Runs are split into chunks of ``QUALIFICATION_CHUNK`` simulations with
+independent seeds spawned from one ``SeedSequence``, so the answer for a
+seed does not depend on how many workers played it. Large jobs (more than
+``QUALIFICATION_PARALLEL_MIN_CELLS`` simulation x match x player cells) go to
+a pool of ``QUALIFICATION_WORKERS`` processes, spawned on first use since
+the API process runs threads. Smaller ones run inline: a 32-player league
+plays 10k runs in tens of milliseconds, well under the cost of dispatching
+to the pool, let alone starting it. The endpoint
+caches the response per league and parameters in the response cache, which
+the league's next change invalidates.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from api.db.models import League, LeagueMatch, MatchParticipant, Member
+from api.observability.timing import phase
+from api.observability.tracing import traced
+from api.services.ratings import DEFAULT_RATING, expected_score
+from api.services.simulation import SimulationInput, qualification_counts
+
+QUALIFICATION_SIMULATIONS = int(os.environ.get('QUALIFICATION_SIMULATIONS', '10000'))
+QUALIFICATION_CHUNK = int(os.environ.get('QUALIFICATION_CHUNK', '2500'))
+QUALIFICATION_WORKERS = int(os.environ.get('QUALIFICATION_WORKERS', str(min(4, os.cpu_count() or 1))))
+QUALIFICATION_PARALLEL_MIN_CELLS = int(os.environ.get('QUALIFICATION_PARALLEL_MIN_CELLS', '200000000'))
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _executor() -> ProcessPoolExecutor | None:
+  global _pool
+  if QUALIFICATION_WORKERS <= 1:
+    return None
+  with _pool_lock:
+    if _pool is None:
+      _pool = ProcessPoolExecutor(QUALIFICATION_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+
+def shutdown_pool() -> None:
+  global _pool
+  with _pool_lock:
+    pool, _pool = _pool, None
+  if pool is not None:
+    pool.shutdown(cancel_futures=True)
+
+
+@dataclass
+class PlayerOdds:
+  member_id: str
+  player_name: str
+  group_number: int
+  wins: int
+  points_diff: int
+  points_for: int
+  remaining_matches: int
+  probability: float
+
+
+@dataclass
+class QualificationOdds:
+  top_n: int
+  model: str
+  simulations: int
+  remaining_matches: int
+  players: list[PlayerOdds]
+
+
+@traced
+class QualificationService:
+  def __init__(self, session: Session) -> None:
+    self._session = session
+
+  def odds(
+    self,
+    league_id: str,
+    top_n: int = 2,
+    model: str = 'rating',
+    simulations: int = QUALIFICATION_SIMULATIONS,
+    seed: int | None = None
+  ) -> QualificationOdds:
+    with phase('db'):
+      if self._session.get(League, league_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='League not found')
+      matches = self._session.execute(
+        select(LeagueMatch.id, LeagueMatch.group_number, LeagueMatch.status, LeagueMatch.score_a, LeagueMatch.score_b)
+        .where(LeagueMatch.league_id == league_id, LeagueMatch.round == 1, LeagueMatch.stage != 'swiss')
+      ).all()
+      participants = self._session.execute(
+        select(MatchParticipant.match_id, MatchParticipant.team, Member.id, Member.full_name, Member.rating)
+        .join(Member, Member.id == MatchParticipant.member_id)
+        .join(LeagueMatch, LeagueMatch.id == MatchParticipant.match_id)
+        .where(LeagueMatch.league_id == league_id, LeagueMatch.round == 1, LeagueMatch.stage != 'swiss')
+      ).all()
+
+    with phase('rankings'):
+      teams: dict[str, dict[str, list[str]]] = defaultdict(lambda: {'team_a': [], 'team_b': []})
+      names: dict[str, str] = {}
+      ratings: dict[str, float] = {}
+      for match_id, team, member_id, full_name, rating in participants:
+        teams[match_id][team].append(member_id)
+        names[member_id] = full_name
+        ratings[member_id] = rating if rating is not None else DEFAULT_RATING
+
+      index: dict[str, int] = {}
+      groups: list[int] = []
+      stats: list[list[int]] = []
+      remaining: list[tuple[list[int], list[int], float]] = []
+      for match in matches:
+        match_teams = teams.get(match.id)
+        if match_teams is None:
+          continue
+        for member_id in match_teams['team_a'] + match_teams['team_b']:
+          if member_id not in index:
+            index[member_id] = len(index)
+            groups.append(match.group_number)
+            stats.append([0, 0, 0, 0])  # wins, points_diff, points_for, remaining
+        side_a = [index[member_id] for member_id in match_teams['team_a']]
+        side_b = [index[member_id] for member_id in match_teams['team_b']]
+
+        if match.status == 'completed':
+          score_a = match.score_a if match.score_a is not None else 0
+          score_b = match.score_b if match.score_b is not None else 0
+          for side, scored, conceded in ((side_a, score_a, score_b), (side_b, score_b, score_a)):
+            for player in side:
+              stats[player][0] += scored > conceded
+              stats[player][1] += scored - conceded
+              stats[player][2] += scored
+        elif side_a and side_b:
+          for player in side_a + side_b:
+            stats[player][3] += 1
+          if model == 'uniform':
+            probability = 0.5
+          else:
+            probability = expected_score(
+              sum(ratings[member_id] for member_id in match_teams['team_a']) / len(side_a),
+              sum(ratings[member_id] for member_id in match_teams['team_b']) / len(side_b)
+            )
+          remaining.append((side_a, side_b, probability))
+
+      counts = self._simulate(stats, groups, remaining, top_n, simulations, seed) if stats else []
+
+    members = sorted(index, key=index.get)
+    players = [
+      PlayerOdds(
+        member_id=member_id,
+        player_name=names[member_id],
+        group_number=groups[position],
+        wins=stats[position][0],
+        points_diff=stats[position][1],
+        points_for=stats[position][2],
+        remaining_matches=stats[position][3],
+        probability=round(int(counts[position]) / simulations, 4)
+      )
+      for position, member_id in enumerate(members)
+    ]
+    players.sort(key=lambda odds: (odds.group_number, -odds.probability, -odds.wins, -odds.points_diff, -odds.points_for))
+    return QualificationOdds(
+      top_n=top_n, model=model, simulations=simulations, remaining_matches=len(remaining), players=players
+    )
+
+  @staticmethod
+  def _simulate(stats, groups, remaining, top_n: int, simulations: int, seed: int | None) -> np.ndarray:
+    table = np.array(stats, dtype=np.int64)
+    width = max((max(len(side_a), len(side_b)) for side_a, side_b, _ in remaining), default=1)
+    team_a = np.full((len(remaining), width), -1, dtype=np.int64)
+    team_b = np.full((len(remaining), width), -1, dtype=np.int64)
+    for row, (side_a, side_b, _) in enumerate(remaining):
+      team_a[row, :len(side_a)] = side_a
+      team_b[row, :len(side_b)] = side_b
+    data = SimulationInput(
+      wins=table[:, 0], points_diff=table[:, 1], points_for=table[:, 2],
+      groups=np.array(groups, dtype=np.int64), team_a=team_a, team_b=team_b,
+      win_probability=np.array([probability for _, _, probability in remaining], dtype=np.float64)
+    )
+
+    sizes = [QUALIFICATION_CHUNK] * (simulations // QUALIFICATION_CHUNK)
+    if simulations % QUALIFICATION_CHUNK:
+      sizes.append(simulations % QUALIFICATION_CHUNK)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    cells = simulations * len(remaining) * len(stats)
+    pool = _executor() if len(sizes) > 1 and cells >= QUALIFICATION_PARALLEL_MIN_CELLS else None
+    if pool is None:
+      results = [qualification_counts(data, top_n, size, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
+    else:
+      results = list(pool.map(qualification_counts, [data] * len(sizes), [top_n] * len(sizes), sizes, seeds))
+    return np.sum(results, axis=0)
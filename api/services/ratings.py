@@ -0,0 +1,237 @@
+"""
+Elo ratings for doubles, fed by match results.
+
+Each team's strength is the mean rating of its players. The expected score of
+team A is ``1 / (1 + 10 ** ((R_b - R_a) / 400))``, and every player on a team
+moves by ``RATING_K_FACTOR * (actual - expected)`` (a tie counts 0.5).
+New members start from their self-reported level (``INITIAL_RATINGS``).
+
+``apply_match`` updates the four players as a score is entered. ``recompute``
+replays every completed match in chronological order from the initial
+ratings, e.g. after a score correction or a change of K. Matches are grouped
+into layers in which no member plays twice, with each member's matches in
+increasing layers, so a layer updates as one NumPy step and the result
+equals the sequential replay. Every rated match leaves one ``RatingHistory``
+row per player.
+
+Cached rankings of *other* leagues show a player's new rating after their
+league's next change; only the scored match's league is invalidated.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from api.cache.bus import publish_change
+from api.db.models import LeagueMatch, MatchParticipant, Member, RatingHistory, utcnow
+from api.observability.tracing import traced
+
+RATING_K_FACTOR = float(os.environ.get('RATING_K_FACTOR', '32'))
+INITIAL_RATINGS = {'beginner': 1350.0, 'intermediate': 1500.0, 'advanced': 1650.0}
+DEFAULT_RATING = 1500.0
+
+_BATCH_SIZE = 10_000
+
+
+def initial_rating(level: str) -> float:
+  return INITIAL_RATINGS.get(level, DEFAULT_RATING)
+
+
+def expected_score(team_rating: float, opponent_rating: float) -> float:
+  return 1.0 / (1.0 + 10.0 ** ((opponent_rating - team_rating) / 400.0))
+
+
+def actual_score(score_a: int, score_b: int) -> float:
+  """Result for team A: 1 win, 0.5 tie, 0 loss."""
+  return 1.0 if score_a > score_b else 0.5 if score_a == score_b else 0.0
+
+
+@dataclass
+class RecomputeSummary:
+  members: int
+  matches: int
+  layers: int
+  seconds: float
+
+
+@traced
+class RatingService:
+  def __init__(self, session: Session, k_factor: float = RATING_K_FACTOR) -> None:
+    self._session = session
+    self._k_factor = k_factor
+
+  def apply_match(self, match: LeagueMatch) -> None:
+    """Rate a just-completed match; the caller commits. Matches without two teams are skipped."""
+    if match.score_a is None or match.score_b is None:
+      return
+    teams: dict[str, list[str]] = defaultdict(list)
+    for participant in match.participants:
+      teams[participant.team].append(participant.member_id)
+    if not teams['team_a'] or not teams['team_b']:
+      return
+
+    members = {
+      member.id: member
+      for member in self._session.execute(
+        select(Member).where(Member.id.in_(teams['team_a'] + teams['team_b']))
+      ).scalars()
+    }
+    team_a = [members[member_id] for member_id in teams['team_a'] if member_id in members]
+    team_b = [members[member_id] for member_id in teams['team_b'] if member_id in members]
+    if not team_a or not team_b:
+      return
+
+    rating_a = sum(member.rating for member in team_a) / len(team_a)
+    rating_b = sum(member.rating for member in team_b) / len(team_b)
+    delta_a = self._k_factor * (actual_score(match.score_a, match.score_b) - expected_score(rating_a, rating_b))
+    recorded_at = match.completed_at or utcnow()
+    for team, delta in ((team_a, delta_a), (team_b, -delta_a)):
+      for member in team:
+        member.rating += delta
+        member.rated_matches += 1
+        self._session.add(RatingHistory(
+          member_id=member.id,
+          match_id=match.id,
+          rating=member.rating,
+          delta=delta,
+          recorded_at=recorded_at
+        ))
+
+  def history(self, member_id: str, limit: int = 50) -> list[RatingHistory]:
+    """Latest rating changes of a member, newest first."""
+    if self._session.get(Member, member_id) is None:
+      raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Member not found')
+    return list(self._session.execute(
+      select(RatingHistory)
+      .where(RatingHistory.member_id == member_id)
+      .order_by(RatingHistory.recorded_at.desc(), RatingHistory.id.desc())
+      .limit(limit)
+    ).scalars())
+
+  def recompute(self) -> RecomputeSummary:
+    """Replay all completed matches from the initial ratings and rewrite ratings and history."""
+    started = time.perf_counter()
+    # Core statements on the session's connection: no ORM row processing for the bulk reads and writes.
+    conn = self._session.connection()
+    member_rows = conn.execute(select(Member.id, Member.level)).all()
+    index = {member_id: position for position, (member_id, _) in enumerate(member_rows)}
+    ratings = np.array([initial_rating(level) for _, level in member_rows], dtype=np.float64)
+    played = np.zeros(len(member_rows), dtype=np.int64)
+
+    match_rows = conn.execute(
+      select(LeagueMatch.id, LeagueMatch.score_a, LeagueMatch.score_b, LeagueMatch.completed_at, LeagueMatch.scheduled_at)
+      .where(
+        LeagueMatch.status == 'completed',
+        LeagueMatch.score_a.is_not(None),
+        LeagueMatch.score_b.is_not(None)
+      )
+      .order_by(LeagueMatch.completed_at, LeagueMatch.scheduled_at, LeagueMatch.id)
+    ).all()
+    teams: dict[str, tuple[list[int], list[int]]] = {row.id: ([], []) for row in match_rows}
+    for match_id, member_id, team in conn.execute(
+      select(MatchParticipant.match_id, MatchParticipant.member_id, MatchParticipant.team)
+    ):
+      if match_id in teams and member_id in index:
+        teams[match_id][0 if team == 'team_a' else 1].append(index[member_id])
+
+    rated = [row for row in match_rows if teams[row.id][0] and teams[row.id][1]]
+    count = len(rated)
+    width = max((max(len(teams[row.id][0]), len(teams[row.id][1])) for row in rated), default=1)
+    # Player slots per team, padded with -1.
+    team_a = np.full((count, width), -1, dtype=np.int64)
+    team_b = np.full((count, width), -1, dtype=np.int64)
+    results = np.empty(count, dtype=np.float64)
+    layers = np.empty(count, dtype=np.int64)
+    last_layer = defaultdict(lambda: -1)
+    for position, row in enumerate(rated):
+      players_a, players_b = teams[row.id]
+      team_a[position, :len(players_a)] = players_a
+      team_b[position, :len(players_b)] = players_b
+      results[position] = actual_score(row.score_a, row.score_b)
+      layer = 1 + max(last_layer[player] for player in players_a + players_b)
+      for player in players_a + players_b:
+        last_layer[player] = layer
+      layers[position] = layer
+
+    history_match: list[np.ndarray] = []
+    history_member: list[np.ndarray] = []
+    history_rating: list[np.ndarray] = []
+    history_delta: list[np.ndarray] = []
+    order = np.argsort(layers, kind='stable')
+    boundaries = np.flatnonzero(np.diff(layers[order])) + 1
+    for positions in np.split(order, boundaries) if count else []:
+      slots_a, slots_b = team_a[positions], team_b[positions]
+      mask_a, mask_b = slots_a >= 0, slots_b >= 0
+      rating_a = np.where(mask_a, ratings[slots_a], 0.0).sum(axis=1) / mask_a.sum(axis=1)
+      rating_b = np.where(mask_b, ratings[slots_b], 0.0).sum(axis=1) / mask_b.sum(axis=1)
+      expected = 1.0 / (1.0 + 10.0 ** ((rating_b - rating_a) / 400.0))
+      delta_a = self._k_factor * (results[positions] - expected)
+
+      for slots, mask, delta in ((slots_a, mask_a, delta_a), (slots_b, mask_b, -delta_a)):
+        # Players within a layer are distinct, so plain fancy-index updates are safe.
+        players = slots[mask]
+        deltas = np.broadcast_to(delta[:, None], slots.shape)[mask]
+        ratings[players] += deltas
+        played[players] += 1
+        history_match.append(np.broadcast_to(positions[:, None], slots.shape)[mask])
+        history_member.append(players)
+        history_rating.append(ratings[players])
+        history_delta.append(deltas)
+
+    self._write(conn, member_rows, ratings, played, rated, history_match, history_member, history_rating, history_delta)
+    return RecomputeSummary(
+      members=len(member_rows),
+      matches=count,
+      layers=len(boundaries) + 1 if count else 0,
+      seconds=time.perf_counter() - started
+    )
+
+  def _write(self, conn, member_rows, ratings, played, rated, history_match, history_member, history_rating, history_delta) -> None:
+    conn.execute(delete(RatingHistory.__table__))
+    if history_match:
+      match_positions = np.concatenate(history_match)
+      member_positions = np.concatenate(history_member)
+      new_ratings = np.concatenate(history_rating)
+      deltas = np.concatenate(history_delta)
+      # Chronological by match so history ids follow the replay order.
+      order = np.argsort(match_positions, kind='stable')
+      rows = [
+        {
+          'member_id': member_rows[member][0],
+          'match_id': rated[match].id,
+          'rating': rating,
+          'delta': delta,
+          'recorded_at': rated[match].completed_at or rated[match].scheduled_at
+        }
+        for match, member, rating, delta in zip(
+          match_positions[order].tolist(), member_positions[order].tolist(),
+          new_ratings[order].tolist(), deltas[order].tolist()
+        )
+      ]
+      for start in range(0, len(rows), _BATCH_SIZE):
+        conn.execute(insert(RatingHistory.__table__), rows[start:start + _BATCH_SIZE])
+
+    members = Member.__table__
+    statement = (
+      update(members)
+      .where(members.c.id == bindparam('member_id'))
+      .values(rating=bindparam('new_rating'), rated_matches=bindparam('games'))
+    )
+    updates = [
+      {'member_id': member_id, 'new_rating': rating, 'games': games}
+      for (member_id, _), rating, games in zip(member_rows, ratings.tolist(), played.tolist())
+    ]
+    for start in range(0, len(updates), _BATCH_SIZE):
+      conn.execute(statement, updates[start:start + _BATCH_SIZE])
+    publish_change(self._session, None)
+    # Loaded members would otherwise keep their pre-recompute ratings.
+    self._session.expire_all()
+    self._session.commit()
@@ -0,0 +1,390 @@
+"""
+Court and player occupancy of a league's schedule.
+
+Every match occupies its court and its players for ``MATCH_DURATION_MINUTES``
+from ``scheduled_at`` (the generators schedule one match per court per
+hour). ``ScheduleIndex`` keeps one sorted timeline of start times per court
+and per member. Because every interval has the same length, a match
+starting at ``t`` collides exactly with the starts in ``(t - d, t + d)``, so
+a conflict check is two bisections per timeline: O(log n).
+
+Indexes are built from ``LeagueMatch`` + ``MatchParticipant`` on first use
+and cached per worker in ``schedule_indexes``. The change bus drops a
+league's index on every change. Edits made through ``ScheduleService``
+update the index in place and put it back after their commit, unless another
+change reached the worker meanwhile. A match on one of the club's shared
+courts (``LeagueMatch.court_id``) is also checked against the other leagues'
+matches on that court, with one query over the moved time range.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from api.cache.bus import add_change_listener, publish_change
+from api.cache.store import ALL_LEAGUES
+from api.db.models import Court, League, LeagueMatch, MatchParticipant
+from api.observability.timing import phase
+from api.observability.tracing import traced
+from api.services.authorization import admin_authorizer
+
+MATCH_DURATION_MINUTES = int(os.environ.get('MATCH_DURATION_MINUTES', '60'))
+
+
+def _timestamp(value: datetime) -> int:
+  if value.tzinfo is None:
+    value = value.replace(tzinfo=timezone.utc)  # SQLite returns naive UTC datetimes
+  return int(value.timestamp())
+
+
+class _Timeline:
+  """Sorted (start, match_id) pairs of one court or member."""
+
+  def __init__(self) -> None:
+    self._entries: list[tuple[int, str]] = []
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  def add(self, start: int, match_id: str) -> None:
+    insort(self._entries, (start, match_id))
+
+  def remove(self, start: int, match_id: str) -> None:
+    position = bisect_left(self._entries, (start, match_id))
+    if position < len(self._entries) and self._entries[position] == (start, match_id):
+      del self._entries[position]
+
+  def overlapping(self, start: int, duration: int) -> list[str]:
+    low = bisect_left(self._entries, (start - duration + 1, ''))
+    high = bisect_left(self._entries, (start + duration, ''))
+    return [match_id for _, match_id in self._entries[low:high]]
+
+
+@dataclass
+class _Slot:
+  court: str | None  # None: the match only books its players
+  start: int
+  members: tuple[str, ...]
+
+
+class ScheduleIndex:
+  def __init__(self, duration: timedelta = timedelta(minutes=MATCH_DURATION_MINUTES)) -> None:
+    self.duration = int(duration.total_seconds())
+    self._courts: defaultdict[str, _Timeline] = defaultdict(_Timeline)
+    self._members: defaultdict[str, _Timeline] = defaultdict(_Timeline)
+    self._slots: dict[str, _Slot] = {}
+
+  @classmethod
+  def build(cls, session: Session, league_id: str) -> ScheduleIndex:
+    index = cls()
+    rows = session.execute(
+      select(LeagueMatch.id, LeagueMatch.court, LeagueMatch.scheduled_at).where(LeagueMatch.league_id == league_id)
+    ).all()
+    members: defaultdict[str, list[str]] = defaultdict(list)
+    for match_id, member_id in session.execute(
+      select(MatchParticipant.match_id, MatchParticipant.member_id)
+      .join(LeagueMatch, LeagueMatch.id == MatchParticipant.match_id)
+      .where(LeagueMatch.league_id == league_id)
+    ):
+      members[match_id].append(member_id)
+    for match_id, court, scheduled_at in rows:
+      index.place(match_id, court, scheduled_at, members[match_id])
+    return index
+
+  def __len__(self) -> int:
+    return len(self._slots)
+
+  @property
+  def courts(self) -> list[str]:
+    return sorted(court for court, timeline in self._courts.items() if timeline)
+
+  def place(self, match_id: str, court: str | None, scheduled_at: datetime, member_ids: Iterable[str]) -> None:
+    self.remove(match_id)
+    slot = _Slot(court=court, start=_timestamp(scheduled_at), members=tuple(member_ids))
+    self._slots[match_id] = slot
+    if court is not None:
+      self._courts[court].add(slot.start, match_id)
+    for member_id in slot.members:
+      self._members[member_id].add(slot.start, match_id)
+
+  def remove(self, match_id: str) -> None:
+    slot = self._slots.pop(match_id, None)
+    if slot is None:
+      return
+    if slot.court is not None:
+      self._courts[slot.court].remove(slot.start, match_id)
+    for member_id in slot.members:
+      self._members[member_id].remove(slot.start, match_id)
+
+  def members_of(self, match_id: str) -> tuple[str, ...]:
+    slot = self._slots.get(match_id)
+    return slot.members if slot else ()
+
+  def conflicts(
+    self,
+    court: str | None,
+    scheduled_at: datetime,
+    member_ids: Iterable[str] = (),
+    ignore: Iterable[str] = ()
+  ) -> list[str]:
+    """Ids of matches that would overlap on the court or share a player with a match at scheduled_at."""
+    start = _timestamp(scheduled_at)
+    found: set[str] = set()
+    if court is not None and court in self._courts:
+      found.update(self._courts[court].overlapping(start, self.duration))
+    for member_id in member_ids:
+      if member_id in self._members:
+        found.update(self._members[member_id].overlapping(start, self.duration))
+    return sorted(found - set(ignore))
+
+  def free_slots(
+    self,
+    courts: Iterable[str],
+    start: datetime,
+    end: datetime,
+    member_ids: Iterable[str] = ()
+  ) -> list[tuple[str, datetime]]:
+    """Match-length slots from start (stepping by the match length) that end by end and are free."""
+    member_ids = tuple(member_ids)
+    step = timedelta(seconds=self.duration)
+    free: list[tuple[str, datetime]] = []
+    slot_start = start
+    while slot_start + step <= end:
+      if not member_ids or not self.conflicts(None, slot_start, member_ids):
+        free.extend((court, slot_start) for court in courts if not self.conflicts(court, slot_start))
+      slot_start += step
+    return free
+
+
+class ScheduleIndexRegistry:
+  """Per-worker indexes by league, dropped by the change bus."""
+
+  def __init__(self) -> None:
+    self._indexes: dict[str, ScheduleIndex] = {}
+    self._versions: defaultdict[str, int] = defaultdict(int)
+    self._cleared = 0  # club-wide invalidations count against every league
+    self._lock = threading.Lock()
+
+  def __len__(self) -> int:
+    return len(self._indexes)
+
+  def get(self, session: Session, league_id: str) -> tuple[ScheduleIndex, int]:
+    with self._lock:
+      index, version = self._indexes.get(league_id), self._version(league_id)
+    if index is None:
+      index = ScheduleIndex.build(session, league_id)
+      with self._lock:
+        if self._version(league_id) == version:
+          self._indexes[league_id] = index
+    return index, version
+
+  def put_after_commit(self, league_id: str, index: ScheduleIndex, version: int) -> None:
+    """Keep an index edited by a commit, unless a change other than that commit arrived meanwhile."""
+    with self._lock:
+      if self._version(league_id) - version <= 1:
+        self._indexes[league_id] = index
+
+  def invalidate(self, scope: str) -> None:
+    with self._lock:
+      if scope == ALL_LEAGUES:
+        self._cleared += 1
+        self._indexes.clear()
+      else:
+        self._versions[scope] += 1
+        self._indexes.pop(scope, None)
+
+  def _version(self, league_id: str) -> int:
+    return self._versions[league_id] + self._cleared
+
+  def clear(self) -> None:
+    self.invalidate(ALL_LEAGUES)
+
+
+schedule_indexes = ScheduleIndexRegistry()
+add_change_listener(schedule_indexes.invalidate)
+
+
+@traced
+class ScheduleService:
+  def __init__(self, session: Session) -> None:
+    self._session = session
+
+  def move_match(self, match: LeagueMatch, scheduled_at: datetime | None, court: str | None) -> None:
+    """Apply a time/court edit after checking it against the index; commits."""
+    index, version = schedule_indexes.get(self._session, match.league_id)
+    scheduled_at = scheduled_at or match.scheduled_at
+    court = court or match.court
+    members = index.members_of(match.id)
+    conflicts = index.conflicts(court, scheduled_at, members, ignore=(match.id,))
+    court_id = self._club_courts([court]).get(court)
+    if court_id is not None:
+      conflicts = sorted(set(conflicts) | set(self._club_conflicts([(match.id, court_id, scheduled_at)], ignore=(match.id,))))
+    if conflicts:
+      raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f'Court or players already booked by match(es) {", ".join(conflicts)}'
+      )
+
+    match.scheduled_at = scheduled_at
+    match.court = court
+    match.court_id = court_id
+    publish_change(self._session, match.league_id)
+    self._session.commit()
+    index.place(match.id, court, scheduled_at, members)
+    schedule_indexes.put_after_commit(match.league_id, index, version)
+
+  def free_slots(
+    self,
+    league_id: str,
+    start: datetime,
+    end: datetime,
+    courts: list[str] | None = None,
+    member_ids: list[str] | None = None
+  ) -> list[tuple[str, datetime]]:
+    with phase('db'):
+      league = self._session.get(League, league_id)
+      if league is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='League not found')
+      index, _ = schedule_indexes.get(self._session, league_id)
+    if not courts:
+      numbered = [f'Court {number}' for number in range(1, (league.courts_count or 1) + 1)]
+      courts = sorted(set(numbered) | set(index.courts))
+    with phase('schedule'):
+      return index.free_slots(courts, start, end, member_ids or ())
+
+  def shift(
+    self,
+    league_id: str,
+    admin_id: str,
+    minutes: int = 0,
+    court: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    to_court: str | None = None
+  ) -> list[LeagueMatch]:
+    """
+    Move the league's unplayed matches on court (default: all courts) that start
+    in [start, end) by minutes and/or onto to_court, in one UPDATE statement.
+    Rejected with 409 if a moved match would collide with one that stays or
+    with another moved match at its new time.
+    """
+    with phase('db'):
+      if self._session.get(League, league_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='League not found')
+      admin_authorizer.require_admin(self._session, admin_id)
+      query = select(LeagueMatch).where(LeagueMatch.league_id == league_id, LeagueMatch.status == 'scheduled')
+      if court is not None:
+        query = query.where(LeagueMatch.court == court)
+      if start is not None:
+        query = query.where(LeagueMatch.scheduled_at >= start)
+      if end is not None:
+        query = query.where(LeagueMatch.scheduled_at < end)
+      matches = self._session.execute(query.order_by(LeagueMatch.scheduled_at)).scalars().all()
+      index, version = schedule_indexes.get(self._session, league_id)
+
+    delta = timedelta(minutes=minutes)
+    moving = {match.id for match in matches}
+    club_courts = self._club_courts({to_court or match.court for match in matches})
+    with phase('schedule'):
+      # Moved matches are checked against the ones that stay and, at their new times, against each other.
+      moved = ScheduleIndex(timedelta(seconds=index.duration))
+      for match in matches:
+        target, scheduled_at, members = to_court or match.court, match.scheduled_at + delta, index.members_of(match.id)
+        conflicts = sorted(
+          set(index.conflicts(target, scheduled_at, members, ignore=moving))
+          | set(moved.conflicts(target, scheduled_at, members))
+        )
+        if conflicts:
+          raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f'Shifted match {match.id} would collide with match(es) {", ".join(conflicts)}'
+          )
+        moved.place(match.id, target, scheduled_at, members)
+
+    rows = [
+      {
+        'match_id': match.id,
+        'new_scheduled_at': match.scheduled_at + delta,
+        'new_court': to_court or match.court,
+        'new_court_id': club_courts.get(to_court or match.court)
+      }
+      for match in matches
+    ]
+    club_moves = [
+      (row['match_id'], row['new_court_id'], row['new_scheduled_at']) for row in rows if row['new_court_id'] is not None
+    ]
+    if club_moves:
+      with phase('db'):
+        conflicts = self._club_conflicts(club_moves, ignore=moving)
+      if conflicts:
+        raise HTTPException(
+          status_code=status.HTTP_409_CONFLICT,
+          detail=f'Shifted matches would collide on a club court with match(es) {", ".join(conflicts)}'
+        )
+    if rows:
+      with phase('persist'):
+        # One statement executed for every row: datetime arithmetic is not portable across dialects.
+        self._session.connection().execute(
+          update(LeagueMatch.__table__)
+          .where(LeagueMatch.__table__.c.id == bindparam('match_id'))
+          .values(
+            scheduled_at=bindparam('new_scheduled_at'),
+            court=bindparam('new_court'),
+            court_id=bindparam('new_court_id')
+          ),
+          rows
+        )
+    publish_change(self._session, league_id)
+    with phase('commit'):
+      self._session.commit()
+
+    for match, row in zip(matches, rows):
+      # The UPDATE bypassed the ORM; record the new values without reloading.
+      set_committed_value(match, 'scheduled_at', row['new_scheduled_at'])
+      set_committed_value(match, 'court', row['new_court'])
+      set_committed_value(match, 'court_id', row['new_court_id'])
+      index.place(match.id, row['new_court'], row['new_scheduled_at'], index.members_of(match.id))
+    schedule_indexes.put_after_commit(league_id, index, version)
+    return matches
+
+  def _club_courts(self, names: Iterable[str]) -> dict[str, int]:
+    names = [name for name in names if name]
+    if not names:
+      return {}
+    return dict(self._session.execute(select(Court.name, Court.id).where(Court.name.in_(names))).all())
+
+  def _club_conflicts(self, moves: list[tuple[str, int, datetime]], ignore: Iterable[str] = ()) -> list[str]:
+    """
+    Matches of any league overlapping (match_id, court_id, scheduled_at) moves
+    on the club's courts, including the moved matches at their new times.
+    """
+    duration = timedelta(minutes=MATCH_DURATION_MINUTES)
+    times = [scheduled_at for _, _, scheduled_at in moves]
+    rows = self._session.execute(
+      select(LeagueMatch.id, LeagueMatch.court_id, LeagueMatch.scheduled_at).where(
+        LeagueMatch.court_id.in_({court_id for _, court_id, _ in moves}),
+        LeagueMatch.scheduled_at > min(times) - duration,
+        LeagueMatch.scheduled_at < max(times) + duration
+      )
+    ).all()
+    ignore = set(ignore)
+    index = ScheduleIndex(duration)
+    for match_id, court_id, scheduled_at in rows:
+      if match_id not in ignore:
+        index.place(match_id, str(court_id), scheduled_at, ())
+    found: set[str] = set()
+    for match_id, court_id, scheduled_at in moves:
+      found.update(index.conflicts(str(court_id), scheduled_at, ignore=(match_id,)))
+      index.place(match_id, str(court_id), scheduled_at, ())
+    return sorted(found)
@@ -0,0 +1,72 @@
+"""
+Vectorized Monte Carlo kernel for qualification odds.
+
+Only imports NumPy so process-pool workers start quickly. One call plays
+``simulations`` copies of the remaining matches at once: outcomes are an
+``(simulations, matches)`` array, and per-player totals come from
+multiplying the per-match points by the ``(matches, players)`` team
+incidence matrices. A simulated match has no ties: the winner takes 6 games
+and the loser 0-4, uniformly.
+
+Players are ordered within their group like ``RankingService`` (wins, then
+points difference, then points for); players still level after that are
+ordered at random, since the real order between them is arbitrary.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+WINNING_GAMES = 6
+MAX_LOSING_GAMES = 4
+
+
+@dataclass
+class SimulationInput:
+  """Current standings of every player and the remaining matches, as arrays."""
+  wins: np.ndarray          # (players,)
+  points_diff: np.ndarray   # (players,)
+  points_for: np.ndarray    # (players,)
+  groups: np.ndarray        # (players,) group number of each player
+  team_a: np.ndarray        # (matches, width) player indices, -1 padded
+  team_b: np.ndarray        # (matches, width)
+  win_probability: np.ndarray  # (matches,) chance that team A wins
+
+
+def _incidence(teams: np.ndarray, players: int) -> np.ndarray:
+  matrix = np.zeros((len(teams), players), dtype=np.float64)
+  rows, slots = np.nonzero(teams >= 0)
+  matrix[rows, teams[rows, slots]] = 1.0
+  return matrix
+
+
+def qualification_counts(data: SimulationInput, top_n: int, simulations: int, seed: np.random.SeedSequence) -> np.ndarray:
+  """How many of ``simulations`` runs end with each player in the top ``top_n`` of their group."""
+  rng = np.random.default_rng(seed)
+  players = len(data.wins)
+  team_a = _incidence(data.team_a, players)
+  team_b = _incidence(data.team_b, players)
+
+  a_wins = rng.random((simulations, len(data.win_probability))) < data.win_probability
+  losing = rng.integers(0, MAX_LOSING_GAMES + 1, size=a_wins.shape)
+  score_a = np.where(a_wins, WINNING_GAMES, losing)
+  score_b = np.where(a_wins, losing, WINNING_GAMES)
+
+  wins = data.wins + a_wins @ team_a + ~a_wins @ team_b
+  points_diff = data.points_diff + (score_a - score_b) @ (team_a - team_b)
+  points_for = data.points_for + score_a @ team_a + score_b @ team_b
+
+  # One lexicographic key (wins, points_diff, points_for) plus a random tie-break below 1.
+  diff_span = np.abs(points_diff).max() + 1
+  for_span = points_for.max() + 1
+  keys = ((wins * (2 * diff_span + 1) + points_diff + diff_span) * for_span + points_for
+          + rng.random(points_for.shape))
+
+  counts = np.zeros(players, dtype=np.int64)
+  for group in np.unique(data.groups):
+    members = np.flatnonzero(data.groups == group)
+    ranks = np.argsort(np.argsort(-keys[:, members], axis=1), axis=1)
+    counts[members] = (ranks < top_n).sum(axis=0)
+  return counts
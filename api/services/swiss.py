@@ -0,0 +1,246 @@
+"""
+Swiss-system stage for large leagues, singles or doubles.
+
+Entrants are players (singles) or fixed teams (doubles: the strongest
+applicant partners the weakest, the second strongest the second weakest,
+and so on). Each round pairs entrants with similar standings who have not
+met yet. An odd entrant out gets a bye (a win, at most one per entrant
+while anyone else is still owed one).
+
+Standings live in ``SwissEntrant`` rows, a projection that ``record_result``
+updates as each score comes in (score, wins, points, opponents met), so
+pairing a round never rescans match history: it sorts the entrants once by
+(score, points difference, points for, seed) and walks down the list,
+giving each entrant the next one below it that it has not met. The sort is
+O(n log n) and the walk rarely looks more than a few places down; a final
+pass swaps partners between pairs to undo the rematches the greedy walk
+leaves at the bottom. When the last match of a round is scored, the next round is
+generated, until ``League.swiss_rounds`` (default ``ceil(log2(entrants))``).
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from api.cache.bus import publish_change
+from api.db.models import INACTIVE_APPLICATION_STATUSES, League, LeagueApplication, LeagueMatch, MatchParticipant, SwissEntrant, new_id
+from api.observability.timing import phase
+from api.observability.tracing import traced
+from api.services.authorization import admin_authorizer
+from api.services.club_scheduler import ClubScheduler
+from api.services.generation_guard import lock_league
+from api.services.pairing_optimizer import member_strength
+
+
+def standing_key(entrant: SwissEntrant) -> tuple:
+  return (-entrant.score, -(entrant.points_for - entrant.points_against), -entrant.points_for, entrant.seed)
+
+
+def swiss_pairs(ranked: Sequence[int], met: dict[int, set[int]]) -> list[tuple[int, int]]:
+  """Pair ``ranked`` ids (best first, even count) top-down, avoiding rematches where possible."""
+  unpaired = list(ranked)
+  pairs: list[tuple[int, int]] = []
+  while unpaired:
+    first = unpaired.pop(0)
+    partner = next((position for position, other in enumerate(unpaired) if other not in met.get(first, ())), 0)
+    pairs.append((first, unpaired.pop(partner)))
+
+  # The greedy walk can leave rematches at the bottom; swap partners with a pair above.
+  for position in range(len(pairs) - 1, -1, -1):
+    first, second = pairs[position]
+    if second not in met.get(first, ()):
+      continue
+    for other in range(position - 1, -1, -1):
+      third, fourth = pairs[other]
+      if fourth not in met.get(first, ()) and second not in met.get(third, ()):
+        pairs[position], pairs[other] = (first, fourth), (third, second)
+        break
+      if third not in met.get(first, ()) and second not in met.get(fourth, ()):
+        pairs[position], pairs[other] = (first, third), (fourth, second)
+        break
+  return pairs
+
+
+@traced
+class SwissStageService:
+  def __init__(self, session: Session) -> None:
+    self._session = session
+
+  def start(
+    self,
+    league_id: str,
+    admin_id: str,
+    mode: str = 'doubles',
+    rounds: int | None = None,
+    courts_count: int | None = None
+  ) -> list[LeagueMatch]:
+    """Replace the league's matches with a Swiss stage and generate round 1."""
+    with phase('db'):
+      league = self._session.get(League, league_id)
+      if not league:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='League not found')
+      admin_authorizer.require_admin(self._session, admin_id)
+      league = lock_league(self._session, league_id)
+
+      applications = self._session.execute(
+        select(LeagueApplication)
+        .where(
+          LeagueApplication.league_id == league_id,
+          LeagueApplication.status.notin_(INACTIVE_APPLICATION_STATUSES)
+        )
+        .order_by(LeagueApplication.applied_at.asc())
+      ).scalars().all()
+      members = [application.member for application in applications if application.member]
+
+    with phase('pairing'):
+      ranked = sorted(members, key=lambda member: -member_strength(member))
+      if mode == 'singles':
+        teams = [(member, None) for member in ranked]
+      else:
+        if len(ranked) % 2:
+          raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Doubles Swiss needs an even number of players')
+        half = len(ranked) // 2
+        teams = list(zip(ranked[:half], reversed(ranked[half:])))
+      if len(teams) < 2:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Need at least two entrants for a Swiss stage')
+
+    with phase('db'):
+      for application in applications:
+        application.status = 'scheduled'
+      self._session.query(LeagueMatch).filter(LeagueMatch.league_id == league_id).delete()
+      self._session.query(SwissEntrant).filter(SwissEntrant.league_id == league_id).delete()
+      entrants = [
+        SwissEntrant(
+          league_id=league_id,
+          member_a_id=first.id,
+          member_b_id=second.id if second else None,
+          name=f'{first.full_name}, {second.full_name}' if second else first.full_name,
+          seed=seed,
+          score=0.0, wins=0, losses=0, points_for=0, points_against=0, byes=0,
+          opponents=[]
+        )
+        for seed, (first, second) in enumerate(teams, start=1)
+      ]
+      self._session.add_all(entrants)
+      self._session.flush()
+
+    league.final_stage_mode = None
+    league.swiss_rounds = min(rounds or math.ceil(math.log2(len(entrants))), len(entrants) - 1)
+    league.swiss_round = 0
+    if courts_count:
+      league.courts_count = courts_count
+    league.bracket_generated_at = datetime.now(timezone.utc)
+    matches = self._generate_round(league, entrants)
+    publish_change(self._session, league_id)
+    with phase('commit'):
+      self._session.commit()
+    return matches
+
+  def standings(self, league_id: str) -> list[SwissEntrant]:
+    if self._session.get(League, league_id) is None:
+      raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='League not found')
+    entrants = self._session.execute(
+      select(SwissEntrant).where(SwissEntrant.league_id == league_id)
+    ).scalars().all()
+    return sorted(entrants, key=standing_key)
+
+  def record_result(self, match: LeagueMatch) -> list[LeagueMatch]:
+    """Apply a scored Swiss match to the standings; returns the next round if this one is now complete."""
+    sides: dict[str, set[str]] = {'team_a': set(), 'team_b': set()}
+    for participant in match.participants:
+      sides[participant.team].add(participant.member_id)
+    entrants = self._session.execute(
+      select(SwissEntrant).where(
+        SwissEntrant.league_id == match.league_id,
+        SwissEntrant.member_a_id.in_(sides['team_a'] | sides['team_b'])
+      )
+    ).scalars().all()
+    by_side = {
+      team: next((entrant for entrant in entrants if entrant.member_a_id in members), None)
+      for team, members in sides.items()
+    }
+    entrant_a, entrant_b = by_side['team_a'], by_side['team_b']
+    if entrant_a is None or entrant_b is None:
+      return []
+
+    score_a, score_b = match.score_a or 0, match.score_b or 0
+    for entrant, scored, conceded in ((entrant_a, score_a, score_b), (entrant_b, score_b, score_a)):
+      entrant.points_for += scored
+      entrant.points_against += conceded
+      if scored > conceded:
+        entrant.wins += 1
+        entrant.score += 1.0
+      elif scored < conceded:
+        entrant.losses += 1
+      else:
+        entrant.draws += 1
+        entrant.score += 0.5
+    self._session.flush()
+
+    open_matches = self._session.execute(
+      select(func.count(LeagueMatch.id)).where(
+        LeagueMatch.league_id == match.league_id,
+        LeagueMatch.stage == 'swiss',
+        LeagueMatch.round == match.round,
+        LeagueMatch.status != 'completed'
+      )
+    ).scalar_one()
+    league = self._session.get(League, match.league_id)
+    if open_matches or league is None or (league.swiss_round or 0) >= (league.swiss_rounds or 0):
+      return []
+    return self._generate_round(league, self.standings(league.id))
+
+  def _generate_round(self, league: League, entrants: Sequence[SwissEntrant]) -> list[LeagueMatch]:
+    round_number = (league.swiss_round or 0) + 1
+    with phase('pairing'):
+      ranked = sorted(entrants, key=standing_key)
+      bye = None
+      if len(ranked) % 2:
+        fewest = min(entrant.byes for entrant in ranked)
+        bye = next(entrant for entrant in reversed(ranked) if entrant.byes == fewest)
+        ranked.remove(bye)
+        bye.byes += 1
+        bye.wins += 1
+        bye.score += 1.0
+      by_id = {entrant.id: entrant for entrant in ranked}
+      met = {entrant.id: set(entrant.opponents) for entrant in ranked}
+      pairs = swiss_pairs([entrant.id for entrant in ranked], met)
+
+    with phase('schedule'):
+      courts = max(1, league.courts_count or 1)
+      base_time = datetime.now(timezone.utc) + (timedelta(days=1) if round_number == 1 else timedelta(hours=1))
+      matches: list[LeagueMatch] = []
+      for index, (first_id, second_id) in enumerate(pairs):
+        first, second = by_id[first_id], by_id[second_id]
+        first.opponents = [*first.opponents, second.id]
+        second.opponents = [*second.opponents, first.id]
+        match = LeagueMatch(
+          id=new_id(),
+          league_id=league.id,
+          round=round_number,
+          group_number=1,
+          stage='swiss',
+          player_a=first.name[:80],
+          player_b=second.name[:80],
+          court=f'Court {index % courts + 1}',
+          scheduled_at=base_time + timedelta(hours=index // courts),
+          status='scheduled'
+        )
+        self._session.add(match)
+        for entrant, team in ((first, 'team_a'), (second, 'team_b')):
+          for member_id in filter(None, (entrant.member_a_id, entrant.member_b_id)):
+            self._session.add(MatchParticipant(match_id=match.id, member_id=member_id, team=team))
+        matches.append(match)
+
+    league.swiss_round = round_number
+    # On the club's shared courts the round goes into the first free slots instead.
+    ClubScheduler(self._session).place_matches(matches, base_time)
+    with phase('persist'):
+      self._session.flush()
+    return matches
@@ -7,10 +7,13 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from api.db.models import League, LeagueMatch
+from api.observability.tracing import traced
+from api.services.generation_guard import lock_league
 from api.services.matches import LeagueMatchService
 from api.services.rankings import RankingService
 
 
+@traced
 class TournamentService:
   def __init__(self, session: Session) -> None:
     self._session = session
@@ -26,9 +29,7 @@ class TournamentService:
     Generate knockout tournament bracket from preliminary round results.
     Takes top N players from each group and creates single-elimination matches.
     """
-    league = self._session.get(League, league_id)
-    if not league:
-      raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='League not found')
+    league = lock_league(self._session, league_id)
 
     ranking_service = RankingService(self._session)
     top_players_by_group = ranking_service.get_top_players_per_group(league_id, top_n_per_group)
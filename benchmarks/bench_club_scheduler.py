@@ -0,0 +1,170 @@
+"""Placing a season of concurrent leagues on the club's shared courts.
+
+Simulates ``--leagues`` leagues of ``--players`` doubles players each (a
+quarter of every league also plays in the next one) on ``--courts`` courts
+open 07:00-22:00. Each league generates a preliminary round (three matches
+per player) and then ``--rounds`` further rounds of one match per player,
+interleaved week by week the way leagues run side by side, each round
+placed with ``ClubCalendar.place_rounds`` after the league's previous round.
+
+Reported per phase (median / p95 / max over the generations):
+
+* ``insert``: placing one generation into the calendar that already holds
+  the season so far: the incremental path.
+* ``rebuild``: what ``ClubScheduler`` does per request without the SQL:
+  booking every match placed so far into a fresh calendar, then placing.
+* ``full``: re-solving the whole season from scratch, once.
+
+The run fails if any court or player is double-booked.
+
+Usage:
+  python -m benchmarks.bench_club_scheduler [--leagues 12] [--players 32] [--rounds 8] [--courts 10] [--seed 7] [--output club.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from api.services.club_scheduler import ClubCalendar, CourtHours, Placement
+
+SEASON_START = datetime(2024, 3, 4, tzinfo=timezone.utc)
+OPEN_HOURS = (7 * 60, 22 * 60)
+
+
+def _courts(count: int) -> list[CourtHours]:
+  return [
+    CourtHours(court_id=number, name=f'Court {number}', windows={day: [OPEN_HOURS] for day in range(7)})
+    for number in range(1, count + 1)
+  ]
+
+
+def _season(leagues: int, players: int, rounds: int, seed: int) -> list[tuple[int, datetime, list[tuple[int, list[str]]]]]:
+  """(league, not before, [(round, member ids)]) generations in the order leagues would request them."""
+  rng = random.Random(seed)
+  shared = players // 4
+  rosters = [
+    [f'p{league * (players - shared) + index}' for index in range(players)]
+    for league in range(leagues)
+  ]
+  generations = []
+  for round_number in range(1, rounds + 2):
+    for league, roster in enumerate(rosters):
+      matches_per_player = 3 if round_number == 1 else 1
+      requests = []
+      for _ in range(matches_per_player):
+        order = rng.sample(roster, len(roster))
+        requests.extend((round_number, order[start:start + 4]) for start in range(0, len(order) - 3, 4))
+      not_before = SEASON_START + timedelta(weeks=round_number - 1, hours=league)
+      generations.append((league, not_before, requests))
+  return generations
+
+
+def _place(calendar: ClubCalendar, last_end: dict[int, datetime], league: int, not_before: datetime, requests) -> list[Placement]:
+  placements = calendar.place_rounds(requests, max(not_before, last_end.get(league, not_before)))
+  if placements is None:
+    sys.exit('season does not fit in the scheduling horizon; add courts or lower --rounds')
+  last_end[league] = max(placement.scheduled_at for placement in placements) + calendar.duration
+  return placements
+
+
+def _check(booked: list[tuple[Placement, list[str]]], duration: timedelta) -> int:
+  """Count court and player double-bookings."""
+  by_key: defaultdict[str, list[datetime]] = defaultdict(list)
+  for placement, member_ids in booked:
+    by_key[f'court:{placement.court_id}'].append(placement.scheduled_at)
+    for member_id in member_ids:
+      by_key[member_id].append(placement.scheduled_at)
+  clashes = 0
+  for starts in by_key.values():
+    starts.sort()
+    clashes += sum(1 for earlier, later in zip(starts, starts[1:]) if later - earlier < duration)
+  return clashes
+
+
+def _summary(seconds: list[float]) -> dict:
+  ordered = sorted(seconds)
+  return {
+    'median_ms': statistics.median(ordered) * 1000,
+    'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+    'max_ms': ordered[-1] * 1000
+  }
+
+
+def run(leagues: int, players: int, rounds: int, courts: int, seed: int) -> dict:
+  generations = _season(leagues, players, rounds, seed)
+  court_hours = _courts(courts)
+
+  calendar = ClubCalendar(court_hours, SEASON_START, zone='UTC', horizon_days=366)
+  last_end: dict[int, datetime] = {}
+  booked: list[tuple[Placement, list[str]]] = []
+  insert_times, rebuild_times = [], []
+  for league, not_before, requests in generations:
+    # Per-request path of the service: a fresh calendar holding the season so far.
+    started = time.perf_counter()
+    fresh = ClubCalendar(court_hours, not_before, zone='UTC', horizon_days=366)
+    for position, (placement, member_ids) in enumerate(booked):
+      if placement.scheduled_at + fresh.duration > not_before:
+        fresh.book(str(position), placement.court_id, placement.scheduled_at, member_ids)
+    _place(fresh, dict(last_end), league, not_before, requests)
+    rebuild_times.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    placements = _place(calendar, last_end, league, not_before, requests)
+    insert_times.append(time.perf_counter() - started)
+    booked.extend((placement, member_ids) for placement, (_, member_ids) in zip(placements, requests))
+
+  started = time.perf_counter()
+  full = ClubCalendar(court_hours, SEASON_START, zone='UTC', horizon_days=366)
+  full_end: dict[int, datetime] = {}
+  for league, not_before, requests in generations:
+    _place(full, full_end, league, not_before, requests)
+  full_seconds = time.perf_counter() - started
+
+  last_start = max(placement.scheduled_at for placement, _ in booked)
+  return {
+    'leagues': leagues, 'players': players, 'rounds': rounds + 1, 'courts': courts,
+    'matches': len(booked), 'generations': len(generations),
+    'season_days': (last_start - SEASON_START).days + 1,
+    'clashes': _check(booked, calendar.duration),
+    'insert': _summary(insert_times),
+    'rebuild': _summary(rebuild_times),
+    'full_ms': full_seconds * 1000
+  }
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--leagues', type=int, default=12)
+  parser.add_argument('--players', type=int, default=32)
+  parser.add_argument('--rounds', type=int, default=8, help='Rounds after the preliminary round')
+  parser.add_argument('--courts', type=int, default=10)
+  parser.add_argument('--seed', type=int, default=7)
+  parser.add_argument('--output', type=Path, help='Write the result as JSON to this file')
+  args = parser.parse_args()
+
+  result = run(args.leagues, args.players, args.rounds, args.courts, args.seed)
+  print(
+    f"{result['leagues']} leagues x {result['rounds']} rounds, {result['matches']} matches on "
+    f"{result['courts']} courts over {result['season_days']} days, {result['clashes']} clashes"
+  )
+  print(f"{'phase':<8} {'median':>9} {'p95':>9} {'max':>9}")
+  for phase in ('insert', 'rebuild'):
+    row = result[phase]
+    print(f"{phase:<8} {row['median_ms']:>7.2f}ms {row['p95_ms']:>7.2f}ms {row['max_ms']:>7.2f}ms")
+  print(f"{'full':<8} {result['full_ms']:>7.1f}ms (whole season, once)")
+  if args.output:
+    args.output.write_text(json.dumps(result, indent=2) + '\n', encoding='utf-8')
+  if result['clashes']:
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,149 @@
+"""Compare per-request commits with the group commit queue for score updates.
+
+N submitter threads each record K match scores through
+``LeagueMatchService.update_match_score`` against a copy of the synthetic club
+dataset (``benchmarks.dataset``) with one extra league holding the matches.
+In ``direct`` mode every submitter opens its own session and commits (one
+write lock and fsync per update); in ``group`` mode the same calls go through
+``GroupCommitWriter`` and share transactions.
+
+Usage:
+  python -m benchmarks.bench_group_commit [--submitters 16] [--updates 50] [--max-batch 32] [--max-delay-ms 2] [--dataset-leagues 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from api.db.models import League, LeagueMatch, new_id
+from api.db.writer import GroupCommitWriter
+from api.schemas.match import MatchScoreUpdateRequest
+from api.services.matches import LeagueMatchService
+from benchmarks import dataset
+
+
+def _seed(url: str, total: int) -> list[str]:
+  engine = create_engine(url, future=True)
+  league_id = new_id()
+  match_ids = [new_id() for _ in range(total)]
+  scheduled_at = datetime(2024, 4, 12, 9, 0, tzinfo=timezone.utc)
+  with engine.begin() as conn:
+    conn.execute(insert(League), [{
+      'id': league_id, 'name': 'bench', 'surface_type': 'hard', 'entry_fee': 0, 'max_participants': 128
+    }])
+    conn.execute(insert(LeagueMatch), [
+      {'id': match_id, 'league_id': league_id, 'round': 1, 'group_number': 1, 'stage': 'preliminary',
+       'player_a': 'A', 'player_b': 'B', 'court': 'Court 1', 'scheduled_at': scheduled_at}
+      for match_id in match_ids
+    ])
+  engine.dispose()
+  return match_ids
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+  ordered = sorted(values)
+  return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(mode: str, submitters: int, updates: int, max_batch: int, max_delay_ms: float, dataset_size: dict) -> dict:
+  with tempfile.TemporaryDirectory() as tmp:
+    url = f'sqlite:///{dataset.prepare(Path(tmp) / "bench.db", **dataset_size)}'
+    match_ids = _seed(url, submitters * updates)
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    engine = create_engine(url, future=True, pool_size=submitters, connect_args={'check_same_thread': False})
+    factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False, future=True)
+    writer = GroupCommitWriter(url, max_batch_size=max_batch, max_delay=max_delay_ms / 1000) if mode == 'group' else None
+
+    def submitter(chunk: list[str]) -> None:
+      nonlocal errors
+      for index, match_id in enumerate(chunk):
+        payload = MatchScoreUpdateRequest(score_a=6, score_b=index % 6)
+        started = time.perf_counter()
+        try:
+          if writer is None:
+            with factory() as session:
+              LeagueMatchService(session).update_match_score(match_id, payload)
+          else:
+            writer.submit(lambda s, match_id=match_id, payload=payload: (
+              LeagueMatchService(s).update_match_score(match_id, payload)
+            )).result()
+        except Exception:
+          with lock:
+            errors += 1
+          continue
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+          latencies.append(elapsed)
+
+    threads = [
+      threading.Thread(target=submitter, args=(match_ids[i * updates:(i + 1) * updates],))
+      for i in range(submitters)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    wall = time.perf_counter() - started
+
+    batches = writer.batches_committed if writer else len(latencies)
+    if writer:
+      writer.stop()
+    engine.dispose()
+
+  return {
+    'mode': mode,
+    'submitters': submitters,
+    'updates': len(latencies),
+    'errors': errors,
+    'transactions': batches,
+    'throughput_per_s': round(len(latencies) / wall, 1),
+    'p50_ms': round(_percentile(latencies, 0.50), 3),
+    'p95_ms': round(_percentile(latencies, 0.95), 3),
+    'p99_ms': round(_percentile(latencies, 0.99), 3),
+    'mean_ms': round(statistics.fmean(latencies), 3)
+  }
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--submitters', type=int, default=16)
+  parser.add_argument('--updates', type=int, default=50, help='Score updates per submitter')
+  parser.add_argument('--max-batch', type=int, default=32)
+  parser.add_argument('--max-delay-ms', type=float, default=2.0)
+  parser.add_argument('--json', action='store_true', help='Print results as JSON')
+  dataset.add_arguments(parser)
+  args = parser.parse_args()
+
+  dataset_size = {'members': args.dataset_members, 'leagues': args.dataset_leagues, 'seed': args.dataset_seed}
+  results = [
+    run(mode, args.submitters, args.updates, args.max_batch, args.max_delay_ms, dataset_size)
+    for mode in ('direct', 'group')
+  ]
+  if args.json:
+    print(json.dumps(results, indent=2))
+    return
+
+  for result in results:
+    print(
+      f"{result['mode']:<7} updates={result['updates']} errors={result['errors']} "
+      f"transactions={result['transactions']} throughput={result['throughput_per_s']}/s "
+      f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms"
+    )
+
+
+if __name__ == '__main__':
+  main()
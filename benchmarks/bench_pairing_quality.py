@@ -0,0 +1,114 @@
+"""Pairing quality versus time budget for skill-balanced preliminary pairing.
+
+For each group size, builds members with level-based ratings plus noise (as
+after a few rated matches) and compares random pairing
+(``generate_preliminary_pairs``) with ``pairing_optimizer.optimize_schedule``
+at several time budgets. Quality is the mean absolute gap between the team
+average ratings of a match (lower is better); ``valid`` is the share of runs
+that found a schedule without repeated partners. Each cell is averaged over
+``--runs`` seeds.
+
+Usage:
+  python -m benchmarks.bench_pairing_quality [--sizes 8 16 32 64] [--budgets-ms 5 20 50 100 200] [--runs 5] [--output quality.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+
+from api.db.models import Member
+from api.services.doubles_pairing import DoublesPairingService
+from api.services.pairing_optimizer import member_strength, optimize_schedule
+from api.services.ratings import initial_rating
+
+LEVELS = ('beginner', 'intermediate', 'advanced')
+
+
+def _members(size: int, seed: int) -> list[Member]:
+  rng = random.Random(seed)
+  members = []
+  for index in range(size):
+    level = rng.choice(LEVELS)
+    members.append(Member(
+      id=f'{index:032x}', full_name=f'Player {index}', level=level,
+      rating=initial_rating(level) + rng.gauss(0, 60)
+    ))
+  return members
+
+
+def _mean_gap(matches: list) -> float:
+  gaps = [
+    abs(member_strength(a1) + member_strength(a2) - member_strength(b1) - member_strength(b2)) / 2
+    for (a1, a2), (b1, b2) in matches
+  ]
+  return statistics.fmean(gaps) if gaps else 0.0
+
+
+def run(sizes: list[int], budgets_ms: list[float], runs: int, matches_per_player: int) -> list[dict]:
+  rows = []
+  # First call pays NumPy's import-time warm-up.
+  optimize_schedule([1500.0] * 8, time_budget=0.01, seed=0)
+  for size in sizes:
+    groups = [_members(size, seed) for seed in range(runs)]
+    gaps, timings = [], []
+    for seed, members in enumerate(groups):
+      random.seed(seed)
+      started = time.perf_counter()
+      matches = DoublesPairingService.generate_preliminary_pairs(members, matches_per_player)
+      timings.append(time.perf_counter() - started)
+      gaps.append(_mean_gap(matches))
+    rows.append({
+      'group_size': size, 'mode': 'random', 'budget_ms': None, 'mean_gap': statistics.fmean(gaps),
+      'valid': 1.0, 'iterations': None, 'elapsed_ms': statistics.fmean(timings) * 1000
+    })
+
+    for budget in budgets_ms:
+      gaps, valid, iterations, timings = [], 0, [], []
+      for seed, members in enumerate(groups):
+        result = optimize_schedule(
+          [member_strength(member) for member in members],
+          matches_per_player=matches_per_player, time_budget=budget / 1000, seed=seed
+        )
+        timings.append(result.seconds)
+        iterations.append(result.iterations)
+        if not result.violations:
+          valid += 1
+          gaps.append(result.mean_gap)
+      rows.append({
+        'group_size': size, 'mode': 'balanced', 'budget_ms': budget,
+        'mean_gap': statistics.fmean(gaps) if gaps else None, 'valid': valid / runs,
+        'iterations': statistics.fmean(iterations), 'elapsed_ms': statistics.fmean(timings) * 1000
+      })
+  return rows
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--sizes', type=int, nargs='+', default=[8, 16, 32, 64])
+  parser.add_argument('--budgets-ms', type=float, nargs='+', default=[5, 20, 50, 100, 200])
+  parser.add_argument('--runs', type=int, default=5)
+  parser.add_argument('--matches-per-player', type=int, default=3)
+  parser.add_argument('--output', type=Path, help='Write the rows as JSON to this file')
+  args = parser.parse_args()
+
+  rows = run(args.sizes, args.budgets_ms, args.runs, args.matches_per_player)
+  print(f"{'size':>4} {'mode':<8} {'budget':>8} {'mean gap':>9} {'valid':>6} {'iters':>7} {'elapsed':>9}")
+  for row in rows:
+    budget = '-' if row['budget_ms'] is None else f"{row['budget_ms']:.0f}ms"
+    gap = '-' if row['mean_gap'] is None else f"{row['mean_gap']:.1f}"
+    iterations = '-' if row['iterations'] is None else f"{row['iterations']:.0f}"
+    print(
+      f"{row['group_size']:>4} {row['mode']:<8} {budget:>8} {gap:>9} {row['valid']:>6.0%} "
+      f"{iterations:>7} {row['elapsed_ms']:>7.1f}ms"
+    )
+  if args.output:
+    args.output.write_text(json.dumps(rows, indent=2) + '\n', encoding='utf-8')
+
+
+if __name__ == '__main__':
+  main()
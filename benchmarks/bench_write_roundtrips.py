@@ -0,0 +1,178 @@
+"""Measure SQL round trips and latency of the mutating endpoints.
+
+Every request is sent through the ASGI app against a copy of the synthetic
+club dataset (``benchmarks.dataset``) while an engine listener counts the statements it issues. Passing
+``--expire-on-commit`` restores the previous session configuration, where the
+response serialisation after ``commit()`` reloads each object with an extra
+SELECT, so the two runs can be compared directly.
+
+Usage:
+  python -m benchmarks.bench_write_roundtrips [--iterations 200] [--expire-on-commit] [--json] [--dataset-members 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Iterator
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from api.db.session import get_session
+from api.main import app
+from benchmarks import dataset
+
+
+class StatementCounter:
+  def __init__(self) -> None:
+    self.counts: Counter[str] = Counter()
+
+  def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+    self.counts[statement.lstrip().split(None, 1)[0].upper()] += 1
+
+  def reset(self) -> None:
+    self.counts.clear()
+
+
+def _measure(
+  label: str,
+  iterations: int,
+  counter: StatementCounter,
+  send: Callable[[int], None]
+) -> dict:
+  timings: list[float] = []
+  totals: Counter[str] = Counter()
+  for index in range(iterations):
+    counter.reset()
+    started = time.perf_counter()
+    send(index)
+    timings.append((time.perf_counter() - started) * 1000)
+    totals.update(counter.counts)
+  return {
+    'endpoint': label,
+    'iterations': iterations,
+    'mean_ms': round(statistics.fmean(timings), 3),
+    'p50_ms': round(statistics.median(timings), 3),
+    'statements_per_request': {verb: round(count / iterations, 2) for verb, count in sorted(totals.items())}
+  }
+
+
+def run(iterations: int, expire_on_commit: bool, members: int, leagues: int, seed: int) -> list[dict]:
+  with tempfile.TemporaryDirectory() as tmp:
+    database = dataset.prepare(Path(tmp) / 'bench.db', members=members, leagues=leagues, seed=seed)
+    engine = create_engine(
+      f'sqlite:///{database}',
+      future=True,
+      connect_args={'check_same_thread': False}
+    )
+    factory = sessionmaker(
+      bind=engine,
+      autoflush=False,
+      autocommit=False,
+      expire_on_commit=expire_on_commit,
+      future=True
+    )
+
+    def override_get_session() -> Iterator[Session]:
+      session = factory()
+      try:
+        yield session
+      finally:
+        session.close()
+
+    counter = StatementCounter()
+    event.listen(engine, 'before_cursor_execute', counter)
+    app.dependency_overrides[get_session] = override_get_session
+    client = TestClient(app)
+
+    try:
+      admin_id = client.post(
+        '/members',
+        json={'full_name': '관리자', 'email': 'admin@tennis.club', 'level': 'advanced', 'role': 'admin'}
+      ).json()['id']
+      match_league_id = client.post(
+        '/leagues',
+        json={'name': 'bench', 'surface_type': 'hard', 'entry_fee': 0, 'max_participants': 128,
+              'auto_generate_bracket': False}
+      ).json()['id']
+      scheduled_at = datetime(2024, 4, 12, 9, 0, tzinfo=timezone.utc)
+      match_ids = [
+        client.post(
+          f'/leagues/{match_league_id}/matches',
+          json={'admin_id': admin_id, 'round': 1, 'group_number': 1, 'player_a': 'A', 'player_b': 'B',
+                'court': 'Court 1', 'scheduled_at': scheduled_at.isoformat()}
+        ).json()['id']
+        for _ in range(iterations)
+      ]
+      member_ids: list[str] = []
+      league_ids: list[str] = []
+
+      def create_member(index: int) -> None:
+        response = client.post(
+          '/members',
+          json={'full_name': f'Player {index}', 'email': f'player-{index}@bench.club', 'level': 'beginner'}
+        )
+        member_ids.append(response.json()['id'])
+
+      def create_league(index: int) -> None:
+        response = client.post(
+          '/leagues',
+          json={'name': f'League {index}', 'surface_type': 'clay', 'entry_fee': 0, 'max_participants': 128,
+                'auto_generate_bracket': False}
+        )
+        league_ids.append(response.json()['id'])
+
+      def create_application(index: int) -> None:
+        client.post(f'/leagues/{league_ids[0]}/applications', json={'member_id': member_ids[index]})
+
+      def update_score(index: int) -> None:
+        client.patch(f'/matches/{match_ids[index]}/score', json={'score_a': 6, 'score_b': index % 6})
+
+      def reschedule(index: int) -> None:
+        client.patch(
+          f'/matches/{match_ids[index]}',
+          json={'admin_id': admin_id, 'court': 'Court 2',
+                'scheduled_at': (scheduled_at + timedelta(hours=1)).isoformat()}
+        )
+
+      return [
+        _measure('POST /members', iterations, counter, create_member),
+        _measure('POST /leagues', iterations, counter, create_league),
+        _measure('POST /leagues/{id}/applications', min(iterations, 128), counter, create_application),
+        _measure('PATCH /matches/{id}/score', iterations, counter, update_score),
+        _measure('PATCH /matches/{id}', iterations, counter, reschedule)
+      ]
+    finally:
+      app.dependency_overrides.pop(get_session, None)
+      event.remove(engine, 'before_cursor_execute', counter)
+      engine.dispose()
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--iterations', type=int, default=200)
+  parser.add_argument('--expire-on-commit', action='store_true', help='Reload objects after commit (old behaviour)')
+  parser.add_argument('--json', action='store_true', help='Print results as JSON')
+  dataset.add_arguments(parser)
+  args = parser.parse_args()
+
+  results = run(args.iterations, args.expire_on_commit, args.dataset_members, args.dataset_leagues, args.dataset_seed)
+  if args.json:
+    print(json.dumps(results, indent=2))
+    return
+
+  for result in results:
+    statements = ', '.join(f'{verb}={count}' for verb, count in result['statements_per_request'].items())
+    print(f"{result['endpoint']:<36} mean={result['mean_ms']:>7.3f}ms p50={result['p50_ms']:>7.3f}ms  {statements}")
+
+
+if __name__ == '__main__':
+  main()
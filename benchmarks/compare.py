@@ -0,0 +1,99 @@
+"""Compare a benchmark run against a stored baseline and flag regressions.
+
+A case regresses when its median is more than ``--threshold`` slower than the
+baseline median *and* the difference exceeds the noise of both runs (the
+larger interquartile range, or ``--min-delta-ms`` for very fast cases).
+``--memory-budgets`` takes a JSON object of case key -> allowed ``peak_kib``
+(e.g. ``{"GET[route=/leagues]": 2048}``); a current case above its budget is
+reported as OVER BUDGET. Exits with status 1 on any regression or exceeded
+budget, so it can gate CI.
+
+Usage:
+  python -m benchmarks.run --output benchmarks/baseline.json          # once, on the reference machine
+  python -m benchmarks.run --output current.json
+  python -m benchmarks.compare benchmarks/baseline.json current.json [--threshold 0.10] [--memory-budgets budgets.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.harness import load_results
+
+
+def compare(baseline: dict[str, dict], current: dict[str, dict], threshold: float, min_delta_ms: float) -> list[dict]:
+  rows = []
+  for key in sorted(baseline.keys() | current.keys()):
+    before = baseline.get(key)
+    after = current.get(key)
+    if before is None or after is None:
+      rows.append({'case': key, 'status': 'new' if before is None else 'missing',
+                   'baseline_ms': before and before['median_ms'], 'current_ms': after and after['median_ms'],
+                   'change': None})
+      continue
+
+    delta = after['median_ms'] - before['median_ms']
+    change = delta / before['median_ms'] if before['median_ms'] else 0.0
+    noise = max(before['iqr_ms'], after['iqr_ms'], min_delta_ms)
+    if change > threshold and delta > noise:
+      verdict = 'REGRESSION'
+    elif change < -threshold and -delta > noise:
+      verdict = 'improved'
+    else:
+      verdict = 'ok'
+    rows.append({'case': key, 'status': verdict, 'baseline_ms': before['median_ms'],
+                 'current_ms': after['median_ms'], 'change': change})
+  return rows
+
+
+def check_budgets(current: dict[str, dict], budgets: dict[str, float]) -> list[dict]:
+  rows = []
+  for key, budget in sorted(budgets.items()):
+    peak = current.get(key, {}).get('extra', {}).get('peak_kib')
+    if peak is None:
+      status = 'missing'
+    else:
+      status = 'OVER BUDGET' if peak > budget else 'ok'
+    rows.append({'case': key, 'status': status, 'peak_kib': peak, 'budget_kib': budget})
+  return rows
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('baseline', type=Path)
+  parser.add_argument('current', type=Path)
+  parser.add_argument('--threshold', type=float, default=0.10, help='Allowed relative slowdown of the median')
+  parser.add_argument('--min-delta-ms', type=float, default=0.05, help='Ignore absolute differences below this')
+  parser.add_argument('--memory-budgets', type=Path, help='JSON object of case key -> maximum peak_kib')
+  args = parser.parse_args()
+
+  current_results = load_results(args.current)
+  rows = compare(load_results(args.baseline), current_results, args.threshold, args.min_delta_ms)
+  for row in rows:
+    baseline = '-' if row['baseline_ms'] is None else f"{row['baseline_ms']:.3f}ms"
+    current = '-' if row['current_ms'] is None else f"{row['current_ms']:.3f}ms"
+    change = '' if row['change'] is None else f"{row['change']:+.1%}"
+    print(f"{row['status']:<10} {row['case']:<60} {baseline:>12} -> {current:>12} {change:>8}")
+
+  over_budget = []
+  if args.memory_budgets:
+    for row in check_budgets(current_results, json.loads(args.memory_budgets.read_text(encoding='utf-8'))):
+      peak = '-' if row['peak_kib'] is None else f"{row['peak_kib']:.1f}KiB"
+      print(f"{row['status']:<10} {row['case']:<60} {peak:>12} / {row['budget_kib']:.1f}KiB")
+      if row['status'] == 'OVER BUDGET':
+        over_budget.append(row)
+
+  regressions = [row for row in rows if row['status'] == 'REGRESSION']
+  if regressions:
+    print(f'{len(regressions)} regression(s) beyond {args.threshold:.0%}', file=sys.stderr)
+  if over_budget:
+    print(f'{len(over_budget)} case(s) over their memory budget', file=sys.stderr)
+  if regressions or over_budget:
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,316 @@
+"""
+Deterministic synthetic club history for benchmarks.
+
+Generates tens of thousands of members and thousands of leagues spread over
+every stage of the league lifecycle (open for applications, preliminary in
+progress, ranked play-offs, elimination bracket, finished), with completed
+matches, participants and scores. Rows are built in Python from one seeded
+``random.Random`` and written with batched executemany inserts inside a single
+transaction, so the same arguments always produce the same database.
+
+Usage:
+  python -m benchmarks.dataset --database-url sqlite:///./bench_club.db [--members 20000] [--leagues 2000] [--seed 7]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import random
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable
+
+from sqlalchemy import Table, create_engine, insert
+from sqlalchemy.engine import Connection, make_url
+
+from api.db.models import Base, League, LeagueApplication, LeagueMatch, MatchParticipant, Member
+from api.services.ratings import initial_rating
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / '.bench_cache'
+GENERATOR_VERSION = 2  # bump when the generated data changes, so cached datasets are rebuilt
+
+SURNAMES = ['김', '이', '박', '최', '정', '강', '조', '윤', '장', '임', '한', '오', '서', '신', '권', '황']
+GIVEN_NAMES = ['민준', '서연', '도윤', '지우', '하준', '서윤', '시우', '지민', '주원', '하은', '지호', '수아', '준서', '예린']
+LEVELS = ['beginner'] * 50 + ['intermediate'] * 35 + ['advanced'] * 15
+SURFACES = ['hard', 'clay', 'grass', 'carpet']
+# Share of leagues per lifecycle stage.
+STAGES = ['open'] * 10 + ['preliminary'] * 20 + ['ranked'] * 15 + ['elimination'] * 15 + ['finished'] * 40
+SEASON_START = datetime(2023, 1, 1, 9, 0, tzinfo=timezone.utc)
+BATCH_SIZE = 10_000
+
+
+@dataclass
+class DatasetSummary:
+  members: int
+  leagues: int
+  applications: int
+  matches: int
+  participants: int
+  seconds: float
+
+
+class _Generator:
+  def __init__(self, seed: int) -> None:
+    self._rng = random.Random(seed)
+    self.members: list[dict] = []
+    self.leagues: list[dict] = []
+    self.applications: list[dict] = []
+    self.matches: list[dict] = []
+    self.participants: list[dict] = []
+
+  def _id(self) -> str:
+    return f'{self._rng.getrandbits(128):032x}'
+
+  def build(self, members: int, leagues: int) -> None:
+    for index in range(members):
+      member = {
+        'id': self._id(),
+        'full_name': f'{self._rng.choice(SURNAMES)}{self._rng.choice(GIVEN_NAMES)} {index:05d}',
+        'email': f'member{index:06d}@club.example',
+        'level': self._rng.choice(LEVELS),
+        'role': 'admin' if index == 0 else 'member',
+        'joined_at': SEASON_START + timedelta(minutes=index)
+      }
+      member['rating'] = initial_rating(member['level'])
+      self.members.append(member)
+    for index in range(leagues):
+      self._build_league(index)
+
+  def _build_league(self, index: int) -> None:
+    rng = self._rng
+    stage = rng.choice(STAGES)
+    max_participants = rng.choice([8, 16, 16, 16, 32])
+    if stage == 'elimination' and max_participants < 16:
+      stage = 'ranked'  # the eight-team bracket needs 16 players
+    groups = 2 if max_participants >= 16 else 1
+    courts = rng.randint(2, 6)
+    created_at = SEASON_START + timedelta(hours=6 * index)
+    league_id = self._id()
+    bracket_at = created_at + timedelta(days=7)
+
+    entrants = rng.sample(self.members, max_participants if stage != 'open' else rng.randint(1, max_participants - 1))
+    final_mode = {'ranked': 'ranked_play', 'elimination': 'elimination'}.get(stage)
+    if stage == 'finished':
+      final_mode = rng.choice(['ranked_play', 'elimination']) if max_participants >= 16 else None
+
+    self.leagues.append({
+      'id': league_id,
+      'name': f'{created_at:%Y} 시즌 리그 {index:04d}',
+      'surface_type': rng.choice(SURFACES),
+      'entry_fee': rng.choice([0, 10000, 20000, 30000]),
+      'max_participants': max_participants,
+      'auto_generate_bracket': True,
+      'groups_count': groups,
+      'courts_count': courts,
+      'final_stage_mode': final_mode,
+      'bracket_generated_at': None if stage == 'open' else bracket_at,
+      'created_at': created_at
+    })
+    for order, member in enumerate(entrants):
+      self.applications.append({
+        'id': self._id(),
+        'league_id': league_id,
+        'member_id': member['id'],
+        'status': 'pending' if stage == 'open' else 'scheduled',
+        'applied_at': created_at + timedelta(minutes=order)
+      })
+    if stage == 'open':
+      return
+
+    clock = _Clock(bracket_at + timedelta(days=1), courts)
+    completed_share = rng.uniform(0.2, 0.9) if stage == 'preliminary' else 1.0
+    for group_number in range(1, groups + 1):
+      group = entrants[group_number - 1::groups]
+      for team_a, team_b in self._preliminary_pairs(group):
+        self._add_match(league_id, 1, group_number, 'preliminary', team_a, team_b, clock,
+                        completed=rng.random() < completed_share)
+
+    if final_mode == 'ranked_play' and stage in ('ranked', 'finished'):
+      for _ in range(rng.choice([1, 2, 4])):
+        players = rng.sample(entrants, 4)
+        self._add_match(league_id, 2, 1, 'ranked', players[:2], players[2:], clock,
+                        completed=stage == 'finished' or rng.random() < 0.5)
+    elif final_mode == 'elimination' and stage in ('elimination', 'finished'):
+      self._add_elimination(league_id, entrants, clock, finished=stage == 'finished')
+
+  def _preliminary_pairs(self, group: list[dict]) -> Iterable[tuple[list[dict], list[dict]]]:
+    usable = len(group) - len(group) % 4
+    for _ in range(3):
+      shuffled = self._rng.sample(group, len(group))[:usable]
+      for start in range(0, usable, 4):
+        yield shuffled[start:start + 2], shuffled[start + 2:start + 4]
+
+  def _add_elimination(self, league_id: str, entrants: list[dict], clock: '_Clock', finished: bool) -> None:
+    assert len(entrants) >= 16, 'an eight-team bracket needs 16 entrants'
+    teams = [entrants[i:i + 2] for i in range(0, 16, 2)]
+    self._rng.shuffle(teams)
+    final_id = self._add_match(league_id, 4, 1, 'elimination', teams[0], teams[4], clock, completed=finished)
+    semifinal_ids = [
+      self._add_match(league_id, 3, index + 1, 'elimination', teams[index * 4], teams[index * 4 + 2], clock,
+                      completed=finished, next_match=(final_id, 'team_a' if index == 0 else 'team_b'))
+      for index in range(2)
+    ]
+    for index in range(4):
+      self._add_match(league_id, 2, index + 1, 'elimination', teams[index * 2], teams[index * 2 + 1], clock,
+                      completed=finished or self._rng.random() < 0.6,
+                      next_match=(semifinal_ids[index // 2], 'team_a' if index % 2 == 0 else 'team_b'))
+
+  def _add_match(
+    self,
+    league_id: str,
+    round_number: int,
+    group_number: int,
+    stage: str,
+    team_a: list[dict],
+    team_b: list[dict],
+    clock: '_Clock',
+    completed: bool,
+    next_match: tuple[str, str] | None = None
+  ) -> str:
+    match_id = self._id()
+    court, scheduled_at = clock.next_slot()
+    player_a = ', '.join(member['full_name'] for member in team_a)
+    player_b = ', '.join(member['full_name'] for member in team_b)
+    score_a = score_b = winner = completed_at = None
+    if completed:
+      loser_games = self._rng.randint(0, 4)
+      if self._rng.random() < 0.5:
+        score_a, score_b, winner = 6, loser_games, player_a
+      else:
+        score_a, score_b, winner = loser_games, 6, player_b
+      completed_at = scheduled_at + timedelta(minutes=self._rng.randint(35, 80))
+    self.matches.append({
+      'id': match_id,
+      'league_id': league_id,
+      'round': round_number,
+      'group_number': group_number,
+      'stage': stage,
+      'player_a': player_a,
+      'player_b': player_b,
+      'court': f'Court {court}',
+      'scheduled_at': scheduled_at,
+      'status': 'completed' if completed else 'scheduled',
+      'score_a': score_a,
+      'score_b': score_b,
+      'winner': winner,
+      'completed_at': completed_at,
+      'next_match_id': next_match[0] if next_match else None,
+      'next_match_slot': next_match[1] if next_match else None,
+      'created_at': scheduled_at - timedelta(days=1)
+    })
+    for team, members in (('team_a', team_a), ('team_b', team_b)):
+      for member in members:
+        self.participants.append({
+          'id': self._id(),
+          'match_id': match_id,
+          'member_id': member['id'],
+          'team': team,
+          'created_at': scheduled_at - timedelta(days=1)
+        })
+    return match_id
+
+
+class _Clock:
+  """Hands out consecutive (court, start) slots, one hour per match."""
+
+  def __init__(self, start: datetime, courts: int) -> None:
+    self._start = start
+    self._courts = courts
+    self._issued = 0
+
+  def next_slot(self) -> tuple[int, datetime]:
+    court = self._issued % self._courts + 1
+    scheduled_at = self._start + timedelta(hours=self._issued // self._courts)
+    self._issued += 1
+    return court, scheduled_at
+
+
+def _insert_batched(conn: Connection, table: Table, rows: list[dict]) -> None:
+  for start in range(0, len(rows), BATCH_SIZE):
+    conn.execute(insert(table), rows[start:start + BATCH_SIZE])
+
+
+def generate(database_url: str, members: int = 20_000, leagues: int = 2_000, seed: int = 7) -> DatasetSummary:
+  """Create the schema at ``database_url`` and bulk-load a synthetic club history into it."""
+  started = time.perf_counter()
+  generator = _Generator(seed)
+  generator.build(members, leagues)
+
+  engine = create_engine(database_url, future=True)
+  Base.metadata.create_all(bind=engine)
+  with engine.begin() as conn:
+    if engine.dialect.name == 'sqlite':
+      conn.exec_driver_sql('PRAGMA synchronous=OFF')
+    # Ordered so foreign keys always point at rows that already exist.
+    _insert_batched(conn, Member.__table__, generator.members)
+    _insert_batched(conn, League.__table__, generator.leagues)
+    _insert_batched(conn, LeagueApplication.__table__, generator.applications)
+    _insert_batched(conn, LeagueMatch.__table__, generator.matches)
+    _insert_batched(conn, MatchParticipant.__table__, generator.participants)
+  engine.dispose()
+
+  return DatasetSummary(
+    members=len(generator.members),
+    leagues=len(generator.leagues),
+    applications=len(generator.applications),
+    matches=len(generator.matches),
+    participants=len(generator.participants),
+    seconds=time.perf_counter() - started
+  )
+
+
+def _schema_fingerprint() -> str:
+  """Short hash of the table definitions and generator version, so changes to either regenerate the cached dataset."""
+  columns = sorted(f'{table.name}.{column.name}:{column.type}' for table in Base.metadata.tables.values() for column in table.columns)
+  columns.append(f'generator:{GENERATOR_VERSION}')
+  return hashlib.sha1('\n'.join(columns).encode()).hexdigest()[:8]
+
+
+def prepare(target: Path, members: int = 20_000, leagues: int = 2_000, seed: int = 7) -> Path:
+  """Copy a cached dataset (generated on first use) to ``target`` and return it."""
+  CACHE_DIR.mkdir(exist_ok=True)
+  cached = CACHE_DIR / f'club-m{members}-l{leagues}-s{seed}-{_schema_fingerprint()}.db'
+  if not cached.exists():
+    partial = cached.with_suffix('.partial')
+    partial.unlink(missing_ok=True)
+    generate(f'sqlite:///{partial}', members=members, leagues=leagues, seed=seed)
+    partial.rename(cached)
+  shutil.copyfile(cached, target)
+  return target
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+  """Dataset size options shared by the benchmark CLIs."""
+  parser.add_argument('--dataset-members', type=int, default=20_000, help='Members in the synthetic club')
+  parser.add_argument('--dataset-leagues', type=int, default=2_000, help='Leagues in the synthetic club')
+  parser.add_argument('--dataset-seed', type=int, default=7)
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--database-url', required=True, help='Target database (created if missing)')
+  parser.add_argument('--members', type=int, default=20_000)
+  parser.add_argument('--leagues', type=int, default=2_000)
+  parser.add_argument('--seed', type=int, default=7)
+  parser.add_argument('--overwrite', action='store_true', help='Delete an existing SQLite file first')
+  args = parser.parse_args()
+
+  url = make_url(args.database_url)
+  if url.get_backend_name() == 'sqlite' and url.database and Path(url.database).exists():
+    if not args.overwrite:
+      parser.error(f'{url.database} already exists; pass --overwrite to replace it')
+    Path(url.database).unlink()
+
+  summary = generate(args.database_url, members=args.members, leagues=args.leagues, seed=args.seed)
+  print(
+    f'{summary.members} members, {summary.leagues} leagues, {summary.applications} applications, '
+    f'{summary.matches} matches, {summary.participants} participants in {summary.seconds:.1f}s'
+  )
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,130 @@
+"""Timing loop and result format shared by the benchmark suite.
+
+Each case is a callable taking the iteration number (so cases that consume
+fresh rows per call can index into pre-built fixtures). It runs ``warmup``
+untimed iterations, then ``repeats`` timed ones with the garbage collector
+paused, and reports robust statistics in milliseconds. Comparisons should use
+``median_ms``; ``iqr_ms`` tells how noisy the case was on this machine.
+
+With ``track_memory`` the last warmup iteration runs under ``tracemalloc`` and
+its peak allocation is reported as ``extra['peak_kib']``, which
+``benchmarks.compare --memory-budgets`` checks against per-case budgets.
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+
+@dataclass
+class CaseResult:
+  name: str
+  params: dict
+  repeats: int
+  min_ms: float
+  median_ms: float
+  mean_ms: float
+  p95_ms: float
+  iqr_ms: float
+  extra: dict = field(default_factory=dict)
+
+  @property
+  def key(self) -> str:
+    if not self.params:
+      return self.name
+    return self.name + '[' + ','.join(f'{name}={value}' for name, value in sorted(self.params.items())) + ']'
+
+
+def _quantile(ordered: list[float], fraction: float) -> float:
+  position = fraction * (len(ordered) - 1)
+  lower = int(position)
+  upper = min(lower + 1, len(ordered) - 1)
+  return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def measure(
+  name: str,
+  fn: Callable[[int], object],
+  *,
+  params: dict | None = None,
+  warmup: int = 3,
+  repeats: int = 20,
+  track_memory: bool = False
+) -> CaseResult:
+  extra = {}
+  for index in range(warmup):
+    if track_memory and index == warmup - 1 and not tracemalloc.is_tracing():
+      extra['peak_kib'] = _peak_kib(fn, index)
+    else:
+      fn(index)
+
+  timings: list[float] = []
+  gc_was_enabled = gc.isenabled()
+  gc.collect()
+  gc.disable()
+  try:
+    for index in range(warmup, warmup + repeats):
+      started = time.perf_counter_ns()
+      fn(index)
+      timings.append((time.perf_counter_ns() - started) / 1e6)
+  finally:
+    if gc_was_enabled:
+      gc.enable()
+
+  ordered = sorted(timings)
+  return CaseResult(
+    name=name,
+    params=params or {},
+    repeats=repeats,
+    min_ms=round(ordered[0], 4),
+    median_ms=round(statistics.median(ordered), 4),
+    mean_ms=round(statistics.fmean(ordered), 4),
+    p95_ms=round(_quantile(ordered, 0.95), 4),
+    iqr_ms=round(_quantile(ordered, 0.75) - _quantile(ordered, 0.25), 4),
+    extra=extra
+  )
+
+
+def _peak_kib(fn: Callable[[int], object], index: int) -> float:
+  """Peak memory allocated by one call, in KiB, above what was live before it."""
+  gc.collect()
+  tracemalloc.start()
+  try:
+    baseline, _ = tracemalloc.get_traced_memory()
+    fn(index)
+    _, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  return round((peak - baseline) / 1024, 1)
+
+
+def environment() -> dict:
+  return {
+    'python': sys.version.split()[0],
+    'platform': platform.platform(),
+    'machine': platform.machine(),
+    'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
+  }
+
+
+def write_results(path: Path, results: list[CaseResult], metadata: dict) -> None:
+  document = {
+    'environment': environment(),
+    'metadata': metadata,
+    'results': {result.key: asdict(result) for result in results}
+  }
+  path.write_text(json.dumps(document, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+
+
+def load_results(path: Path) -> dict[str, dict]:
+  return json.loads(path.read_text(encoding='utf-8'))['results']
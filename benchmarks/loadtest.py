@@ -0,0 +1,269 @@
+"""Drive the API with scripted match-day traffic and report per-endpoint latency.
+
+The scenario runs in phases against one fresh league:
+
+  1. signup   ``--players`` members register and apply concurrently
+  2. bracket  an admin generates the preliminary bracket
+  3. play     ``--concurrency`` members poll the league, match list and
+              rankings while ``--admins`` admins enter every score (and
+              move every ``--reschedule-every``-th match to a free slot first)
+
+By default the app runs in process (``httpx.ASGITransport``, with the startup
+and shutdown hooks) on a copy of the synthetic club dataset. Pass ``--url`` to
+load a running server instead, e.g. ``uvicorn api.main:app --workers 4``.
+Mean ``Server-Timing`` phases are reported next to each endpoint's latencies.
+
+Usage:
+  python -m benchmarks.loadtest [--players 32] [--concurrency 50] [--admins 4] [--think-ms 200] [--json]
+  python -m benchmarks.loadtest --url http://127.0.0.1:8000 --players 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+from benchmarks import dataset
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+  return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+@dataclass
+class Recorder:
+  latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+  errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+  # Server-Timing phase totals per endpoint: label -> phase -> [sum_ms, count].
+  phases: dict[str, dict[str, list[float]]] = field(default_factory=lambda: defaultdict(dict))
+  started: float = field(default_factory=time.perf_counter)
+
+  async def request(self, client: httpx.AsyncClient, label: str, method: str, path: str, **kwargs) -> httpx.Response | None:
+    started = time.perf_counter()
+    try:
+      response = await client.request(method, path, **kwargs)
+    except httpx.HTTPError:
+      self.errors[label] += 1
+      return None
+    self.latencies[label].append((time.perf_counter() - started) * 1000)
+    if response.status_code >= 400:
+      self.errors[label] += 1
+    for entry in response.headers.get('server-timing', '').split(','):
+      name, _, duration = entry.strip().partition(';dur=')
+      if duration and name != 'total':
+        totals = self.phases[label].setdefault(name, [0.0, 0])
+        totals[0] += float(duration)
+        totals[1] += 1
+    return response
+
+  def report(self) -> dict:
+    wall = time.perf_counter() - self.started
+    endpoints = []
+    for label in sorted(self.latencies.keys() | self.errors.keys()):
+      ordered = sorted(self.latencies[label])
+      endpoints.append({
+        'endpoint': label,
+        'requests': len(ordered),
+        'errors': self.errors[label],
+        'throughput_per_s': round(len(ordered) / wall, 1),
+        'p50_ms': round(_percentile(ordered, 0.50), 2) if ordered else None,
+        'p95_ms': round(_percentile(ordered, 0.95), 2) if ordered else None,
+        'p99_ms': round(_percentile(ordered, 0.99), 2) if ordered else None,
+        'phases_mean_ms': {name: round(total / count, 2) for name, (total, count) in self.phases[label].items()}
+      })
+    total = sum(len(values) for values in self.latencies.values())
+    return {'wall_seconds': round(wall, 2), 'requests': total, 'throughput_per_s': round(total / wall, 1),
+            'endpoints': endpoints}
+
+
+@dataclass
+class Scenario:
+  players: int
+  concurrency: int
+  admins: int
+  think: float
+  reschedule_every: int
+  seed: int
+
+
+async def _signup(client: httpx.AsyncClient, recorder: Recorder, scenario: Scenario, run_id: str) -> tuple[str, str]:
+  # Same login the web admin mode performs; it is the only way to obtain an admin id.
+  admin = await recorder.request(client, 'POST /members', 'POST', '/members', json={
+    'full_name': '관리자', 'email': 'admin@tennis.club', 'level': 'advanced', 'role': 'admin'
+  })
+  league = await recorder.request(client, 'POST /leagues', 'POST', '/leagues', json={
+    'name': f'매치데이 {run_id}', 'surface_type': 'hard', 'entry_fee': 0,
+    'max_participants': scenario.players, 'auto_generate_bracket': False
+  })
+  if admin is None or league is None or admin.is_error or league.is_error:
+    raise SystemExit('Could not create the admin or league; is the server reachable?')
+  league_id = league.json()['id']
+
+  async def player(index: int) -> None:
+    member = await recorder.request(client, 'POST /members', 'POST', '/members', json={
+      'full_name': f'참가자 {run_id}-{index:03d}', 'email': f'player-{run_id}-{index}@load.test', 'level': 'intermediate'
+    })
+    if member is not None and not member.is_error:
+      await recorder.request(
+        client, 'POST /leagues/{league_id}/applications', 'POST', f'/leagues/{league_id}/applications',
+        json={'member_id': member.json()['id']}
+      )
+
+  await asyncio.gather(*(player(index) for index in range(scenario.players)))
+  return admin.json()['id'], league_id
+
+
+async def _play(
+  client: httpx.AsyncClient,
+  recorder: Recorder,
+  scenario: Scenario,
+  admin_id: str,
+  league_id: str,
+  matches: list[dict]
+) -> None:
+  rng = random.Random(scenario.seed)
+  pending: asyncio.Queue[tuple[int, dict]] = asyncio.Queue()
+  for index, match in enumerate(matches):
+    pending.put_nowait((index, match))
+  done = asyncio.Event()
+  # Each rescheduled match gets a day of its own after the league's last match,
+  # so its players are free and concurrent admins never race for one slot.
+  after_play = max((datetime.fromisoformat(match['scheduled_at']) for match in matches), default=datetime.now())
+  polled = [
+    ('GET /leagues/{league_id}', f'/leagues/{league_id}'),
+    ('GET /leagues/{league_id}/matches', f'/leagues/{league_id}/matches'),
+    ('GET /leagues/{league_id}/matches', f'/leagues/{league_id}/matches'),
+    ('GET /leagues/{league_id}/rankings', f'/leagues/{league_id}/rankings')
+  ]
+
+  async def member_poller() -> None:
+    while not done.is_set():
+      label, path = rng.choice(polled)
+      await recorder.request(client, label, 'GET', path)
+      await asyncio.sleep(rng.uniform(0, 2 * scenario.think))
+
+  async def admin_scorer() -> None:
+    while not pending.empty():
+      index, match = pending.get_nowait()
+      if scenario.reschedule_every and index % scenario.reschedule_every == 0:
+        day = after_play + timedelta(days=1 + index // scenario.reschedule_every)
+        slots = await recorder.request(
+          client, 'GET /leagues/{league_id}/schedule/free-slots', 'GET', f'/leagues/{league_id}/schedule/free-slots',
+          params={'start': day.isoformat(), 'end': (day + timedelta(days=1)).isoformat(), 'court': match['court']}
+        )
+        if slots is not None and not slots.is_error and slots.json():
+          slot = slots.json()[0]
+          await recorder.request(client, 'PATCH /matches/{match_id}', 'PATCH', f"/matches/{match['id']}", json={
+            'admin_id': admin_id, 'scheduled_at': slot['scheduled_at'], 'court': slot['court']
+          })
+      loser_games = rng.randint(0, 4)
+      score = {'score_a': 6, 'score_b': loser_games} if rng.random() < 0.5 else {'score_a': loser_games, 'score_b': 6}
+      await recorder.request(client, 'PATCH /matches/{match_id}/score', 'PATCH', f"/matches/{match['id']}/score", json=score)
+      await asyncio.sleep(rng.uniform(0, 2 * scenario.think))
+
+  pollers = [asyncio.create_task(member_poller()) for _ in range(scenario.concurrency)]
+  await asyncio.gather(*(admin_scorer() for _ in range(max(1, scenario.admins))))
+  done.set()
+  await asyncio.gather(*pollers)
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario) -> dict:
+  run_id = f'{int(time.time()):x}{random.Random(scenario.seed).getrandbits(16):04x}'
+  phases = {}
+
+  recorder = Recorder()
+  admin_id, league_id = await _signup(client, recorder, scenario, run_id)
+  phases['signup'] = recorder.report()
+
+  recorder = Recorder()
+  response = await recorder.request(
+    client, 'POST /leagues/{league_id}/bracket', 'POST', f'/leagues/{league_id}/bracket',
+    json={'admin_id': admin_id, 'groups_count': max(1, scenario.players // 16), 'courts_count': 4}
+  )
+  phases['bracket'] = recorder.report()
+  if response is None or response.is_error:
+    raise SystemExit(f'Bracket generation failed: {response.text if response is not None else "no response"}')
+
+  recorder = Recorder()
+  await _play(client, recorder, scenario, admin_id, league_id, response.json())
+  phases['play'] = recorder.report()
+  return phases
+
+
+async def _run_in_process(scenario: Scenario, dataset_size: dict) -> dict:
+  with tempfile.TemporaryDirectory() as tmp:
+    database = dataset.prepare(Path(tmp) / 'loadtest.db', **dataset_size)
+    # The engines are created at import time, so point them at the copy first.
+    os.environ['DATABASE_URL'] = f'sqlite:///{database}'
+    from api.main import app
+
+    await app.router.startup()
+    try:
+      transport = httpx.ASGITransport(app=app)
+      async with httpx.AsyncClient(transport=transport, base_url='http://loadtest') as client:
+        return await run_scenario(client, scenario)
+    finally:
+      await app.router.shutdown()
+
+
+async def _run_remote(url: str, scenario: Scenario) -> dict:
+  limits = httpx.Limits(max_connections=scenario.concurrency + scenario.admins + scenario.players)
+  async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+    return await run_scenario(client, scenario)
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--url', help='Base URL of a running server (default: run the app in process)')
+  parser.add_argument('--players', type=int, default=32, help='League size; multiple of 4')
+  parser.add_argument('--concurrency', type=int, default=50, help='Members polling during play')
+  parser.add_argument('--admins', type=int, default=4, help='Admins entering scores concurrently')
+  parser.add_argument('--think-ms', type=float, default=200, help='Mean pause between requests of one user')
+  parser.add_argument('--reschedule-every', type=int, default=4, help='Reschedule every Nth match before scoring (0: never)')
+  parser.add_argument('--seed', type=int, default=1)
+  parser.add_argument('--json', action='store_true', help='Print results as JSON')
+  dataset.add_arguments(parser)
+  args = parser.parse_args()
+
+  scenario = Scenario(
+    players=args.players,
+    concurrency=args.concurrency,
+    admins=args.admins,
+    think=args.think_ms / 1000,
+    reschedule_every=args.reschedule_every,
+    seed=args.seed
+  )
+  if args.url:
+    phases = asyncio.run(_run_remote(args.url, scenario))
+  else:
+    dataset_size = {'members': args.dataset_members, 'leagues': args.dataset_leagues, 'seed': args.dataset_seed}
+    phases = asyncio.run(_run_in_process(scenario, dataset_size))
+
+  if args.json:
+    print(json.dumps(phases, indent=2, ensure_ascii=False))
+    return
+
+  for phase, report in phases.items():
+    print(f"{phase}: {report['requests']} requests in {report['wall_seconds']}s ({report['throughput_per_s']}/s)")
+    for row in report['endpoints']:
+      print(
+        f"  {row['endpoint']:<42} n={row['requests']:<6} err={row['errors']:<4} {row['throughput_per_s']:>8}/s "
+        f"p50={row['p50_ms']}ms p95={row['p95_ms']}ms p99={row['p99_ms']}ms"
+      )
+      if row['phases_mean_ms']:
+        print('    ' + ' '.join(f'{name}={mean}ms' for name, mean in row['phases_mean_ms'].items()))
+
+
+if __name__ == '__main__':
+  main()
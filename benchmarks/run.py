@@ -0,0 +1,291 @@
+"""Run the service hot-path benchmark suite against the synthetic club dataset.
+
+Suites:
+  pairing    DoublesPairingService.generate_preliminary_pairs by group size
+  bracket    LeagueBracketService.generate_bracket by league size
+  rankings   RankingService.calculate_group_rankings on finished leagues
+  score      LeagueMatchService.update_match_score, with and without
+             elimination propagation
+  endpoints  GET list endpoints through the ASGI app (response cache cleared
+             before each request)
+
+Random pairing is reseeded per iteration so every run times the same
+sequence of draws. Each case also records the peak memory of one call
+(``peak_kib``). Write the results with ``--output`` and compare two runs
+with ``python -m benchmarks.compare``.
+
+Usage:
+  python -m benchmarks.run [--suite pairing --suite bracket] [--warmup 3] [--repeats 20] [--output results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Iterator
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from api.cache.store import response_cache
+from api.db.models import League, LeagueApplication, LeagueMatch, MatchParticipant, Member, new_id
+from api.db.session import get_read_session, get_session
+from api.main import app
+from api.schemas.match import MatchScoreUpdateRequest
+from api.services.brackets import LeagueBracketService
+from api.services.doubles_pairing import DoublesPairingService
+from api.services.matches import LeagueMatchService
+from api.services.rankings import RankingService
+from benchmarks import dataset
+from benchmarks.harness import CaseResult, measure, write_results
+
+PAIRING_GROUP_SIZES = (8, 12, 16, 24, 32)
+BRACKET_LEAGUE_SIZES = (8, 16, 32, 64)
+
+
+@dataclass
+class Context:
+  engine: Engine
+  factory: sessionmaker[Session]
+  warmup: int
+  repeats: int
+  seed: int
+
+  @property
+  def iterations(self) -> int:
+    return self.warmup + self.repeats
+
+  def measure(self, name: str, fn: Callable[[int], object], **params) -> CaseResult:
+    return measure(name, fn, params=params, warmup=self.warmup, repeats=self.repeats, track_memory=True)
+
+
+def _member_rows(ctx: Context, count: int, offset: int = 0) -> list[tuple[str, str]]:
+  with ctx.engine.connect() as conn:
+    return conn.execute(
+      select(Member.id, Member.full_name).order_by(Member.email).offset(offset).limit(count)
+    ).all()
+
+
+def _new_league(ctx: Context, name: str, member_ids: list[str]) -> str:
+  league_id = new_id()
+  applied_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+  with ctx.engine.begin() as conn:
+    conn.execute(insert(League), [{
+      'id': league_id, 'name': name, 'surface_type': 'hard', 'entry_fee': 0,
+      'max_participants': max(4, len(member_ids)), 'auto_generate_bracket': False
+    }])
+    if member_ids:
+      conn.execute(insert(LeagueApplication), [
+        {'id': new_id(), 'league_id': league_id, 'member_id': member_id,
+         'applied_at': applied_at + timedelta(minutes=index)}
+        for index, member_id in enumerate(member_ids)
+      ])
+  return league_id
+
+
+def bench_pairing(ctx: Context) -> list[CaseResult]:
+  results = []
+  for size in PAIRING_GROUP_SIZES:
+    members = [Member(id=f'{index:032x}', full_name=f'Player {index}') for index in range(size)]
+
+    def run(index: int, members: list[Member] = members) -> None:
+      random.seed(ctx.seed + index)
+      DoublesPairingService.generate_preliminary_pairs(members, matches_per_player=3)
+
+    results.append(ctx.measure('generate_preliminary_pairs', run, group_size=size))
+  return results
+
+
+def bench_bracket(ctx: Context) -> list[CaseResult]:
+  results = []
+  for size in BRACKET_LEAGUE_SIZES:
+    member_ids = [member_id for member_id, _ in _member_rows(ctx, size)]
+    league_id = _new_league(ctx, f'bench bracket {size}', member_ids)
+    groups = max(1, size // 8)
+
+    def run(index: int, league_id: str = league_id, groups: int = groups) -> None:
+      random.seed(ctx.seed + index)
+      with ctx.factory() as session:
+        LeagueBracketService(session).generate_bracket(
+          league_id, admin_id=None, groups_count=groups, courts_count=4, skip_admin_check=True
+        )
+
+    results.append(ctx.measure('generate_bracket', run, league_size=size))
+  return results
+
+
+def bench_rankings(ctx: Context) -> list[CaseResult]:
+  with ctx.engine.connect() as conn:
+    completed = (
+      select(LeagueMatch.league_id, func.count().label('completed'))
+      .where(LeagueMatch.round == 1, LeagueMatch.status == 'completed')
+      .group_by(LeagueMatch.league_id)
+      .subquery()
+    )
+    rows = conn.execute(
+      select(League.max_participants, League.id)
+      .join(completed, completed.c.league_id == League.id)
+      .order_by(League.max_participants, completed.c.completed.desc(), League.id)
+    ).all()
+  busiest: dict[int, str] = {}
+  for participants, league_id in rows:
+    busiest.setdefault(participants, league_id)
+
+  results = []
+  for participants, league_id in sorted(busiest.items()):
+    def run(index: int, league_id: str = league_id) -> None:
+      with ctx.factory() as session:
+        RankingService(session).calculate_group_rankings(league_id)
+
+    results.append(ctx.measure('calculate_group_rankings', run, participants=participants))
+  return results
+
+
+def _score_fixture(ctx: Context, elimination: bool) -> list[str]:
+  """One unplayed match per iteration; elimination matches feed a fresh next match."""
+  players = _member_rows(ctx, 8, offset=100)
+  team_a, team_b = players[:2], players[2:4]
+  league_id = _new_league(ctx, f'bench score {"elimination" if elimination else "preliminary"}', [])
+  scheduled_at = datetime(2024, 4, 12, 9, 0, tzinfo=timezone.utc)
+  matches: list[dict] = []
+  participants: list[dict] = []
+  scored: list[str] = []
+  for _ in range(ctx.iterations):
+    next_id = None
+    if elimination:
+      next_id = new_id()
+      matches.append({
+        'id': next_id, 'league_id': league_id, 'round': 3, 'group_number': 1, 'stage': 'elimination',
+        'player_a': 'TBD', 'player_b': 'TBD', 'court': 'Court 1', 'scheduled_at': scheduled_at
+      })
+    match_id = new_id()
+    scored.append(match_id)
+    matches.append({
+      'id': match_id, 'league_id': league_id, 'round': 2 if elimination else 1, 'group_number': 1,
+      'stage': 'elimination' if elimination else 'preliminary',
+      'player_a': ', '.join(name for _, name in team_a), 'player_b': ', '.join(name for _, name in team_b),
+      'court': 'Court 1', 'scheduled_at': scheduled_at,
+      'next_match_id': next_id, 'next_match_slot': 'team_a' if elimination else None
+    })
+    for team, members in (('team_a', team_a), ('team_b', team_b)):
+      participants.extend(
+        {'id': new_id(), 'match_id': match_id, 'member_id': member_id, 'team': team}
+        for member_id, _ in members
+      )
+  with ctx.engine.begin() as conn:
+    conn.execute(insert(LeagueMatch), matches)
+    conn.execute(insert(MatchParticipant), participants)
+  return scored
+
+
+def bench_score(ctx: Context) -> list[CaseResult]:
+  results = []
+  payload = MatchScoreUpdateRequest(score_a=6, score_b=3)
+  for stage in ('preliminary', 'elimination'):
+    match_ids = _score_fixture(ctx, elimination=stage == 'elimination')
+
+    def run(index: int, match_ids: list[str] = match_ids) -> None:
+      with ctx.factory() as session:
+        LeagueMatchService(session).update_match_score(match_ids[index], payload)
+
+    results.append(ctx.measure('update_match_score', run, stage=stage))
+  return results
+
+
+def bench_endpoints(ctx: Context) -> list[CaseResult]:
+  with ctx.engine.connect() as conn:
+    league_id = conn.execute(
+      select(LeagueMatch.league_id)
+      .group_by(LeagueMatch.league_id)
+      .order_by(func.count().desc(), LeagueMatch.league_id)
+      .limit(1)
+    ).scalar_one()
+
+  def override_get_session() -> Iterator[Session]:
+    session = ctx.factory()
+    try:
+      yield session
+    finally:
+      session.close()
+
+  app.dependency_overrides[get_session] = override_get_session
+  app.dependency_overrides[get_read_session] = override_get_session
+  client = TestClient(app)
+  results = []
+  try:
+    for route, path in (
+      ('/leagues', '/leagues'),
+      ('/leagues/{league_id}', f'/leagues/{league_id}'),
+      ('/leagues/{league_id}/applications', f'/leagues/{league_id}/applications'),
+      ('/leagues/{league_id}/matches', f'/leagues/{league_id}/matches'),
+      ('/leagues/{league_id}/rankings', f'/leagues/{league_id}/rankings')
+    ):
+      def run(index: int, path: str = path) -> None:
+        response_cache.clear()
+        client.get(path).raise_for_status()
+
+      results.append(ctx.measure('GET', run, route=route))
+  finally:
+    app.dependency_overrides.pop(get_session, None)
+    app.dependency_overrides.pop(get_read_session, None)
+  return results
+
+
+SUITES: dict[str, Callable[[Context], list[CaseResult]]] = {
+  'pairing': bench_pairing,
+  'bracket': bench_bracket,
+  'rankings': bench_rankings,
+  'score': bench_score,
+  'endpoints': bench_endpoints
+}
+
+
+def run(suites: list[str], warmup: int, repeats: int, seed: int, dataset_size: dict) -> list[CaseResult]:
+  results: list[CaseResult] = []
+  with tempfile.TemporaryDirectory() as tmp:
+    database = dataset.prepare(Path(tmp) / 'bench.db', **dataset_size)
+    engine = create_engine(f'sqlite:///{database}', future=True, connect_args={'check_same_thread': False})
+    factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False, future=True)
+    ctx = Context(engine=engine, factory=factory, warmup=warmup, repeats=repeats, seed=seed)
+    try:
+      for suite in suites:
+        results.extend(SUITES[suite](ctx))
+    finally:
+      engine.dispose()
+  return results
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--suite', action='append', choices=sorted(SUITES), help='Suite to run (repeatable; default all)')
+  parser.add_argument('--warmup', type=int, default=3)
+  parser.add_argument('--repeats', type=int, default=20)
+  parser.add_argument('--seed', type=int, default=1, help='Seed for random pairing')
+  parser.add_argument('--output', type=Path, help='Write results as JSON to this file')
+  dataset.add_arguments(parser)
+  args = parser.parse_args()
+
+  suites = args.suite or list(SUITES)
+  dataset_size = {'members': args.dataset_members, 'leagues': args.dataset_leagues, 'seed': args.dataset_seed}
+  results = run(suites, args.warmup, args.repeats, args.seed, dataset_size)
+
+  for result in results:
+    print(
+      f'{result.key:<60} median={result.median_ms:>9.3f}ms min={result.min_ms:>9.3f}ms '
+      f'p95={result.p95_ms:>9.3f}ms iqr={result.iqr_ms:>8.3f}ms'
+      + (f" peak={result.extra['peak_kib']:>9.1f}KiB" if 'peak_kib' in result.extra else '')
+    )
+  if args.output:
+    write_results(args.output, results, {
+      'suites': suites, 'warmup': args.warmup, 'repeats': args.repeats, 'seed': args.seed, 'dataset': dataset_size
+    })
+
+
+if __name__ == '__main__':
+  main()
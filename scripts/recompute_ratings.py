@@ -0,0 +1,40 @@
+"""
+Recompute every member's Elo rating from the full match history.
+
+Replays all completed doubles matches in chronological order from the
+level-based starting ratings and rewrites ``members.rating`` and the
+``rating_history`` table in one transaction. Run it after upgrading an
+existing database, after correcting scores, or after changing
+``RATING_K_FACTOR``.
+
+Usage:
+  DATABASE_URL=sqlite:///./tennis_club.db PYTHONPATH=. python scripts/recompute_ratings.py
+"""
+
+from __future__ import annotations
+
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from api.db.models import Base
+from api.services.ratings import RatingService
+
+DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///./tennis_club.db')
+
+
+def main() -> None:
+  engine = create_engine(DATABASE_URL, future=True)
+  Base.metadata.create_all(bind=engine)
+  with Session(engine) as session:
+    summary = RatingService(session).recompute()
+  engine.dispose()
+  print(
+    f'Rated {summary.matches} matches for {summary.members} members '
+    f'in {summary.layers} layers ({summary.seconds:.2f}s)'
+  )
+
+
+if __name__ == '__main__':
+  main()
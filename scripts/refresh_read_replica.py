@@ -0,0 +1,42 @@
+"""
+Copy the primary SQLite database into the read replica file.
+
+Point READ_DATABASE_URL at the replica to send GET traffic (rankings, match
+lists, exports) there, then run this script periodically (cron, systemd timer)
+to refresh it. The copy uses SQLite's online backup API, so writers on the
+primary and readers on the replica keep working while it runs.
+
+Usage:
+  DATABASE_URL=sqlite:///./tennis_club.db READ_DATABASE_URL=sqlite:///./tennis_club_replica.db \
+    python scripts/refresh_read_replica.py
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import sys
+import time
+
+from sqlalchemy.engine import make_url
+
+DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///./tennis_club.db')
+READ_DATABASE_URL = os.environ.get('READ_DATABASE_URL', DATABASE_URL)
+
+
+def main() -> None:
+  source = make_url(DATABASE_URL)
+  target = make_url(READ_DATABASE_URL)
+  if source.get_backend_name() != 'sqlite' or target.get_backend_name() != 'sqlite':
+    sys.exit('Both DATABASE_URL and READ_DATABASE_URL must be SQLite files')
+  if source.database == target.database:
+    sys.exit('READ_DATABASE_URL points at the primary database; nothing to refresh')
+
+  started = time.perf_counter()
+  with sqlite3.connect(source.database) as primary, sqlite3.connect(target.database) as replica:
+    primary.backup(replica, pages=4096)
+  print(f'Replica {target.database} refreshed in {time.perf_counter() - started:.2f}s')
+
+
+if __name__ == '__main__':
+  main()
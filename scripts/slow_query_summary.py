@@ -0,0 +1,121 @@
+"""
+Aggregate the slow-query log by normalized statement.
+
+Literals are replaced by ``?`` and ``IN (?, ?, ...)`` lists collapsed, so the
+same query with different ids lands in one row. Rows are sorted by total time
+and show count, mean/max duration, the service methods that issued the
+statement and whether its plan contains a full table scan. Rotated files
+(``slow_queries.log.1`` ...) are read as well.
+
+Usage:
+  SLOW_QUERY_LOG_PATH=./slow_queries.log python scripts/slow_query_summary.py [--top 20] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+SLOW_QUERY_LOG_PATH = os.environ.get('SLOW_QUERY_LOG_PATH', 'slow_queries.log')
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PARAMETER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+# SQLite: "SCAN league_matches" (3.36+) / "SCAN TABLE league_matches"; PostgreSQL: "Seq Scan on league_matches".
+_FULL_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)\b(?! USING)|Seq Scan on (\w+)')
+
+
+def normalize(statement: str) -> str:
+  normalized = _WHITESPACE.sub(' ', statement).strip()
+  normalized = _STRING_LITERAL.sub('?', normalized)
+  normalized = _NUMBER_LITERAL.sub('?', normalized)
+  normalized = re.sub(r'%\(\w+\)s|:\w+|\$\d+', '?', normalized)
+  return _PARAMETER_LIST.sub('(?...)', normalized)
+
+
+@dataclass
+class StatementSummary:
+  statement: str
+  count: int = 0
+  total_ms: float = 0.0
+  max_ms: float = 0.0
+  origins: Counter[str] = field(default_factory=Counter)
+  scanned_tables: set[str] = field(default_factory=set)
+  plan: list[str] | None = None
+
+  def add(self, entry: dict) -> None:
+    self.count += 1
+    self.total_ms += entry['duration_ms']
+    self.max_ms = max(self.max_ms, entry['duration_ms'])
+    if entry.get('origin'):
+      self.origins[entry['origin']] += 1
+    if entry.get('plan'):
+      self.plan = entry['plan']
+      for line in entry['plan']:
+        for match in _FULL_SCAN.finditer(line):
+          self.scanned_tables.add(match.group(1) or match.group(2))
+
+  def as_dict(self) -> dict:
+    return {
+      'statement': self.statement,
+      'count': self.count,
+      'total_ms': round(self.total_ms, 3),
+      'mean_ms': round(self.total_ms / self.count, 3),
+      'max_ms': round(self.max_ms, 3),
+      'origins': dict(self.origins.most_common(5)),
+      'full_scans': sorted(self.scanned_tables),
+      'plan': self.plan
+    }
+
+
+def log_files(path: str) -> list[str]:
+  rotated = sorted(glob.glob(f'{glob.escape(path)}.[0-9]*'), key=lambda name: int(name.rsplit('.', 1)[1]), reverse=True)
+  return rotated + ([path] if os.path.exists(path) else [])
+
+
+def summarize(paths: list[str]) -> list[StatementSummary]:
+  summaries: dict[str, StatementSummary] = {}
+  for path in paths:
+    with open(path, encoding='utf-8') as handle:
+      for line in handle:
+        if not line.strip():
+          continue
+        entry = json.loads(line)
+        key = normalize(entry['statement'])
+        summaries.setdefault(key, StatementSummary(statement=key)).add(entry)
+  return sorted(summaries.values(), key=lambda summary: summary.total_ms, reverse=True)
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--log', default=SLOW_QUERY_LOG_PATH, help='Slow-query log path (default: SLOW_QUERY_LOG_PATH)')
+  parser.add_argument('--top', type=int, default=20)
+  parser.add_argument('--json', action='store_true', help='Print results as JSON')
+  args = parser.parse_args()
+
+  paths = log_files(args.log)
+  if not paths:
+    raise SystemExit(f'No slow-query log at {args.log}')
+  summaries = summarize(paths)[:args.top]
+
+  if args.json:
+    print(json.dumps([summary.as_dict() for summary in summaries], indent=2, ensure_ascii=False))
+    return
+
+  for summary in summaries:
+    row = summary.as_dict()
+    scans = f" FULL SCAN: {', '.join(row['full_scans'])}" if row['full_scans'] else ''
+    print(f"{row['count']:>6}x total={row['total_ms']:>10.1f}ms mean={row['mean_ms']:>8.1f}ms max={row['max_ms']:>8.1f}ms{scans}")
+    print(f"        {row['statement'][:200]}")
+    for origin, count in row['origins'].items():
+      print(f'        <- {origin} ({count})')
+
+
+if __name__ == '__main__':
+  main()
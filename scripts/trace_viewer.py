@@ -0,0 +1,140 @@
+"""
+Rebuild traces from the span export and print the slowest ones as trees.
+
+Spans are grouped by ``trace_id`` and nested under their parents; each line
+shows the span's duration, its share of the trace, and key attributes
+(``league_id``, ``result.count``, ``db.rows_affected``). Consecutive identical
+SQL statements under one parent are folded into a single ``xN`` line, which
+makes N+1 query patterns stand out. Rotated files (``traces.jsonl.1`` ...) are
+read as well.
+
+Usage:
+  TRACE_EXPORT_PATH=./traces.jsonl python scripts/trace_viewer.py [--top 5] [--route "POST /leagues/{league_id}/bracket"]
+  python scripts/trace_viewer.py --trace <trace_id>
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+TRACE_EXPORT_PATH = os.environ.get('TRACE_EXPORT_PATH', 'traces.jsonl')
+
+_SHOWN_ATTRIBUTES = ('league_id', 'http.status_code', 'result.count', 'db.rows_affected')
+
+
+@dataclass
+class Node:
+  span: dict
+  children: list[Node] = field(default_factory=list)
+
+
+@dataclass
+class Trace:
+  trace_id: str
+  root: Node
+  span_count: int
+
+  @property
+  def duration_ms(self) -> float:
+    return self.root.span['duration_ms']
+
+
+def export_files(path: str) -> list[str]:
+  rotated = sorted(glob.glob(f'{glob.escape(path)}.[0-9]*'), key=lambda name: int(name.rsplit('.', 1)[1]), reverse=True)
+  return rotated + ([path] if os.path.exists(path) else [])
+
+
+def load_traces(paths: list[str]) -> list[Trace]:
+  spans_by_trace: dict[str, list[dict]] = defaultdict(list)
+  for path in paths:
+    with open(path, encoding='utf-8') as handle:
+      for line in handle:
+        if line.strip():
+          span = json.loads(line)
+          spans_by_trace[span['trace_id']].append(span)
+
+  traces = []
+  for trace_id, spans in spans_by_trace.items():
+    nodes = {span['span_id']: Node(span) for span in spans}
+    roots = []
+    for node in sorted(nodes.values(), key=lambda node: node.span['start_time_unix_nano']):
+      parent = nodes.get(node.span['parent_span_id'])
+      if parent is None:
+        roots.append(node)
+      else:
+        parent.children.append(node)
+    # A propagated traceparent leaves the root's parent outside this file.
+    root = max(roots, key=lambda node: node.span['duration_ms'])
+    traces.append(Trace(trace_id=trace_id, root=root, span_count=len(spans)))
+  return traces
+
+
+def _label(span: dict) -> str:
+  if span['kind'] == 'client':
+    label = ' '.join(span['attributes'].get('db.statement', span['name']).split())
+    label = label if len(label) <= 100 else f'{label[:97]}...'
+  else:
+    label = span['name']
+  attributes = [f'{key}={span["attributes"][key]}' for key in _SHOWN_ATTRIBUTES if key in span['attributes']]
+  if span['status'] == 'error':
+    attributes.append(f'error={span["error"]}')
+  return f"{label} [{', '.join(attributes)}]" if attributes else label
+
+
+def _fold(children: list[Node]) -> list[tuple[Node, int, float]]:
+  folded: list[tuple[Node, int, float]] = []
+  for child in children:
+    statement = child.span['attributes'].get('db.statement') if child.span['kind'] == 'client' else None
+    if folded and statement is not None and folded[-1][0].span['attributes'].get('db.statement') == statement:
+      node, count, total = folded[-1]
+      folded[-1] = (node, count + 1, total + child.span['duration_ms'])
+    else:
+      folded.append((child, 1, child.span['duration_ms']))
+  return folded
+
+
+def render(trace: Trace) -> list[str]:
+  total = trace.duration_ms or 1.0
+  lines = [f'trace {trace.trace_id} {trace.duration_ms:.1f}ms ({trace.span_count} spans)']
+
+  def walk(node: Node, count: int, duration: float, depth: int) -> None:
+    repeat = f' x{count}' if count > 1 else ''
+    lines.append(f"{'  ' * depth}{duration:>9.2f}ms {duration / total * 100:5.1f}%  {_label(node.span)}{repeat}")
+    for child, child_count, child_duration in _fold(node.children):
+      walk(child, child_count, child_duration, depth + 1)
+
+  walk(trace.root, 1, trace.duration_ms, 1)
+  return lines
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--log', default=TRACE_EXPORT_PATH, help='Span export path (default: TRACE_EXPORT_PATH)')
+  parser.add_argument('--top', type=int, default=5)
+  parser.add_argument('--route', help='Only traces whose root span has this name, e.g. "GET /leagues"')
+  parser.add_argument('--trace', help='Print a single trace by id')
+  args = parser.parse_args()
+
+  paths = export_files(args.log)
+  if not paths:
+    raise SystemExit(f'No span export at {args.log}')
+  traces = load_traces(paths)
+  if args.trace:
+    traces = [trace for trace in traces if trace.trace_id == args.trace]
+    if not traces:
+      raise SystemExit(f'Trace {args.trace} not found')
+  if args.route:
+    traces = [trace for trace in traces if trace.root.span['name'] == args.route]
+
+  for trace in sorted(traces, key=lambda trace: trace.duration_ms, reverse=True)[:args.top]:
+    print('\n'.join(render(trace)))
+    print()
+
+
+if __name__ == '__main__':
+  main()
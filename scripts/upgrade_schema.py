@@ -16,6 +16,24 @@ def ensure_column(conn, table: str, column: str, ddl: str) -> None:
     conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
 
 
+def ensure_change_log_autoincrement(conn) -> None:
+  """change_events must never reuse a seq (see api.cache.bus); SQLite only guarantees that with AUTOINCREMENT."""
+  if conn.dialect.name != 'sqlite':
+    return
+  ddl = conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'change_events'")).scalar_one_or_none()
+  if ddl is None or 'AUTOINCREMENT' in ddl.upper():
+    return
+  conn.execute(text('ALTER TABLE change_events RENAME TO change_events_old'))
+  conn.execute(text(
+    'CREATE TABLE change_events ('
+    'seq INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT, league_id VARCHAR(32) NOT NULL, published_at DATETIME NOT NULL)'
+  ))
+  conn.execute(text(
+    'INSERT INTO change_events (seq, league_id, published_at) SELECT seq, league_id, published_at FROM change_events_old'
+  ))
+  conn.execute(text('DROP TABLE change_events_old'))
+
+
 def main() -> None:
   engine = create_engine(DATABASE_URL, future=True)
   with engine.begin() as conn:
@@ -24,13 +42,31 @@ def main() -> None:
     ensure_column(conn, 'leagues', 'courts_count', 'INTEGER')
     ensure_column(conn, 'leagues', 'bracket_generated_at', 'DATETIME')
     ensure_column(conn, 'leagues', 'final_stage_mode', 'VARCHAR(20)')
+    ensure_column(conn, 'leagues', 'pairing_mode', "VARCHAR(20) NOT NULL DEFAULT 'random'")
+    ensure_column(conn, 'leagues', 'group_mode', "VARCHAR(20) NOT NULL DEFAULT 'order'")
+    ensure_column(conn, 'leagues', 'swiss_rounds', 'INTEGER')
+    ensure_column(conn, 'leagues', 'swiss_round', 'INTEGER')
+    ensure_column(conn, 'leagues', 'generation_seq', 'INTEGER NOT NULL DEFAULT 0')
     ensure_column(conn, 'members', 'role', "VARCHAR(20) NOT NULL DEFAULT 'member'")
+    ensure_column(conn, 'members', 'rating', 'FLOAT NOT NULL DEFAULT 1500')
+    ensure_column(conn, 'members', 'rated_matches', 'INTEGER NOT NULL DEFAULT 0')
     ensure_column(conn, 'league_matches', 'group_number', 'INTEGER NOT NULL DEFAULT 1')
     ensure_column(conn, 'league_matches', 'stage', 'VARCHAR(20)')
     ensure_column(conn, 'league_matches', 'next_match_id', 'VARCHAR(32)')
     ensure_column(conn, 'league_matches', 'next_match_slot', 'VARCHAR(10)')
+    ensure_column(conn, 'league_matches', 'court_id', 'INTEGER REFERENCES courts(id) ON DELETE SET NULL')
+    ensure_change_log_autoincrement(conn)
+    if inspect(conn).has_table('swiss_entrants'):
+      ensure_column(conn, 'swiss_entrants', 'draws', 'INTEGER NOT NULL DEFAULT 0')
+      # A draw scores 0.5 and a win (or bye) 1.
+      conn.execute(text('UPDATE swiss_entrants SET draws = CAST(ROUND(2 * (score - wins)) AS INTEGER) WHERE draws = 0'))
 
     conn.execute(text("UPDATE members SET role='member' WHERE role IS NULL"))
+    # Unrated members start from their level; run scripts/recompute_ratings.py to rate past matches.
+    conn.execute(text(
+      "UPDATE members SET rating = CASE level WHEN 'beginner' THEN 1350 WHEN 'advanced' THEN 1650 ELSE 1500 END "
+      "WHERE rated_matches = 0"
+    ))
 
   with closing(engine.connect()) as conn:
     conn.execute(text('VACUUM'))
@@ -0,0 +1,47 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from api.db.models import Base
+from api.observability import slow_queries
+from api.observability.slow_queries import SlowQueryLog
+from api.services.authorization import admin_authorizer
+from api.services.scheduling import schedule_indexes
+
+
+@pytest.fixture(autouse=True)
+def _slow_query_log_in_tmp(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+  """Keep the process-wide slow-query log (on when SLOW_QUERY_THRESHOLD_MS is set) out of the repository."""
+  log = SlowQueryLog(path=str(tmp_path / 'slow_queries.log'))
+  monkeypatch.setattr(slow_queries, 'slow_query_log', log)
+  yield
+  log.close()
+
+
+@pytest.fixture()
+def engine(tmp_path: Path) -> Iterator[Engine]:
+  """A fresh SQLite database with the full schema; a short busy timeout makes lock waits fail fast."""
+  engine = create_engine(f'sqlite:///{tmp_path / "test.db"}', future=True, connect_args={'timeout': 0.2})
+  Base.metadata.create_all(bind=engine)
+  yield engine
+  engine.dispose()
+
+
+@pytest.fixture()
+def sessions(engine: Engine) -> sessionmaker:
+  return sessionmaker(bind=engine, expire_on_commit=False, future=True)
+
+
+@pytest.fixture()
+def session(sessions: sessionmaker) -> Iterator[Session]:
+  """A session on a fresh database, with the process-wide admin and schedule caches emptied around it."""
+  admin_authorizer.clear()
+  schedule_indexes.clear()
+  with sessions() as session:
+    yield session
+  admin_authorizer.clear()
+  schedule_indexes.clear()
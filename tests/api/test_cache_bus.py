@@ -0,0 +1,66 @@
+from sqlalchemy import delete, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from api.cache.bus import InvalidationBus, publish_change
+from api.cache.store import ResponseCache
+from api.db.models import ChangeEvent
+
+
+def test_bus_drops_entries_published_by_another_worker(engine: Engine) -> None:
+  cache = ResponseCache(max_entries=16)
+  bus = InvalidationBus(engine, cache=cache, poll_interval=60)
+  bus.start()
+  try:
+    cache.get_or_compute('league-1', 'rankings', (None,), lambda: ['stale'])
+    cache.get_or_compute('league-2', 'rankings', (None,), lambda: ['kept'])
+
+    # Another worker commits a score update for league-1.
+    with Session(engine) as session:
+      publish_change(session, 'league-1')
+      session.commit()
+
+    assert bus.poll_once() == 1
+    assert cache.get_or_compute('league-1', 'rankings', (None,), lambda: ['fresh']) == ['fresh']
+    assert cache.get_or_compute('league-2', 'rankings', (None,), lambda: ['recomputed']) == ['kept']
+    assert bus.poll_once() == 0
+  finally:
+    bus.stop()
+
+
+def test_events_published_after_a_full_prune_still_reach_other_workers(engine: Engine) -> None:
+  cache = ResponseCache(max_entries=16)
+  publisher = InvalidationBus(engine, cache=ResponseCache(max_entries=16), poll_interval=60, retention=0)
+  bus = InvalidationBus(engine, cache=cache, poll_interval=60)
+  bus.start()
+  try:
+    for _ in range(3):
+      with Session(engine) as session:
+        publish_change(session, 'league-1')
+        session.commit()
+    assert bus.poll_once() == 3
+
+    # A quiet period longer than the retention: everything but the newest event goes.
+    publisher.prune()
+    with engine.connect() as conn:
+      assert conn.execute(select(ChangeEvent.seq)).scalars().all() == [3]
+
+    cache.get_or_compute('league-1', 'rankings', (None,), lambda: ['stale'])
+    with Session(engine) as session:
+      publish_change(session, 'league-1')
+      session.commit()
+    assert bus.poll_once() == 1
+    assert cache.get_or_compute('league-1', 'rankings', (None,), lambda: ['fresh']) == ['fresh']
+
+    # A log that did restart its numbering is read again from the start, dropping everything cached.
+    cache.get_or_compute('league-2', 'rankings', (None,), lambda: ['stale'])
+    with engine.begin() as conn:
+      conn.execute(delete(ChangeEvent))
+      conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'change_events'"))
+    with Session(engine) as session:
+      publish_change(session, 'league-3')
+      session.commit()
+    assert bus.poll_once() == 1
+    assert cache.get_or_compute('league-2', 'rankings', (None,), lambda: ['fresh']) == ['fresh']
+  finally:
+    bus.stop()
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta, timezone
+from itertools import combinations
+from zoneinfo import ZoneInfo
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from api.db.models import Court, CourtAvailability, League, LeagueApplication, LeagueMatch, MatchParticipant, Member
+from api.services.brackets import LeagueBracketService
+from api.services.club_scheduler import CLUB_TIMEZONE, ClubCalendar, CourtHours
+from api.services.scheduling import ScheduleService
+from api.services.swiss import SwissStageService
+
+MONDAY = datetime(2024, 6, 3, 0, 0, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+
+
+def test_calendar_fills_open_windows_around_bookings_round_by_round() -> None:
+  courts = [
+    CourtHours(court_id=1, name='A', windows={0: [(9 * 60, 11 * 60)]}),  # Mondays 9-11 only
+    CourtHours(court_id=2, name='B', windows={day: [(10 * 60, 12 * 60)] for day in range(7)})
+  ]
+  calendar = ClubCalendar(courts, MONDAY, zone='UTC')
+  calendar.book('other-league', 1, MONDAY + 9 * HOUR, ['p1'])
+
+  first, second, third, final = calendar.place_rounds(
+    [(1, ['p1', 'p2']), (1, ['p3', 'p4']), (1, ['p5', 'p6']), (2, ['p1', 'p3'])], MONDAY
+  )
+  # p1 is busy at 9:00 and court A is booked then: A at 10:00, B at 10:00, B at 11:00.
+  assert (first.court, first.scheduled_at) == ('A', MONDAY + 10 * HOUR)
+  assert (second.court, second.scheduled_at) == ('B', MONDAY + 10 * HOUR)
+  assert (third.court, third.scheduled_at) == ('B', MONDAY + 11 * HOUR)
+  # Round 2 starts after round 1 ends (12:00): nothing is open until B opens on Tuesday.
+  assert (final.court, final.scheduled_at) == ('B', MONDAY + 34 * HOUR)
+
+  closed = ClubCalendar(courts[:1], MONDAY, horizon_days=3, zone='UTC')
+  assert closed.place_rounds([(1, ['p1'])] * 3, MONDAY) is None
+
+
+def _league(session: Session, name: str, members: list[Member]) -> League:
+  league = League(name=name, surface_type='hard', entry_fee=0, max_participants=len(members), courts_count=4)
+  session.add(league)
+  session.flush()
+  session.add_all(LeagueApplication(league_id=league.id, member_id=member.id) for member in members)
+  session.flush()
+  return league
+
+
+def _utc(value: datetime) -> datetime:
+  return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _assert_no_overlap(matches: list[LeagueMatch], members: dict[str, set[str]]) -> None:
+  for first, second in combinations(matches, 2):
+    if abs(_utc(first.scheduled_at) - _utc(second.scheduled_at)) < HOUR:
+      assert first.court_id != second.court_id
+      assert not members[first.id] & members[second.id]
+
+
+def test_leagues_share_club_courts_and_new_rounds_fit_around_existing_matches(session: Session) -> None:
+  admin = Member(full_name='관리자', email='club-admin@example.com', level='advanced', role='admin')
+  members = [
+    Member(full_name=f'선수{i}', email=f'club{i}@example.com', level='intermediate', rating=1400.0 + 20 * i)
+    for i in range(16)
+  ]
+  courts = [Court(name='센터 코트', surface_type='hard'), Court(name='2번 코트', surface_type='clay')]
+  courts[1].availability = [CourtAvailability(weekday=day, opens_at=18 * 60, closes_at=21 * 60) for day in range(7)]
+  session.add_all([admin, *members, *courts])
+  session.flush()
+  # 선수4-7 play in both leagues.
+  bracket_league = _league(session, '복식 리그', members[:8])
+  swiss_league = _league(session, '스위스 리그', members[4:16])
+  session.commit()
+
+  LeagueBracketService(session).generate_bracket(bracket_league.id, admin.id, groups_count=1, courts_count=4)
+  booked = {
+    match.id: (match.court_id, _utc(match.scheduled_at))
+    for match in session.execute(select(LeagueMatch)).scalars()
+  }
+  round_one = SwissStageService(session).start(swiss_league.id, admin.id, mode='singles')
+  for match in round_one:
+    match.status, match.score_a, match.score_b = 'completed', 6, 3
+    session.flush()
+    SwissStageService(session).record_result(match)
+  session.commit()
+
+  matches = session.execute(select(LeagueMatch)).scalars().all()
+  participants: dict[str, set[str]] = {match.id: set() for match in matches}
+  for match_id, member_id in session.execute(select(MatchParticipant.match_id, MatchParticipant.member_id)):
+    participants[match_id].add(member_id)
+  _assert_no_overlap(matches, participants)
+
+  zone = ZoneInfo(CLUB_TIMEZONE)
+  evening = courts[1].id
+  for match in matches:
+    assert match.court_id in {court.id for court in courts}
+    local = _utc(match.scheduled_at).astimezone(zone)
+    assert (18 if match.court_id == evening else 7) <= local.hour < (21 if match.court_id == evening else 22)
+  # Generating the other league and its next round moved nothing already booked.
+  for match in matches:
+    if match.id in booked:
+      assert (match.court_id, _utc(match.scheduled_at)) == booked[match.id]
+  round_two = [match for match in matches if match.stage == 'swiss' and match.round == 2]
+  assert round_two
+  last_of_round_one = max(_utc(match.scheduled_at) for match in matches if match.stage == 'swiss' and match.round == 1)
+  assert min(_utc(match.scheduled_at) for match in round_two) >= last_of_round_one + HOUR
+
+  # Moving a bracket match onto a court slot the other league holds is rejected.
+  mover = next(match for match in matches if match.stage == 'preliminary')
+  holder = next(
+    match for match in matches
+    if match.stage == 'swiss' and not participants[match.id] & participants[mover.id] and match.court_id == mover.court_id
+  )
+  with pytest.raises(HTTPException) as error:
+    ScheduleService(session).move_match(mover, _utc(holder.scheduled_at), holder.court)
+  assert error.value.status_code == 409
+  assert holder.id in error.value.detail
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from api.db.models import League
+from api.services.generation_guard import SingleFlight, lock_league
+
+
+def test_single_flight_shares_one_run_between_identical_concurrent_calls() -> None:
+  flights = SingleFlight()
+  calls: list[str] = []
+
+  async def generate(name: str) -> list[str]:
+    calls.append(name)
+    await asyncio.sleep(0.01)
+    if name == 'broken':
+      raise HTTPException(status_code=409, detail='Final stage already generated')
+    return [name]
+
+  async def scenario() -> None:
+    first, second, other = await asyncio.gather(
+      flights.run(('bracket', 'a'), lambda: generate('a')),
+      flights.run(('bracket', 'a'), lambda: generate('a')),
+      flights.run(('bracket', 'b'), lambda: generate('b'))
+    )
+    assert first is second
+    assert other == ['b']
+
+    results = await asyncio.gather(
+      flights.run('broken', lambda: generate('broken')),
+      flights.run('broken', lambda: generate('broken')),
+      return_exceptions=True
+    )
+    assert [error.status_code for error in results] == [409, 409]
+
+    assert await flights.run(('bracket', 'a'), lambda: generate('a')) == ['a']
+
+  asyncio.run(scenario())
+  assert calls == ['a', 'b', 'broken', 'a']
+  assert len(flights) == 0
+
+
+def test_league_lock_blocks_a_second_writer_until_commit(sessions: sessionmaker) -> None:
+  with sessions() as setup:
+    league = League(name='잠금 리그', surface_type='hard', entry_fee=0, max_participants=8)
+    setup.add(league)
+    setup.commit()
+
+  with sessions() as first, sessions() as second:
+    assert lock_league(first, league.id).generation_seq == 1
+    with pytest.raises(OperationalError):
+      lock_league(second, league.id)
+    second.rollback()
+    first.commit()
+    assert lock_league(second, league.id).generation_seq == 2
+
+    with pytest.raises(HTTPException) as error:
+      lock_league(second, 'missing')
+    assert error.value.status_code == 404
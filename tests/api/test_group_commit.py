@@ -0,0 +1,90 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from api.cache import bus
+from api.cache.bus import publish_change
+from api.db.models import Base, League
+from api.db.writer import GroupCommitWriter
+
+TEST_DB_PATH = Path('tests/tmp_group_commit.db')
+
+
+@pytest.fixture()
+def writer() -> Iterator[GroupCommitWriter]:
+  url = f'sqlite:///{TEST_DB_PATH}'
+  engine = create_engine(url, future=True)
+  Base.metadata.create_all(bind=engine)
+  engine.dispose()
+  writer = GroupCommitWriter(url, max_batch_size=16, max_delay=0.05)
+  yield writer
+  writer.stop()
+  TEST_DB_PATH.unlink(missing_ok=True)
+
+
+def _create_league(name: str):
+  def work(session: Session) -> str:
+    league = League(name=name, surface_type='hard', entry_fee=0, max_participants=8)
+    session.add(league)
+    session.commit()
+    return league.id
+  return work
+
+
+def _fail(session: Session) -> None:
+  session.add(League(name='rolled back', surface_type='hard', entry_fee=0, max_participants=8))
+  session.flush()
+  raise HTTPException(status_code=409, detail='conflict')
+
+
+def test_batch_acknowledges_each_caller_with_its_own_outcome(writer: GroupCommitWriter) -> None:
+  first = writer.submit(_create_league('first'))
+  failing = writer.submit(_fail)
+  second = writer.submit(_create_league('second'))
+
+  assert len(first.result(timeout=5)) == 32
+  assert len(second.result(timeout=5)) == 32
+  with pytest.raises(HTTPException):
+    failing.result(timeout=5)
+
+  assert writer.batches_committed == 1
+  assert writer.jobs_committed == 2
+
+  engine = create_engine(f'sqlite:///{TEST_DB_PATH}', future=True)
+  with Session(engine) as session:
+    names = set(session.execute(select(League.name)).scalars())
+    assert names == {'first', 'second'}
+    assert session.execute(select(func.count(League.id))).scalar_one() == 2
+  engine.dispose()
+
+
+def test_invalidations_wait_for_the_batch_commit(writer: GroupCommitWriter, monkeypatch: pytest.MonkeyPatch) -> None:
+  notified: list[str] = []
+  monkeypatch.setattr(bus, '_change_listeners', [notified.append])
+
+  def change(session: Session) -> list[str]:
+    league = League(name='changed', surface_type='hard', entry_fee=0, max_participants=8)
+    session.add(league)
+    session.flush()
+    publish_change(session, league.id)
+    session.commit()  # releases the job's savepoint only
+    return list(notified)
+
+  def change_then_fail(session: Session) -> None:
+    publish_change(session, 'rolled-back')
+    _fail(session)
+
+  changed, failing = writer.submit(change), writer.submit(change_then_fail)
+  assert changed.result(timeout=5) == []
+  with pytest.raises(HTTPException):
+    failing.result(timeout=5)
+
+  engine = create_engine(f'sqlite:///{TEST_DB_PATH}', future=True)
+  with Session(engine) as session:
+    league_id = session.execute(select(League.id)).scalar_one()
+  engine.dispose()
+  assert notified == [league_id]
@@ -2,14 +2,19 @@ from collections.abc import Iterator
 from datetime import datetime, timezone
 from pathlib import Path
 
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
-from api.db.models import Base, League, LeagueApplication, LeagueMatch, Member
-from api.db.session import get_session
+from api.cache.store import cache_requests, response_cache
+from api.db.models import Base, BracketPreview, ChangeEvent, Court, League, LeagueApplication, LeagueMatch, Member
+from api.db.session import get_read_session, get_session
 from api.main import app
+from api.observability import tracing
+from api.observability.db import instrument_engine
 
 TEST_DB_PATH = Path('tests/tmp_test.db')
 SQLALCHEMY_DATABASE_URL = f'sqlite:///{TEST_DB_PATH}'
@@ -18,8 +23,9 @@ engine = create_engine(
   future=True,
   connect_args={'check_same_thread': False}
 )
-TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False, future=True)
 Base.metadata.create_all(bind=engine)
+instrument_engine(engine, 'test')
 
 
 def override_get_session() -> Iterator[Session]:
@@ -31,6 +37,8 @@ def override_get_session() -> Iterator[Session]:
 
 
 app.dependency_overrides[get_session] = override_get_session
+app.dependency_overrides[get_read_session] = override_get_session
+app.state.read_sessions = TestingSessionLocal
 client = TestClient(app)
 
 
@@ -39,10 +47,14 @@ def _clean_db() -> Iterator[None]:
   yield
   with TestingSessionLocal() as session:
     session.query(LeagueMatch).delete()
+    session.query(BracketPreview).delete()
     session.query(LeagueApplication).delete()
     session.query(League).delete()
     session.query(Member).delete()
+    session.query(Court).delete()
+    session.query(ChangeEvent).delete()
     session.commit()
+  response_cache.clear()
 
 
 @pytest.fixture(scope='session', autouse=True)
@@ -58,6 +70,19 @@ def test_health_check() -> None:
   assert response.json() == {'status': 'ok'}
 
 
+def test_created_and_fetched_rows_serialize_the_same_timestamps() -> None:
+  created = client.post('/leagues', json={'name': '시간 리그', 'surface_type': 'hard', 'entry_fee': 0, 'max_participants': 8})
+  assert created.status_code == 201
+  league = created.json()
+  assert league['created_at'].endswith('Z')
+  assert client.get(f"/leagues/{league['id']}").json()['created_at'] == league['created_at']
+
+  member_id = _create_member('시간선수', 'timestamps@example.com')
+  applied = client.post(f"/leagues/{league['id']}/applications", json={'member_id': member_id}).json()
+  listed = client.get(f"/leagues/{league['id']}/applications").json()
+  assert [entry['applied_at'] for entry in listed] == [applied['applied_at']]
+
+
 def test_member_signup_creates_member_and_blocks_duplicates() -> None:
   payload = {
     'full_name': '김선수',
@@ -265,3 +290,281 @@ def test_manual_bracket_generation() -> None:
   matches = generate_response.json()
   assert len(matches) == 2
   assert {match['group_number'] for match in matches} == {1, 2}
+
+
+def test_cached_match_list_reflects_score_updates() -> None:
+  admin_id = _create_member('관리자', 'admin@tennis.club', level='advanced', role='admin')
+  league_id = _create_league('캐시 리그')
+  created_match = _create_match(league_id, admin_id)
+
+  first = client.get(f'/leagues/{league_id}/matches')
+  assert first.json()[0]['status'] == 'scheduled'
+
+  score_response = client.patch(f'/matches/{created_match["id"]}/score', json={'score_a': 6, 'score_b': 3})
+  assert score_response.status_code == 200
+
+  second = client.get(f'/leagues/{league_id}/matches')
+  assert second.json()[0]['status'] == 'completed'
+  assert second.json()[0]['score_a'] == 6
+
+
+def test_metrics_endpoint_reports_route_latency_and_queries() -> None:
+  league_id = _create_league('지표 리그')
+  client.get(f'/leagues/{league_id}/matches')
+
+  response = client.get('/metrics')
+  assert response.status_code == 200
+  body = response.text
+  assert 'http_request_duration_seconds_count{method="GET",route="/leagues/{league_id}/matches"}' in body
+  assert 'http_request_db_queries_count{method="POST",route="/leagues"}' in body
+  assert 'response_cache_requests_total{cache="responses",result="miss"}' in body
+
+
+def test_admin_can_profile_a_single_request() -> None:
+  admin_id = _create_member('관리자', 'admin@tennis.club', 'advanced', 'admin')
+  member_id = _create_member('일반회원', 'member@tennis.club')
+  league_id = _create_league('프로파일 리그')
+  _create_match(league_id, admin_id)
+
+  plain = client.get(f'/leagues/{league_id}/matches')
+  assert 'x-profile-id' not in plain.headers
+
+  denied = client.get(f'/leagues/{league_id}/rankings', headers={'X-Profile-Admin': member_id})
+  assert denied.status_code == 403
+
+  profiled = client.get(f'/leagues/{league_id}/rankings', params={'profile_admin': admin_id})
+  assert profiled.status_code == 200
+  profile_id = profiled.headers['x-profile-id']
+
+  report = client.get(f'/profiles/{profile_id}', params={'admin_id': admin_id}).json()
+  assert report['route'] == '/leagues/{league_id}/rankings'
+  assert report['sql_count'] == len(report['sql']) > 0
+  assert set(report['phases']) == {'pairing_ms', 'db_ms', 'serialization_ms', 'other_ms'}
+  assert report['top_functions']
+  assert client.get(f'/profiles/{profile_id}', params={'admin_id': member_id}).status_code == 403
+
+
+def test_bracket_generation_reports_server_timing_phases() -> None:
+  admin_id = _create_member('관리자', 'admin@tennis.club', role='admin')
+  league_id = _create_league('타이밍 오픈', max_participants=4, auto_generate_bracket=False)
+  for index in range(4):
+    member_id = _create_member(f'선수{index}', f'timing{index}@example.com')
+    client.post(f'/leagues/{league_id}/applications', json={'member_id': member_id})
+
+  response = client.post(
+    f'/leagues/{league_id}/bracket',
+    json={'admin_id': admin_id, 'groups_count': 1, 'courts_count': 1}
+  )
+  assert response.status_code == 200
+  phases = {entry.split(';')[0].strip() for entry in response.headers['server-timing'].split(',')}
+  assert {'db', 'pairing', 'schedule', 'persist', 'commit', 'serialize', 'total'} <= phases
+
+  assert 'server-timing' not in client.get('/health').headers
+
+
+def test_sampled_request_exports_route_service_and_sql_spans(monkeypatch: pytest.MonkeyPatch) -> None:
+  export_path = Path('tests/tmp_traces.jsonl')
+  exporter = tracing.JsonlExporter(path=str(export_path))
+  monkeypatch.setattr(tracing, 'exporter', exporter)
+  monkeypatch.setattr(tracing, 'TRACE_SAMPLE_RATE', 1e-9)  # on, but only the traceparent flag samples
+  admin_id = _create_member('관리자', 'admin@tennis.club', role='admin')
+  league_id = _create_league('추적 오픈', max_participants=4, auto_generate_bracket=False)
+  for index in range(4):
+    member_id = _create_member(f'선수{index}', f'trace{index}@example.com')
+    client.post(f'/leagues/{league_id}/applications', json={'member_id': member_id})
+  assert not export_path.exists()
+
+  trace_id = 'ab' * 16
+  try:
+    response = client.post(
+      f'/leagues/{league_id}/bracket',
+      json={'admin_id': admin_id, 'groups_count': 1, 'courts_count': 1},
+      headers={'traceparent': f'00-{trace_id}-{"cd" * 8}-01'}
+    )
+    assert response.status_code == 200
+    assert response.headers['x-trace-id'] == trace_id
+    spans = [json.loads(line) for line in export_path.read_text(encoding='utf-8').splitlines()]
+  finally:
+    exporter.close()
+    export_path.unlink(missing_ok=True)
+
+  assert {span['trace_id'] for span in spans} == {trace_id}
+  by_id = {span['span_id']: span for span in spans}
+  root = next(span for span in spans if span['kind'] == 'server')
+  assert root['name'] == 'POST /leagues/{league_id}/bracket'
+  assert root['parent_span_id'] == 'cd' * 8
+  assert root['attributes']['league_id'] == league_id
+
+  generate = next(span for span in spans if span['name'] == 'LeagueBracketService.generate_bracket')
+  assert generate['attributes']['league_id'] == league_id
+  assert by_id[generate['parent_span_id']]['kind'] in {'server', 'internal'}
+  inserts = [span for span in spans if span['name'] == 'INSERT' and 'league_matches' in span['attributes']['db.statement']]
+  assert inserts and all(span['attributes']['db.rows_affected'] >= 1 for span in inserts)
+  assert all(span['parent_span_id'] in by_id for span in spans if span is not root)
+
+
+def test_traceparent_flag_only_samples_while_tracing_is_on(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+  exporter = tracing.JsonlExporter(path=str(tmp_path / 'traces.jsonl'))
+  monkeypatch.setattr(tracing, 'exporter', exporter)
+  parent = f'00-{"ab" * 16}-{"cd" * 8}'
+  try:
+    monkeypatch.setattr(tracing, 'TRACE_SAMPLE_RATE', 0.0)
+    assert 'x-trace-id' not in client.get('/health', headers={'traceparent': f'{parent}-01'}).headers
+
+    monkeypatch.setattr(tracing, 'TRACE_SAMPLE_RATE', 1e-9)
+    for flags, sampled in (('01', True), ('03', True), ('00', False), ('02', False), ('zz', False)):
+      response = client.get('/health', headers={'traceparent': f'{parent}-{flags}'})
+      assert ('x-trace-id' in response.headers) is sampled, flags
+  finally:
+    exporter.close()
+
+
+def test_admin_memory_diagnostics_report_and_snapshot_diff() -> None:
+  admin_id = _create_member('관리자', 'admin@tennis.club', role='admin')
+  member_id = _create_member('일반회원', 'member@tennis.club')
+  _create_league('메모리 리그')
+
+  assert client.get('/diagnostics/memory', params={'admin_id': member_id}).status_code == 403
+  report = client.get('/diagnostics/memory', params={'admin_id': admin_id}).json()
+  assert {'process', 'identity_maps', 'caches'} <= set(report)
+  assert {'responses', 'profiles'} <= set(report['caches'])
+
+  try:
+    first = client.post('/diagnostics/memory/snapshots', params={'admin_id': admin_id}).json()
+    assert first['tracing_started'] and first['growth'] is None
+    client.get('/leagues')
+    second = client.post('/diagnostics/memory/snapshots', params={'admin_id': admin_id, 'top': 5}).json()
+    assert not second['tracing_started']
+    assert 0 < len(second['sites']) <= 5
+    assert second['growth'] and all('size_diff_kib' in site for site in second['growth'])
+  finally:
+    assert client.delete('/diagnostics/memory/snapshots', params={'admin_id': admin_id}).status_code == 204
+
+
+def test_admin_role_is_cached_until_the_role_changes() -> None:
+  admin_id = _create_member('관리자', 'admin@tennis.club', role='admin')
+  coach_id = _create_member('코치', 'coach@tennis.club')
+  league_id = _create_league('권한 리그')
+  promoted = client.patch(f'/members/{coach_id}/role', json={'role': 'admin', 'admin_id': admin_id})
+  assert promoted.status_code == 200
+
+  hits = cache_requests.value('admins', 'hit')
+  _create_match(league_id, coach_id)
+  _create_match(league_id, coach_id, round_=2)
+  assert cache_requests.value('admins', 'hit') >= hits + 1
+
+  demoted = client.patch(f'/members/{coach_id}/role', json={'role': 'member', 'admin_id': admin_id})
+  assert demoted.status_code == 200
+  response = client.post(
+    f'/leagues/{league_id}/matches',
+    json={
+      'admin_id': coach_id, 'round': 3, 'group_number': 1, 'player_a': '홍길동', 'player_b': '김코치',
+      'court': 'Center', 'scheduled_at': datetime(2024, 4, 12, 9, 0, tzinfo=timezone.utc).isoformat()
+    }
+  )
+  assert response.status_code == 403
+
+
+def test_qualification_odds_endpoint_is_cached_per_league_version() -> None:
+  league_id = _create_league('확률 리그')
+  first = client.get(f'/leagues/{league_id}/qualification', params={'top_n': 2, 'model': 'uniform'})
+  assert first.status_code == 200
+  assert first.json() == {'top_n': 2, 'model': 'uniform', 'simulations': 10000, 'remaining_matches': 0, 'players': []}
+
+  hits = cache_requests.value('responses', 'hit')
+  client.get(f'/leagues/{league_id}/qualification', params={'top_n': 2, 'model': 'uniform'})
+  assert cache_requests.value('responses', 'hit') == hits + 1
+
+  assert client.get('/leagues/missing/qualification').status_code == 404
+
+
+def test_swiss_stage_endpoints_update_standings_after_each_score() -> None:
+  admin_id = _create_member('관리자', 'admin@tennis.club', level='advanced', role='admin')
+  league_id = _create_league('스위스 오픈', max_participants=4, auto_generate_bracket=False)
+  for index in range(4):
+    member_id = _create_member(f'선수{index}', f'swiss{index}@example.com')
+    assert client.post(f'/leagues/{league_id}/applications', json={'member_id': member_id}).status_code == 201
+
+  started = client.post(f'/leagues/{league_id}/swiss', json={'admin_id': admin_id, 'format': 'singles'})
+  assert started.status_code == 200
+  assert len(started.json()) == 2
+  assert all(row['score'] == 0 for row in client.get(f'/leagues/{league_id}/swiss/standings').json())
+
+  match_id = started.json()[0]['id']
+  assert client.patch(f'/matches/{match_id}/score', json={'score_a': 6, 'score_b': 3}).status_code == 200
+  standings = client.get(f'/leagues/{league_id}/swiss/standings').json()
+  assert standings[0]['score'] == 1.0
+  assert standings[0]['points_diff'] == 3
+  assert standings[0]['matches_played'] == 1
+  assert standings[0]['draws'] == 0
+
+  drawn_id = started.json()[1]['id']
+  assert client.patch(f'/matches/{drawn_id}/score', json={'score_a': 6, 'score_b': 6}).status_code == 200
+  drawn = [row for row in client.get(f'/leagues/{league_id}/swiss/standings').json() if row['score'] == 0.5]
+  assert [(row['draws'], row['matches_played']) for row in drawn] == [(1, 1), (1, 1)]
+  assert client.get('/leagues/missing/swiss/standings').status_code == 404
+
+
+def test_bracket_preview_writes_nothing_and_commit_persists_the_same_bracket() -> None:
+  admin_id = _create_member('관리자', 'admin@tennis.club', level='advanced', role='admin')
+  league_id = _create_league('미리보기 리그', max_participants=9, auto_generate_bracket=False)
+  for index in range(8):
+    member_id = _create_member(f'선수{index}', f'preview{index}@example.com')
+    assert client.post(f'/leagues/{league_id}/applications', json={'member_id': member_id}).status_code == 201
+
+  request = {'admin_id': admin_id, 'groups_count': 1, 'courts_count': 2, 'seed': 42}
+  first = client.post(f'/leagues/{league_id}/bracket/preview', json=request).json()
+  second = client.post(f'/leagues/{league_id}/bracket/preview', json=request).json()
+  assert first['seed'] == 42
+  assert first['matches']
+  assert first['token'] != second['token']
+  assert [(m['team_a'], m['team_b']) for m in first['matches']] == [(m['team_a'], m['team_b']) for m in second['matches']]
+  assert client.get(f'/leagues/{league_id}/matches').json() == []
+  with TestingSessionLocal() as session:
+    # Stored in the database, so any worker can commit it.
+    assert {preview.token for preview in session.query(BracketPreview)} == {first['token'], second['token']}
+
+  committed = client.post(f'/leagues/{league_id}/bracket/commit', json={'admin_id': admin_id, 'token': first['token']})
+  assert committed.status_code == 200
+  assert [(m['player_a'], m['player_b'], m['court']) for m in committed.json()] == [
+    (m['player_a'], m['player_b'], m['court']) for m in first['matches']
+  ]
+  assert len(client.get(f'/leagues/{league_id}/matches').json()) == len(first['matches'])
+
+  # Committing changed the league, so the other preview is no longer valid.
+  stale = client.post(f'/leagues/{league_id}/bracket/commit', json={'admin_id': admin_id, 'token': second['token']})
+  assert stale.status_code == 404
+
+  # So is one planned before a new application.
+  third = client.post(f'/leagues/{league_id}/bracket/preview', json=request).json()
+  late_id = _create_member('늦은선수', 'preview-late@example.com')
+  assert client.post(f'/leagues/{league_id}/applications', json={'member_id': late_id}).status_code == 201
+  stale = client.post(f'/leagues/{league_id}/bracket/commit', json={'admin_id': admin_id, 'token': third['token']})
+  assert stale.status_code == 404
+
+
+def test_club_courts_are_shared_by_generated_brackets() -> None:
+  admin_id = _create_member('관리자', 'admin@tennis.club', level='advanced', role='admin')
+  member_id = _create_member('회원', 'court-member@example.com')
+  court = {'name': '센터 코트', 'surface_type': 'hard', 'availability': [
+    {'weekday': day, 'opens_at': '18:00', 'closes_at': '22:00'} for day in range(7)
+  ]}
+  assert client.post('/courts', json={**court, 'admin_id': member_id}).status_code == 403
+  created = client.post('/courts', json={**court, 'admin_id': admin_id})
+  assert created.status_code == 201
+  assert created.json()['availability'][0] == {'weekday': 0, 'opens_at': '18:00', 'closes_at': '22:00'}
+  assert client.post('/courts', json={**court, 'admin_id': admin_id}).status_code == 409
+  assert [entry['name'] for entry in client.get('/courts').json()] == ['센터 코트']
+
+  league_ids = [_create_league(f'코트 리그 {number}', max_participants=8, auto_generate_bracket=False) for number in range(2)]
+  for number, league_id in enumerate(league_ids):
+    for index in range(4):
+      applicant = _create_member(f'선수{number}-{index}', f'court{number}-{index}@example.com')
+      assert client.post(f'/leagues/{league_id}/applications', json={'member_id': applicant}).status_code == 201
+    request = {'admin_id': admin_id, 'groups_count': 1, 'courts_count': 2}
+    assert client.post(f'/leagues/{league_id}/bracket', json=request).status_code == 200
+
+  matches = [match for league_id in league_ids for match in client.get(f'/leagues/{league_id}/matches').json()]
+  assert matches
+  assert {(match['court'], match['court_id']) for match in matches} == {('센터 코트', created.json()['id'])}
+  assert len({match['scheduled_at'] for match in matches}) == len(matches)
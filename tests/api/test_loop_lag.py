@@ -0,0 +1,42 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from api.observability.loop_lag import LoopLagWatchdog, loop_blocked
+
+
+def _block_loop(seconds: float) -> None:
+  time.sleep(seconds)
+
+
+def test_blocked_loop_is_counted_and_logged_with_stack(caplog: pytest.LogCaptureFixture) -> None:
+  watchdog = LoopLagWatchdog(threshold=0.05, interval=0.01)
+  before = loop_blocked.value('other')
+
+  async def scenario() -> None:
+    watchdog.start()
+    try:
+      await asyncio.sleep(0.05)
+      _block_loop(0.3)
+      await asyncio.sleep(0.05)
+    finally:
+      watchdog.stop()
+
+  with caplog.at_level(logging.WARNING, logger='api.observability.loop_lag'):
+    asyncio.run(scenario())
+
+  assert loop_blocked.value('other') == before + 1
+  [record] = caplog.records
+  assert 'Event loop blocked' in record.getMessage()
+  assert '_block_loop' in record.getMessage()
+
+
+def test_zero_threshold_disables_watchdog() -> None:
+  async def scenario() -> None:
+    watchdog = LoopLagWatchdog(threshold=0)
+    watchdog.start()
+    assert watchdog._thread is None
+
+  asyncio.run(scenario())
@@ -0,0 +1,86 @@
+import random
+from collections import Counter
+
+from api.db.models import Member
+from api.services.doubles_pairing import DoublesPairingService
+from api.services.pairing_optimizer import member_strength, optimize_schedule
+from api.services.ratings import initial_rating
+
+
+def _members(size: int) -> list[Member]:
+  levels = ['beginner', 'intermediate', 'advanced']
+  return [
+    Member(id=f'{index:032x}', full_name=f'선수{index}', level=levels[index % 3], rating=initial_rating(levels[index % 3]))
+    for index in range(size)
+  ]
+
+
+def _gap(matches: list) -> float:
+  return sum(
+    abs(member_strength(a1) + member_strength(a2) - member_strength(b1) - member_strength(b2))
+    for (a1, a2), (b1, b2) in matches
+  )
+
+
+def test_balanced_pairs_keep_the_pairing_rules_and_beat_random_pairing() -> None:
+  members = _members(16)
+  random.seed(3)
+  balanced = DoublesPairingService.generate_balanced_pairs(members, matches_per_player=3, time_budget=1.0)
+
+  assert len(balanced) == 12
+  appearances = Counter(player.id for teams in balanced for team in teams for player in team)
+  assert set(appearances.values()) == {3}
+  partners = [frozenset(player.id for player in team) for teams in balanced for team in teams]
+  assert all(len(pair) == 2 for pair in partners)
+  assert len(set(partners)) == len(partners)
+  for team_a, team_b in balanced:
+    assert not {player.id for player in team_a} & {player.id for player in team_b}
+
+  random.seed(3)
+  assert _gap(balanced) < _gap(DoublesPairingService.generate_preliminary_pairs(members, matches_per_player=3))
+
+
+def test_optimizer_is_reproducible_for_a_seed_and_reports_an_infeasible_group() -> None:
+  strengths = [member_strength(member) for member in _members(12)]
+  first = optimize_schedule(strengths, max_iterations=50, time_budget=10.0, seed=5)
+  second = optimize_schedule(strengths, max_iterations=50, time_budget=10.0, seed=5)
+  assert (first.schedule == second.schedule).all()
+  assert first.imbalance == second.imbalance
+  members = _members(12)
+  matches = [((members[a1], members[a2]), (members[b1], members[b2])) for a1, a2, b1, b2 in first.schedule.tolist()]
+  assert abs(first.mean_gap - _gap(matches) / 2 / len(matches)) < 1e-9
+
+  # Four players cannot play four matches without repeating a partner (only six pairs exist).
+  infeasible = optimize_schedule([1500.0, 1500.0, 1650.0, 1350.0], matches_per_player=4, max_iterations=200, time_budget=10.0, seed=1)
+  assert infeasible.violations > 0
+
+
+def test_snake_draft_balances_groups_and_is_reproducible_for_a_seed() -> None:
+  members = _members(16)
+  in_order = DoublesPairingService.distribute_to_groups(members, 4)
+  drafted = DoublesPairingService.distribute_to_groups(members, 4, mode='snake_rating', seed=11)
+
+  assert sorted(len(group) for group in drafted) == [4, 4, 4, 4]
+  assert sorted(member.id for group in drafted for member in group) == sorted(member.id for member in members)
+  totals = [sum(member_strength(member) for member in group) for group in drafted]
+  in_order_totals = [sum(member_strength(member) for member in group) for group in in_order]
+  assert max(totals) - min(totals) < max(in_order_totals) - min(in_order_totals)
+
+  again = DoublesPairingService.distribute_to_groups(list(reversed(members)), 4, mode='snake_rating', seed=11)
+  assert [[member.id for member in group] for group in again] == [[member.id for member in group] for group in drafted]
+
+
+def test_snake_draft_keeps_couples_apart_and_caps_levels() -> None:
+  members = _members(12)
+  couple = (members[0].id, members[4].id)
+  unconstrained = DoublesPairingService.snake_draft(members, 3, by='level', seed=2)
+  assert any(set(couple) <= {member.id for member in group} for group in unconstrained)
+
+  groups = DoublesPairingService.snake_draft(
+    members, 3, by='level', seed=2, keep_apart=[couple], max_per_level=2
+  )
+
+  for group in groups:
+    ids = {member.id for member in group}
+    assert not set(couple) <= ids
+    assert max(Counter(member.level for member in group).values()) <= 2
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+from api.db.models import League, LeagueMatch, MatchParticipant, Member
+from api.services.qualification import QualificationService
+from api.services.rankings import RankingService
+
+
+# (team A, team B, score) per group-1 match; None means still scheduled.
+SCHEDULE = [
+  ((0, 1), (2, 3), (6, 2)),
+  ((4, 5), (6, 7), (6, 4)),
+  ((0, 2), (4, 6), (3, 6)),
+  ((1, 3), (5, 7), (6, 1)),
+  ((0, 3), (5, 6), None),
+  ((1, 2), (4, 7), None)
+]
+
+
+def _league(session: Session, schedule=SCHEDULE) -> str:
+  members = [
+    Member(full_name=f'선수{i}', email=f'q{i}@example.com', level='intermediate', rating=1400.0 + 30 * i)
+    for i in range(8)
+  ]
+  league = League(name='예선 리그', surface_type='clay', entry_fee=0, max_participants=8)
+  session.add_all([*members, league])
+  session.flush()
+  for team_a, team_b, score in schedule:
+    match = LeagueMatch(
+      league_id=league.id, round=1, group_number=1, player_a='A', player_b='B', court='Court 1',
+      scheduled_at=datetime(2024, 4, 12, 9, 0, tzinfo=timezone.utc),
+      status='completed' if score else 'scheduled',
+      score_a=score[0] if score else None, score_b=score[1] if score else None
+    )
+    session.add(match)
+    session.flush()
+    for team, players in (('team_a', team_a), ('team_b', team_b)):
+      session.add_all(MatchParticipant(match_id=match.id, member_id=members[i].id, team=team) for i in players)
+  session.commit()
+  return league.id
+
+
+def test_odds_sum_to_the_qualifying_places_and_repeat_for_a_seed(session: Session) -> None:
+  league_id = _league(session)
+  odds = QualificationService(session).odds(league_id, top_n=2, model='rating', simulations=5000, seed=9)
+
+  assert odds.remaining_matches == 2
+  assert len(odds.players) == 8
+  assert sum(player.probability for player in odds.players) == pytest.approx(2.0)
+  assert all(0.0 <= player.probability <= 1.0 for player in odds.players)
+  by_name = {player.player_name: player for player in odds.players}
+  # 선수1 (2 wins, +9) and 선수4 (2 wins, +5) meet; 선수2 and 선수7 can reach one win at most.
+  assert by_name['선수1'].probability > 0.5
+  assert by_name['선수1'].probability > by_name['선수0'].probability
+  assert by_name['선수2'].probability == 0.0
+  assert by_name['선수7'].probability == 0.0
+  assert by_name['선수3'].remaining_matches == 1
+
+  again = QualificationService(session).odds(league_id, top_n=2, model='rating', simulations=5000, seed=9)
+  assert [player.probability for player in again.players] == [player.probability for player in odds.players]
+
+
+def test_finished_group_matches_ranking_service_top_n(session: Session) -> None:
+  finished = [(a, b, score or (6, 5)) for a, b, score in SCHEDULE]
+  league_id = _league(session, finished)
+  odds = QualificationService(session).odds(league_id, top_n=2, model='uniform', simulations=1000, seed=1)
+
+  assert odds.remaining_matches == 0
+  qualified = {player.player_name for player in odds.players if player.probability == 1.0}
+  assert qualified == set(RankingService(session).get_top_players_per_group(league_id, top_n=2)[1])
+  assert {player.probability for player in odds.players} == {0.0, 1.0}
@@ -0,0 +1,89 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from api.db.models import League, LeagueMatch, MatchParticipant, Member, RatingHistory
+from api.services.ratings import RatingService, expected_score, initial_rating
+
+
+def _play_season(session: Session, players: int = 12, matches: int = 60) -> list[Member]:
+  rng = random.Random(7)
+  levels = ['beginner', 'intermediate', 'advanced']
+  members = [
+    Member(full_name=f'선수{i}', email=f'p{i}@example.com', level=levels[i % 3], rating=initial_rating(levels[i % 3]))
+    for i in range(players)
+  ]
+  league = League(name='레이팅 리그', surface_type='hard', entry_fee=0, max_participants=players)
+  session.add_all([*members, league])
+  session.flush()
+
+  service = RatingService(session)
+  started = datetime(2024, 4, 1, 9, 0, tzinfo=timezone.utc)
+  for number in range(matches):
+    a1, a2, b1, b2 = rng.sample(members, 4)
+    score_a, score_b = rng.choice([(6, 3), (4, 6), (7, 5), (5, 5)])
+    match = LeagueMatch(
+      league_id=league.id, round=1, group_number=1, player_a=a1.full_name, player_b=b1.full_name, court='1',
+      scheduled_at=started + timedelta(hours=number), completed_at=started + timedelta(hours=number, minutes=50),
+      score_a=score_a, score_b=score_b, status='completed'
+    )
+    session.add(match)
+    session.flush()
+    session.add_all([
+      MatchParticipant(match_id=match.id, member_id=a1.id, team='team_a'),
+      MatchParticipant(match_id=match.id, member_id=a2.id, team='team_a'),
+      MatchParticipant(match_id=match.id, member_id=b1.id, team='team_b'),
+      MatchParticipant(match_id=match.id, member_id=b2.id, team='team_b')
+    ])
+    session.flush()
+    session.refresh(match)
+    service.apply_match(match)
+  session.commit()
+  return members
+
+
+def test_apply_match_moves_both_teams_by_the_same_elo_delta(session: Session) -> None:
+  members = _play_season(session, players=4, matches=1)
+  history = {entry.member_id: entry for entry in session.execute(select(RatingHistory)).scalars()}
+  match = session.execute(select(LeagueMatch)).scalar_one()
+  teams = {participant.member_id: participant.team for participant in match.participants}
+
+  team_rating = {
+    team: sum(initial_rating(member.level) for member in members if teams[member.id] == team) / 2
+    for team in ('team_a', 'team_b')
+  }
+  result = 1.0 if match.score_a > match.score_b else 0.5 if match.score_a == match.score_b else 0.0
+  delta_a = 32 * (result - expected_score(team_rating['team_a'], team_rating['team_b']))
+  for member in members:
+    delta = delta_a if teams[member.id] == 'team_a' else -delta_a
+    assert history[member.id].delta == pytest.approx(delta)
+    assert member.rating == pytest.approx(initial_rating(member.level) + delta)
+    assert member.rated_matches == 1
+
+
+def test_recompute_replays_history_to_the_incremental_ratings(session: Session) -> None:
+  members = _play_season(session)
+  incremental = {member.id: (member.rating, member.rated_matches) for member in members}
+  incremental_history = session.execute(
+    select(RatingHistory.match_id, RatingHistory.member_id, RatingHistory.rating).order_by(RatingHistory.id)
+  ).all()
+
+  summary = RatingService(session).recompute()
+
+  assert summary.matches == 60
+  assert summary.members == 12
+  assert 1 < summary.layers <= 60
+  for member_id, rating, games in session.execute(select(Member.id, Member.rating, Member.rated_matches)):
+    assert rating == pytest.approx(incremental[member_id][0])
+    assert games == incremental[member_id][1]
+  replayed = session.execute(
+    select(RatingHistory.match_id, RatingHistory.member_id, RatingHistory.rating).order_by(RatingHistory.id)
+  ).all()
+  assert session.execute(select(func.count(RatingHistory.id))).scalar_one() == 240
+  assert sorted((m, p) for m, p, _ in replayed) == sorted((m, p) for m, p, _ in incremental_history)
+  expected = {(m, p): r for m, p, r in incremental_history}
+  for match_id, member_id, rating in replayed:
+    assert rating == pytest.approx(expected[(match_id, member_id)])
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from api.db.models import League, LeagueMatch, MatchParticipant, Member
+from api.services.doubles_tournament import DoublesTournamentService
+from api.services.scheduling import ScheduleIndex, ScheduleService, schedule_indexes
+
+DAY = datetime(2024, 5, 4, 9, 0, tzinfo=timezone.utc)
+
+
+def _league(session: Session) -> tuple[str, str, list[LeagueMatch]]:
+  """Two courts, three hourly slots; members 0-3 play at 9:00 and 11:00 on court 1, 4-7 at 9:00 on court 2."""
+  admin = Member(full_name='관리자', email='sched-admin@example.com', level='advanced', role='admin')
+  members = [Member(full_name=f'선수{i}', email=f'sched{i}@example.com', level='beginner') for i in range(8)]
+  league = League(name='일정 리그', surface_type='hard', entry_fee=0, max_participants=8, courts_count=2)
+  session.add_all([admin, *members, league])
+  session.flush()
+  matches = []
+  for court, hours, players in (('Court 1', 0, range(4)), ('Court 2', 0, range(4, 8)), ('Court 1', 2, range(4))):
+    match = LeagueMatch(
+      league_id=league.id, round=1, group_number=1, player_a='A', player_b='B',
+      court=court, scheduled_at=DAY + timedelta(hours=hours), status='scheduled'
+    )
+    session.add(match)
+    session.flush()
+    session.add_all(
+      MatchParticipant(match_id=match.id, member_id=members[i].id, team='team_a' if i % 4 < 2 else 'team_b')
+      for i in players
+    )
+    matches.append(match)
+  session.commit()
+  return league.id, admin.id, matches
+
+
+def test_index_finds_court_and_player_conflicts_and_free_slots(session: Session) -> None:
+  league_id, _, matches = _league(session)
+  index = ScheduleIndex.build(session, league_id)
+  first, second, third = matches
+  players = index.members_of(first.id)
+
+  assert len(index) == 3
+  assert index.conflicts('Court 1', DAY + timedelta(minutes=30)) == [first.id]
+  assert index.conflicts('Court 1', DAY + timedelta(hours=1)) == []
+  assert index.conflicts('Court 3', DAY, players[:1]) == [first.id]
+  assert index.conflicts('Court 1', DAY, ignore=[first.id]) == []
+
+  free = ScheduleService(session).free_slots(league_id, DAY, DAY + timedelta(hours=3))
+  assert free == [('Court 1', DAY + timedelta(hours=1)), ('Court 2', DAY + timedelta(hours=1)), ('Court 2', DAY + timedelta(hours=2))]
+  with_players = ScheduleService(session).free_slots(league_id, DAY, DAY + timedelta(hours=3), member_ids=list(players))
+  assert with_players == [('Court 1', DAY + timedelta(hours=1)), ('Court 2', DAY + timedelta(hours=1))]
+
+
+def test_moves_and_shifts_are_checked_and_keep_the_index_current(session: Session) -> None:
+  league_id, admin_id, (first, second, third) = _league(session)
+  service = DoublesTournamentService(session)
+
+  with pytest.raises(HTTPException) as error:
+    service.update_match(third.id, admin_id, scheduled_at=DAY + timedelta(minutes=30), court='Court 2')
+  assert error.value.status_code == 409
+
+  service.update_match(third.id, admin_id, scheduled_at=DAY + timedelta(hours=1))
+  index, _ = schedule_indexes.get(session, league_id)
+  assert index.conflicts('Court 1', DAY + timedelta(hours=1)) == [third.id]
+
+  # Court 2's 9:00 match would land on Court 1 at 10:00, where the third match now is.
+  with pytest.raises(HTTPException):
+    ScheduleService(session).shift(league_id, admin_id, minutes=60, court='Court 2', to_court='Court 1')
+
+  moved = ScheduleService(session).shift(league_id, admin_id, minutes=24 * 60, start=DAY + timedelta(minutes=30))
+  assert [match.id for match in moved] == [third.id]
+  assert moved[0].scheduled_at == DAY + timedelta(days=1, hours=1)
+  session.expire_all()
+  assert session.get(LeagueMatch, third.id).court == 'Court 1'
+  index, _ = schedule_indexes.get(session, league_id)
+  assert index.conflicts('Court 1', DAY + timedelta(hours=1)) == []
+  assert index.conflicts('Court 1', DAY + timedelta(days=1, hours=1)) == [third.id]
+
+
+def test_shift_checks_moved_matches_against_each_other(session: Session) -> None:
+  league_id, admin_id, (first, second, _) = _league(session)
+
+  # Merging the courts would put both 9:00 matches on Court 1.
+  with pytest.raises(HTTPException) as error:
+    ScheduleService(session).shift(league_id, admin_id, to_court='Court 1')
+  assert error.value.status_code == 409
+  session.expire_all()
+  assert session.get(LeagueMatch, second.id).court == 'Court 2'
+
+  moved = ScheduleService(session).shift(league_id, admin_id, minutes=60, court='Court 2', to_court='Court 3')
+  assert [match.id for match in moved] == [second.id]
@@ -0,0 +1,73 @@
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from api.db.models import League, LeagueMatch
+from api.observability import slow_queries
+from api.observability.db import instrument_engine
+from api.observability.slow_queries import SlowQueryLog, instrument_sessions
+from api.services.matches import LeagueMatchService
+
+
+@pytest.fixture()
+def instrumented_engine(engine: Engine) -> Engine:
+  instrument_engine(engine, 'slow-test')
+  return engine
+
+
+@pytest.fixture()
+def log_path(tmp_path: Path) -> Path:
+  return tmp_path / 'slow_queries.log'
+
+
+@pytest.fixture()
+def log(monkeypatch: pytest.MonkeyPatch, log_path: Path) -> Iterator[SlowQueryLog]:
+  # Threshold just above zero: every statement counts as slow.
+  log = SlowQueryLog(threshold_ms=1e-9, path=str(log_path))
+  monkeypatch.setattr(slow_queries, 'slow_query_log', log)
+  yield log
+  log.close()
+
+
+def test_slow_statements_are_logged_with_origin_and_plan(instrumented_engine: Engine, log: SlowQueryLog, log_path: Path) -> None:
+  factory = sessionmaker(bind=instrumented_engine, future=True)
+  instrument_sessions(factory)
+  with factory() as session:
+    session.add(League(id='a' * 32, name='느린 리그', surface_type='clay', entry_fee=0, max_participants=8))
+    session.commit()
+    LeagueMatchService(session).list_matches('a' * 32)
+
+  entries = [json.loads(line) for line in log_path.read_text(encoding='utf-8').splitlines()]
+  insert = next(entry for entry in entries if entry['statement'].startswith('INSERT INTO leagues'))
+  assert 'a' * 32 in insert['parameters']
+  assert '<str:5>' in insert['parameters']
+  assert '느린 리그' not in json.dumps(insert, ensure_ascii=False)
+
+  listing = next(entry for entry in entries if 'FROM league_matches' in entry['statement'])
+  assert listing['engine'] == 'slow-test'
+  assert listing['origin'].startswith('LeagueMatchService.list_matches')
+  assert any('SCAN league_matches' in line for line in listing['plan'])
+
+
+def test_threshold_disables_logging(instrumented_engine: Engine, monkeypatch: pytest.MonkeyPatch, log_path: Path) -> None:
+  monkeypatch.setattr(slow_queries, 'slow_query_log', SlowQueryLog(threshold_ms=0, path=str(log_path)))
+  with Session(instrumented_engine) as session:
+    session.execute(select(LeagueMatch)).all()
+  assert not log_path.exists()
+
+
+def test_orm_timing_is_opt_in(instrumented_engine: Engine, monkeypatch: pytest.MonkeyPatch, log_path: Path) -> None:
+  # Only the app's sessionmakers are instrumented, and with the log off selects are not buffered.
+  assert not event.contains(Session, 'do_orm_execute', slow_queries._time_orm_select)
+  monkeypatch.setattr(slow_queries, 'slow_query_log', SlowQueryLog(threshold_ms=0, path=str(log_path)))
+  factory = sessionmaker(bind=instrumented_engine, future=True)
+  instrument_sessions(factory)
+  with factory() as session:
+    result = session.execute(select(LeagueMatch))
+    assert type(result).__name__ == 'ChunkedIteratorResult'  # a frozen copy replays as IteratorResult
+    result.close()
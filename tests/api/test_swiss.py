@@ -0,0 +1,75 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from api.db.models import League, LeagueApplication, LeagueMatch, Member
+from api.schemas.match import MatchScoreUpdateRequest
+from api.services.matches import LeagueMatchService
+from api.services.swiss import SwissStageService, swiss_pairs
+
+
+def _league(session: Session, players: int) -> tuple[str, str]:
+  admin = Member(full_name='관리자', email='swiss-admin@example.com', level='advanced', role='admin')
+  members = [
+    Member(full_name=f'선수{i}', email=f's{i}@example.com', level='intermediate', rating=1300.0 + 20 * i)
+    for i in range(players)
+  ]
+  league = League(name='스위스 리그', surface_type='hard', entry_fee=0, max_participants=players)
+  session.add_all([admin, *members, league])
+  session.flush()
+  session.add_all(LeagueApplication(league_id=league.id, member_id=member.id) for member in members)
+  session.commit()
+  return league.id, admin.id
+
+
+def _play_round(session: Session, league_id: str, round_number: int) -> None:
+  matches = session.execute(
+    select(LeagueMatch).where(LeagueMatch.league_id == league_id, LeagueMatch.round == round_number)
+  ).scalars().all()
+  for index, match in enumerate(matches):
+    LeagueMatchService(session).update_match_score(
+      match.id, MatchScoreUpdateRequest(score_a=6, score_b=index % 5)
+    )
+
+
+def test_swiss_pairs_repairs_rematches_left_by_the_greedy_walk() -> None:
+  # Greedy: 1 skips 2 and takes 3, leaving 2 and 4, who already met.
+  met = {1: {2}, 2: {1, 4}, 4: {2}}
+  assert swiss_pairs([1, 2, 3, 4], met) == [(1, 4), (2, 3)]
+  assert swiss_pairs([1, 2, 3, 4], {}) == [(1, 2), (3, 4)]
+
+
+def test_doubles_swiss_pairs_new_opponents_each_round_and_updates_standings(session: Session) -> None:
+  league_id, admin_id = _league(session, 16)
+  first_round = SwissStageService(session).start(league_id, admin_id, rounds=3, courts_count=2)
+
+  assert len(first_round) == 4
+  assert session.get(League, league_id).swiss_rounds == 3
+  assert {match.stage for match in first_round} == {'swiss'}
+  assert all(len(match.participants) == 4 for match in first_round)
+
+  _play_round(session, league_id, 1)
+  _play_round(session, league_id, 2)
+  _play_round(session, league_id, 3)
+
+  assert session.get(League, league_id).swiss_round == 3
+  assert session.query(LeagueMatch).filter(LeagueMatch.league_id == league_id).count() == 12
+  standings = SwissStageService(session).standings(league_id)
+  assert len(standings) == 8
+  assert all(entrant.wins + entrant.losses == 3 for entrant in standings)
+  assert all(len(set(entrant.opponents)) == 3 for entrant in standings)
+  assert [entrant.score for entrant in standings] == sorted((entrant.score for entrant in standings), reverse=True)
+  assert standings[0].score == 3.0
+
+
+def test_singles_swiss_gives_the_odd_player_out_a_bye(session: Session) -> None:
+  league_id, admin_id = _league(session, 5)
+  matches = SwissStageService(session).start(league_id, admin_id, mode='singles')
+
+  assert len(matches) == 2
+  assert session.get(League, league_id).swiss_rounds == 3
+  _play_round(session, league_id, 1)
+
+  standings = SwissStageService(session).standings(league_id)
+  assert sum(entrant.byes for entrant in standings) == 2
+  assert max(entrant.byes for entrant in standings) == 1
+  assert session.query(LeagueMatch).filter(LeagueMatch.round == 2).count() == 2
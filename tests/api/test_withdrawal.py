@@ -0,0 +1,115 @@
+import random
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from api.db.models import League, LeagueApplication, LeagueMatch, Member
+from api.schemas.match import MatchScoreUpdateRequest
+from api.services.brackets import LeagueBracketService
+from api.services.matches import LeagueMatchService
+
+
+def _bracket(session: Session) -> tuple[str, str, list[LeagueMatch]]:
+  admin = Member(full_name='관리자', email='w-admin@example.com', level='advanced', role='admin')
+  members = [Member(full_name=f'선수{i}', email=f'w{i}@example.com', level='intermediate') for i in range(8)]
+  league = League(name='기권 리그', surface_type='clay', entry_fee=0, max_participants=8, auto_generate_bracket=False)
+  session.add_all([admin, *members, league])
+  session.flush()
+  session.add_all(LeagueApplication(league_id=league.id, member_id=member.id) for member in members)
+  session.commit()
+
+  random.seed(7)
+  matches = LeagueBracketService(session).generate_bracket(league.id, admin.id, groups_count=1, courts_count=1)
+  for match in matches[:2]:
+    LeagueMatchService(session).update_match_score(match.id, MatchScoreUpdateRequest(score_a=6, score_b=2))
+  return league.id, admin.id, matches
+
+
+def _lineups(session: Session, league_id: str) -> dict[str, tuple[frozenset[str], frozenset[str]]]:
+  matches = session.execute(select(LeagueMatch).where(LeagueMatch.league_id == league_id)).scalars().all()
+  return {
+    match.id: tuple(frozenset(p.member_id for p in match.participants if p.team == team) for team in ('team_a', 'team_b'))
+    for match in matches
+  }
+
+
+def _withdrawing(matches: list[LeagueMatch]) -> str:
+  """A player with at least one unplayed match."""
+  return next(p.member_id for match in matches[2:] for p in match.participants)
+
+
+def test_waitlisted_applicant_takes_over_only_the_unplayed_matches(session: Session) -> None:
+  league_id, admin_id, matches = _bracket(session)
+  substitute = Member(full_name='대기자', email='w-sub@example.com', level='intermediate')
+  session.add(substitute)
+  session.flush()
+  session.add(LeagueApplication(league_id=league_id, member_id=substitute.id, status='waitlisted'))
+  session.commit()
+  leaving = _withdrawing(matches)
+  before = _lineups(session, league_id)
+
+  rewritten = LeagueBracketService(session).withdraw_member(league_id, admin_id, leaving)
+
+  after = _lineups(session, league_id)
+  assert set(after) == set(before)
+  assert {match.id for match in rewritten} == {
+    match_id for match_id, teams in before.items()
+    if leaving in teams[0] | teams[1] and match_id not in {matches[0].id, matches[1].id}
+  }
+  for match_id, teams in before.items():
+    if match_id in {match.id for match in rewritten}:
+      assert all(substitute.id in new or old == new for old, new in zip(teams, after[match_id]))
+      assert leaving not in after[match_id][0] | after[match_id][1]
+    else:
+      assert after[match_id] == teams
+  assert all(match.player_a and '대기자' in match.player_a + match.player_b for match in rewritten)
+  assert session.get(LeagueMatch, matches[0].id).score_a == 6
+
+  statuses = dict(session.execute(
+    select(LeagueApplication.member_id, LeagueApplication.status).where(LeagueApplication.league_id == league_id)
+  ).all())
+  assert statuses[leaving] == 'withdrawn'
+  assert statuses[substitute.id] == 'scheduled'
+
+
+def test_without_a_substitute_the_group_absorbs_the_matches_without_repeat_partners(session: Session) -> None:
+  league_id, admin_id, matches = _bracket(session)
+  leaving = _withdrawing(matches)
+
+  open_before = sum(1 for match in matches[2:] if leaving in {p.member_id for p in match.participants})
+  rewritten = LeagueBracketService(session).withdraw_member(league_id, admin_id, leaving)
+  assert rewritten and len(rewritten) == open_before
+
+  lineups = _lineups(session, league_id)
+  scheduled = {
+    match.id for match in session.execute(
+      select(LeagueMatch).where(LeagueMatch.league_id == league_id, LeagueMatch.status == 'scheduled')
+    ).scalars()
+  }
+  assert all(leaving not in lineups[match_id][0] | lineups[match_id][1] for match_id in scheduled)
+  partnerships = [team for teams in lineups.values() for team in teams]
+  assert len(partnerships) == len(set(partnerships))
+  for team_a, team_b in lineups.values():
+    assert len(team_a) == len(team_b) == 2
+    assert not team_a & team_b
+
+  with pytest.raises(HTTPException) as error:
+    LeagueBracketService(session).withdraw_member(league_id, admin_id, leaving)
+  assert error.value.status_code == 404
+  assert session.get(League, league_id).bracket_generated_at is not None
+
+
+def test_a_withdrawn_member_cannot_come_back_as_a_substitute(session: Session) -> None:
+  league_id, admin_id, matches = _bracket(session)
+  first = _withdrawing(matches)
+  LeagueBracketService(session).withdraw_member(league_id, admin_id, first)
+  scheduled = session.execute(
+    select(LeagueMatch).where(LeagueMatch.league_id == league_id, LeagueMatch.status == 'scheduled')
+  ).scalars()
+  second = next(p.member_id for match in scheduled for p in match.participants)
+
+  with pytest.raises(HTTPException) as error:
+    LeagueBracketService(session).withdraw_member(league_id, admin_id, second, substitute_id=first)
+  assert error.value.status_code == 409